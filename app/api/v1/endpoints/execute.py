@@ -15,6 +15,7 @@ from app.schemas.execution import (
     ExecutionStatusResponse,
 )
 from app.services.action_executor import action_executor_service
+from app.utils.execution_scheduler import ExecutionQueueFullError
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -57,12 +58,14 @@ async def start_execution(
             plan_id=execution_request.plan_id,
             user_id=current_user.id,
             execution_options=execution_request.execution_options or {},
+            tenant_id=getattr(current_user, "tenant_id", None),
         )
+        status_data = await action_executor_service.get_execution_status(execution_id)
 
         return ExecutionResponse(
             execution_id=execution_id,
             plan_id=execution_request.plan_id,
-            status="executing",
+            status=status_data["status"],
             message="Plan execution started successfully",
             started_at=datetime.utcnow(),
             check_status_url=f"/api/v1/execute/{execution_id}",
@@ -71,6 +74,15 @@ async def start_execution(
             ),
         )
 
+    except ExecutionQueueFullError as e:
+        logger.warning(
+            "Execution queue full",
+            plan_id=execution_request.plan_id,
+            user_id=current_user.id,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
     except ValueError as e:
         logger.warning(
             "Invalid execution request",
@@ -107,6 +119,7 @@ async def get_execution_status(
     - Estimated time remaining
 
     **Status Values:**
+    - `queued`: Waiting for an execution slot
     - `executing`: Currently running
     - `paused`: Temporarily paused
     - `completed`: Successfully finished
@@ -291,7 +304,7 @@ async def get_execution_results(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Execution not found"
             )
 
-        if status_data["status"] == "executing":
+        if status_data["status"] in ("queued", "executing"):
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Execution still in progress. Use status endpoint for real-time updates.",
@@ -1,87 +1,37 @@
+import json
+
 import structlog
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import get_current_user
-from app.db.session import get_async_session
-from app.models.task import Task, TaskPriority, TaskStatus
+from app.db.session import get_async_session, get_async_session_factory
+from app.models.task import Task, TaskStatus
 from app.schemas.user import User
-from app.schemas.web_page import WebPageParseRequest
+from app.schemas.web_page import WebPageBatchParseRequest, WebPageParseRequest
+from app.services.batch_parse_service import batch_parse_service
+from app.services.parse_worker_pool import ParseQueueFullError, parse_worker_pool
+from app.services.task_progress_writer import task_progress_writer
 from app.services.task_status_service import TaskStatusService
-from app.services.web_parser import web_parser_service
 from app.services.webpage_cache_service import webpage_cache_service
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
 
 
-async def _process_webpage_parsing_async(
-    task_id: int, url: str, options: WebPageParseRequest
-):
-    """Async background task function for webpage parsing."""
-
-    logger.info("🚀 BACKGROUND TASK STARTED", task_id=task_id, url=url)
-
-    # Get database session
-    async for db in get_async_session():
-        try:
-            logger.info("📊 Processing webpage parsing", task_id=task_id, url=url)
-
-            # Process the webpage
-            result = await web_parser_service.parse_webpage_async(
-                db, task_id, url, options
-            )
-
-            logger.info(
-                "✅ Background webpage parsing completed", task_id=task_id, url=url
-            )
-
-        except Exception as e:
-            logger.error(
-                "❌ Background webpage parsing failed",
-                task_id=task_id,
-                url=url,
-                error=str(e),
-            )
-
-            # Update task status to failed
-            await TaskStatusService.fail_task(db, task_id, e)
-
-        # Always break after first iteration since we only need one session
-        break
-
-
-def _process_webpage_parsing(task_id: int, url: str, options: WebPageParseRequest):
-    """Sync wrapper for background task function (required by FastAPI BackgroundTasks)."""
-
-    logger.info("🎯 SYNC WRAPPER CALLED", task_id=task_id, url=url)
-
-    import asyncio
-
-    # Run the async function in the event loop
-    try:
-        # Get or create event loop
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        # Run the async function
-        loop.run_until_complete(_process_webpage_parsing_async(task_id, url, options))
-
-        logger.info("🎉 BACKGROUND TASK COMPLETED", task_id=task_id, url=url)
-
-    except Exception as e:
-        logger.error(
-            "💥 BACKGROUND TASK FAILED", task_id=task_id, url=url, error=str(e)
-        )
+def _queue_full_exception(error: ParseQueueFullError) -> HTTPException:
+    """Build the 429 response for a full parse queue."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Parse queue is full, please retry later",
+        headers={"Retry-After": str(error.retry_after)},
+    )
 
 
 @router.post("/parse")
 async def parse_webpage(
     parse_request: WebPageParseRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_session),
 ):
@@ -90,6 +40,7 @@ async def parse_webpage(
 
     This endpoint immediately returns a task_id and processes the webpage parsing
     in the background. Use the task_id to check status and retrieve results.
+    Responds with 429 and a Retry-After header when the parse queue is full.
 
     Returns:
         - task_id: Unique identifier for tracking the parsing task
@@ -98,7 +49,12 @@ async def parse_webpage(
         - check_status_url: URL to check task progress
     """
 
+    task = None
+
     try:
+        # Reject before creating a task record we could not run
+        parse_worker_pool.check_capacity()
+
         # Create task record
         task = Task(
             user_id=current_user.id,
@@ -106,7 +62,7 @@ async def parse_webpage(
             description=f"Semantic analysis and element extraction for {parse_request.url}",
             goal="Extract interactive elements and analyze webpage structure",
             target_url=str(parse_request.url),
-            priority=TaskPriority.MEDIUM,
+            priority=parse_request.priority,
             status=TaskStatus.PENDING,
             max_retries=3,
             timeout_seconds=300,  # 5 minutes
@@ -118,12 +74,12 @@ async def parse_webpage(
         await db.commit()
         await db.refresh(task)
 
-        # Queue background processing
-        background_tasks.add_task(
-            _process_webpage_parsing,
+        # Queue on the shared parse worker pool
+        await parse_worker_pool.submit(
             task_id=task.id,
             url=str(parse_request.url),
             options=parse_request,
+            priority=task.priority,
         )
 
         logger.info(
@@ -143,6 +99,20 @@ async def parse_webpage(
             "url": str(parse_request.url),
         }
 
+    except ParseQueueFullError as e:
+        logger.warning(
+            "Webpage parsing rejected, queue full",
+            url=parse_request.url,
+            retry_after=e.retry_after,
+        )
+        if task is not None:
+            await TaskStatusService.update_task_progress(
+                db,
+                task.id,
+                status=TaskStatus.CANCELLED,
+                current_step="rejected_queue_full",
+            )
+        raise _queue_full_exception(e)
     except Exception as e:
         logger.error(
             "Failed to queue webpage parsing", error=str(e), url=parse_request.url
@@ -153,6 +123,120 @@ async def parse_webpage(
         )
 
 
+@router.post("/batch")
+async def parse_webpage_batch(
+    batch_request: WebPageBatchParseRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """
+    Parse many webpages in one request (Background Processing).
+
+    Every URL becomes a task, created in one bulk insert; URLs with a cached
+    result complete immediately. The rest are parsed with at most
+    ``max_concurrency`` of this batch in flight at a time.
+
+    Returns:
+        - batch_id: Identifier for the batch
+        - total / cached / queued: URL counts
+        - status_url: Aggregate progress of the batch
+        - results_url: Paginated results (add ?format=ndjson to stream them)
+    """
+
+    try:
+        summary = await batch_parse_service.create_batch(
+            db, current_user.id, batch_request
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error("Failed to create parse batch", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start batch parsing: {str(e)}",
+        )
+
+    batch_id = summary["batch_id"]
+    return {
+        **summary,
+        "status": "queued" if summary["queued"] else "completed",
+        "status_url": f"/api/v1/parse/batch/{batch_id}",
+        "results_url": f"/api/v1/parse/batch/{batch_id}/results",
+    }
+
+
+@router.get("/batch/{batch_id}")
+async def get_batch_status(
+    batch_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Get aggregate progress and per-status task counts of a parse batch."""
+
+    progress = await batch_parse_service.get_batch_progress(
+        db, batch_id, current_user.id
+    )
+    if not progress:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found or access denied",
+        )
+    return progress
+
+
+@router.get("/batch/{batch_id}/results")
+async def get_batch_results(
+    batch_id: str,
+    cursor: int = Query(default=0, ge=0, description="Last task_id already seen"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    finished_only: bool = False,
+    format: str = Query(default="json", pattern="^(json|ndjson)$"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """
+    Get results of a parse batch.
+
+    - format=json: one page of results after ``cursor``, with ``next_cursor``
+    - format=ndjson: every result as newline-delimited JSON, streamed page by
+      page
+    """
+
+    if format == "ndjson":
+        user_id = current_user.id
+
+        async def lines():
+            # The request's session closes before streaming starts
+            async with get_async_session_factory()() as stream_db:
+                async for entry in batch_parse_service.iter_batch_results(
+                    stream_db, batch_id, user_id, finished_only=finished_only
+                ):
+                    yield json.dumps(entry, default=str) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    results = await batch_parse_service.get_batch_results(
+        db, batch_id, current_user.id, cursor, limit, finished_only
+    )
+    return {
+        "batch_id": batch_id,
+        "results": results,
+        "next_cursor": results[-1]["task_id"] if len(results) == limit else None,
+    }
+
+
+@router.delete("/batch/{batch_id}")
+async def cancel_batch(
+    batch_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Stop a parse batch; tasks not yet started are cancelled."""
+
+    cancelled = await batch_parse_service.cancel_batch(db, batch_id, current_user.id)
+    return {"batch_id": batch_id, "cancelled_tasks": cancelled}
+
+
 @router.get("/{task_id}")
 async def get_parsing_status(
     task_id: int,
@@ -267,10 +351,94 @@ async def get_parsing_results(
         )
 
 
+def _sse_message(event_type: str, data: dict, event_id: str | None = None) -> str:
+    """Format one server-sent event."""
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event_type}", f"data: {json.dumps(data, default=str)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("/{task_id}/stream")
+async def stream_parsing_results(
+    task_id: int,
+    request: Request,
+    last_event_id: str | None = Header(default=None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """
+    Stream progress and partial results of a parsing task (Server-Sent Events).
+
+    Events arrive as each extraction stage completes:
+    - progress: status, progress percentage and current step
+    - partial: page metadata, then batches of interactive elements, then
+      batches of content blocks (stage, offset, total, items)
+    - retrying: the attempt failed and will be retried; partials restart
+    - completed / failed: terminal outcome, after which the stream closes
+
+    Events already emitted are replayed on connect; reconnecting clients
+    resume after the Last-Event-ID they received.
+    """
+
+    task_status = await TaskStatusService.get_task_status(db, task_id, current_user.id)
+    if not task_status:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found or access denied",
+        )
+    if not task_progress_writer.stream_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Result streaming is disabled",
+        )
+
+    results_url = f"/api/v1/parse/{task_id}/results"
+    finished = task_status["status"] in ("completed", "failed")
+
+    async def event_source():
+        streamed = False
+        async for event_id, event_type, data in task_progress_writer.read_stream(
+            task_id, last_event_id or "0"
+        ):
+            if await request.is_disconnected():
+                return
+            if event_type == "heartbeat":
+                if finished and not streamed:
+                    break
+                yield ": keep-alive\n\n"
+                continue
+
+            streamed = True
+            if event_type == "completed":
+                data["results_url"] = results_url
+            yield _sse_message(event_type, data, event_id)
+
+        if not streamed:
+            # Nothing to replay: the stream expired or Redis is unavailable
+            snapshot = {
+                "task_id": task_id,
+                "status": task_status["status"],
+                "progress_percentage": task_status.get("progress_percentage"),
+                "current_step": task_status.get("current_step"),
+            }
+            if task_status["status"] == "completed":
+                snapshot["results_url"] = results_url
+            elif task_status["status"] == "failed":
+                snapshot["error_message"] = task_status.get("error_message")
+            yield _sse_message(
+                task_status["status"] if finished else "progress", snapshot
+            )
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/{task_id}/retry")
 async def retry_parsing_task(
     task_id: int,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_session),
 ):
@@ -280,6 +448,8 @@ async def retry_parsing_task(
     Resets the task status and queues it for processing again.
     """
 
+    previous_state = None
+
     try:
         # Get task status
         task_status = await TaskStatusService.get_task_status(
@@ -309,7 +479,15 @@ async def retry_parsing_task(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
             )
 
-        # Reset task status
+        # Make sure the retry can be queued before resetting the task
+        parse_worker_pool.check_capacity()
+
+        # Reset task status, remembering it in case the queue fills meanwhile
+        previous_state = {
+            "status": task.status,
+            "progress_percentage": task.progress_percentage,
+            "current_step": (task.progress_details or {}).get("current_step"),
+        }
         await TaskStatusService.update_task_progress(
             db,
             task_id,
@@ -326,12 +504,12 @@ async def retry_parsing_task(
             wait_for_network_idle=True,
         )
 
-        # Queue background processing
-        background_tasks.add_task(
-            _process_webpage_parsing,
+        # Queue on the shared parse worker pool
+        await parse_worker_pool.submit(
             task_id=task.id,
             url=task.target_url,
             options=parse_request,
+            priority=task.priority,
         )
 
         logger.info(
@@ -345,6 +523,16 @@ async def retry_parsing_task(
             "check_status_url": f"/api/v1/parse/{task_id}",
         }
 
+    except ParseQueueFullError as e:
+        logger.warning(
+            "Webpage parsing retry rejected, queue full",
+            task_id=task_id,
+            retry_after=e.retry_after,
+        )
+        if previous_state is not None:
+            # No job was queued; leave the task retryable instead of pending
+            await TaskStatusService.update_task_progress(db, task_id, **previous_state)
+        raise _queue_full_exception(e)
     except HTTPException:
         raise
     except Exception as e:
@@ -27,6 +27,7 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_CACHE_TTL: int = 3600  # 1 hour
+    MAX_CACHE_SIZE_MB: int = 100  # Budget for cached parse results in Redis
 
     # Security
     SECRET_KEY: str = Field(
@@ -62,12 +63,54 @@ class Settings(BaseSettings):
     HEADLESS: bool = True
     BROWSER_TIMEOUT: int = 30
 
+    # Browser Pool
+    BROWSER_POOL_BROWSERS: int = 2  # Chromium processes sharing the contexts
+    BROWSER_POOL_MIN_SIZE: int = 2  # Contexts kept warm at all times
+    BROWSER_POOL_MAX_SIZE: int = 10
+    BROWSER_POOL_ACQUIRE_TIMEOUT_SECONDS: int = 30
+    BROWSER_POOL_SCALE_UP_WAIT_MS: int = (
+        500  # Sustained acquire wait that grows the pool
+    )
+    BROWSER_POOL_SCALE_DOWN_IDLE_SECONDS: int = (
+        120  # Idle time before surplus is closed
+    )
+    BROWSER_POOL_AUTOSCALE_INTERVAL_SECONDS: int = 5
+    BROWSER_POOL_MIN_FREE_MEMORY_MB: int = 1024  # Host headroom required to grow
+    BROWSER_CONTEXT_MAX_AGE_MINUTES: int = 30
+    BROWSER_MAX_MEMORY_MB: int = 512  # V8 heap limit per renderer
+    BROWSER_MAX_TOTAL_MEMORY_MB: int = 4096  # Chromium process tree RSS budget
+    BROWSER_MAX_PROCESS_MEMORY_MB: int = 2048  # Per-browser RSS before recycling
+    BROWSER_HEALTH_CHECK_INTERVAL_SECONDS: int = 30
+    BROWSER_HEALTH_CHECK_TIMEOUT_SECONDS: int = 5
+    BROWSER_LEASE_TIMEOUT_SECONDS: int = 600  # Orphaned leases are reclaimed
+    BROWSER_CONTEXT_RESET_MODE: str = "cdp"  # cdp | navigate (legacy about:blank)
+    BROWSER_WARM_DOMAINS: list[str] = []  # Customer sites always kept warm
+    BROWSER_WARM_DOMAIN_MIN_HITS: int = 3  # Recent acquires that make a domain hot
+    BROWSER_PRECONNECT_ENABLED: bool = True  # Preconnect warm pages to hot domains
+    BROWSER_ASSET_CACHE_ENABLED: bool = False  # Shared disk cache for static assets
+    BROWSER_ASSET_CACHE_DIR: str = "cache/assets"
+    BROWSER_ASSET_CACHE_MAX_SIZE_MB: int = 512
+    BROWSER_HAR_MODE: str = "off"  # off | record | replay (offline benchmarks)
+    BROWSER_HAR_DIR: str = "har"  # One archive per recorded context
+    BROWSER_HAR_NOT_FOUND: str = "abort"  # abort | fallback (to the network)
+
     # File Storage
     UPLOAD_DIR: str = "uploads"
     SCREENSHOT_DIR: str = "screenshots"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_FILE_TYPES: list[str] = [".jpg", ".jpeg", ".png", ".pdf", ".txt"]
 
+    # Screenshots
+    SCREENSHOT_FORMAT: str = "jpeg"  # jpeg | webp (needs Pillow) | png
+    SCREENSHOT_QUALITY: int = 80  # JPEG/WebP quality 1-100
+    SCREENSHOT_MODE: str = "viewport"  # viewport | full_page
+    SCREENSHOT_DEDUP_ENABLED: bool = True  # Store identical frames once
+    SCREENSHOT_IO_WORKERS: int = 4  # Threads for transcoding and storage writes
+    SCREENSHOT_STORAGE_BACKEND: str = "local"  # local (SCREENSHOT_DIR) | s3
+    SCREENSHOT_S3_BUCKET: str = ""
+    SCREENSHOT_S3_PREFIX: str = "screenshots"
+    SCREENSHOT_S3_ENDPOINT_URL: str | None = None  # MinIO or other S3-compatible
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 100
     RATE_LIMIT_BURST: int = 200
@@ -86,9 +129,79 @@ class Settings(BaseSettings):
     TASK_TIMEOUT_SECONDS: int = 1800  # 30 minutes
     MAX_RETRY_ATTEMPTS: int = 3
 
+    # Parse Worker Pool
+    PARSE_WORKER_CONCURRENCY: int = 5  # Concurrent parses per API node
+    PARSE_QUEUE_MAX_SIZE: int = 100  # Queued parses before 429 backpressure
+    PARSE_WORKER_DRAIN_TIMEOUT_SECONDS: int = 60  # Graceful drain on shutdown
+
+    # Batch Parsing
+    PARSE_BATCH_MAX_URLS: int = 5000  # URLs accepted per batch request
+    PARSE_BATCH_MAX_CONCURRENCY: int = 20  # Ceiling on a batch's in-flight parses
+    PARSE_BATCH_RESULTS_PAGE_SIZE: int = 100  # Results per page / NDJSON query
+
+    # Task Progress Reporting
+    TASK_PROGRESS_FLUSH_INTERVAL_MS: int = 500  # Bulk progress write interval
+    TASK_PROGRESS_PUBSUB_ENABLED: bool = False  # Publish live progress via Redis
+    TASK_STREAM_ENABLED: bool = True  # Replayable per-task event stream for SSE
+    TASK_STREAM_BATCH_SIZE: int = 50  # Elements or blocks per partial result event
+    TASK_STREAM_MAX_EVENTS: int = 1000  # Approximate cap on events kept per task
+    TASK_STREAM_TTL_SECONDS: int = 600  # Stream lifetime after the last event
+
+    # Parse Request Coalescing
+    PARSE_COALESCING_ENABLED: bool = True  # Share one parse per URL+options
+    PARSE_COALESCING_DISTRIBUTED: bool = True  # Elect one leader across nodes
+    PARSE_COALESCING_LOCK_TTL_SECONDS: int = 120  # Max wait on a remote leader
+
+    # Static HTML Fast Path
+    STATIC_PARSE_ENABLED: bool = True  # Try plain HTTP + lxml before Playwright
+    STATIC_PARSE_MAX_BYTES: int = 5 * 1024 * 1024  # Larger documents use the browser
+    STATIC_PARSE_TIMEOUT_SECONDS: int = 10  # Static fetch timeout
+
+    # Incremental Re-parsing
+    INCREMENTAL_PARSE_ENABLED: bool = True  # Reuse analysis of unchanged regions
+    INCREMENTAL_PARSE_INDEX_TTL_SECONDS: int = 7 * 24 * 3600  # Region index lifetime
+
+    # Frame and Shadow DOM Extraction
+    FRAME_EXTRACTION_ENABLED: bool = True  # Extract child frames alongside the page
+    FRAME_EXTRACTION_MAX_FRAMES: int = 20  # Child frames extracted per page
+    FRAME_EXTRACTION_MAX_ELEMENTS: int = 200  # Interactive elements per child frame
+    FRAME_EXTRACTION_MAX_BLOCKS: int = 50  # Content blocks per child frame
+    FRAME_EXTRACTION_TIMEOUT_SECONDS: float = 2.0  # Budget per child frame
+
+    # In-process Parse Result Cache (in front of Redis)
+    LOCAL_CACHE_ENABLED: bool = True
+    LOCAL_CACHE_MAX_ENTRIES: int = 256
+    LOCAL_CACHE_MAX_SIZE_MB: int = 64
+    LOCAL_CACHE_TTL_SECONDS: int = 300  # Upper bound if an invalidation is missed
+    CACHE_STATS_FLUSH_INTERVAL_SECONDS: int = 5  # Batched Redis stats writes
+
+    # Cache Payload Codec
+    CACHE_CODEC_SERIALIZER: str = "auto"  # auto | orjson | json
+    CACHE_CODEC_COMPRESSOR: str = "auto"  # auto | zstd | lz4 | zlib | none
+    CACHE_COMPRESSION_LEVEL: int = 3
+    CACHE_COMPRESSION_MIN_BYTES: int = 1024  # Smaller payloads stay uncompressed
+
     # Action Execution
     DISABLE_IMAGES_FOR_EXECUTION: bool = False
     EXECUTION_SCREENSHOT_QUALITY: int = 80  # JPEG quality 1-100
+    EXECUTION_RETRY_BACKOFF_CAP_SECONDS: float = 30.0  # Upper bound on retry backoff
+    EXECUTION_BATCHING_ENABLED: bool = True  # Fill consecutive form fields at once
+    EXECUTION_BATCH_MAX_ACTIONS: int = 20  # Most form-fill steps per batch
+    EXECUTION_MAX_CONCURRENT: int = 8  # Also capped by the browser pool size
+    EXECUTION_RESERVED_CONTEXTS: int = 2  # Pool contexts kept free for parsing
+    EXECUTION_QUEUE_MAX_SIZE: int = 1000  # Queued executions before rejecting
+    EXECUTION_MAX_CONCURRENT_PER_TENANT: int = 0  # 0 = no per-tenant cap
+    EXECUTION_TENANT_WEIGHTS: dict[str, float] = {}  # e.g. {"tenant:7": 2.0}
+    EXECUTION_RESULT_TTL_SECONDS: int = 900  # Finished results kept in memory
+    EXECUTION_MAX_RETAINED_RESULTS: int = 1000  # Finished results kept in memory
+    EXECUTION_RESULT_STORE_TTL_SECONDS: int = 604800  # Evicted results in Redis
+    SELECTOR_RACE_TIMEOUT_MS: int = 5000  # Wait for any candidate selector to match
+    SELECTOR_RACE_HEAD_START_MS: int = 200  # Lead for a domain's winning strategy
+    SELECTOR_HEALING_ENABLED: bool = True  # Heal missing elements by fingerprint
+    SELECTOR_HEALING_MIN_SCORE: float = 0.75  # Minimum similarity for a healed match
+    SELECTOR_HEALING_MIN_MARGIN: float = 0.05  # Lead required over the runner-up
+    SELECTOR_HEALING_TTL_SECONDS: int = 2592000  # Fingerprint/healed selector lifetime
+    SELECTOR_HEALING_VERIFY_TIMEOUT_MS: int = 1000  # Visibility check of a healed match
 
     # HTTP Client Configuration
     HTTP_CLIENT_TIMEOUT_TOTAL: int = 30  # Total timeout in seconds
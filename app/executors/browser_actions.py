@@ -1,12 +1,15 @@
 import asyncio
 from abc import ABC, abstractmethod
-from datetime import datetime
 
 from playwright.async_api import Locator, Page
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from app.core.logging import get_logger
 from app.models.execution_plan import ActionType, AtomicAction
+from app.utils.form_batching import FORM_FILL_SCRIPT, batch_results
+from app.utils.page_waits import wait_for_dom_quiet, wait_for_settle
+from app.utils.selector_healing import selector_healing_index
+from app.utils.selector_resolver import selector_resolver
 
 logger = get_logger(__name__)
 
@@ -23,34 +26,47 @@ class BaseActionExecutor(ABC):
         pass
 
     async def _find_element(self, page: Page, action: AtomicAction) -> Locator | None:
-        """Find element using multiple selector strategies."""
-        selectors = []
+        """Find element by racing every selector strategy at once.
 
-        # Add selectors in order of preference
+        When none matches, the element is healed from its indexed fingerprint.
+        """
+        candidates = []
+
+        # Listed in default order of preference
         if action.target_selector:
-            selectors.append(action.target_selector)
+            candidates.append(("target", action.target_selector))
         if action.element_css_selector:
-            selectors.append(action.element_css_selector)
+            candidates.append(("css", action.element_css_selector))
         if action.element_xpath:
-            selectors.append(f"xpath={action.element_xpath}")
+            candidates.append(("xpath", f"xpath={action.element_xpath}"))
 
         # Try text-based selection if available
         if action.element_text_content:
-            selectors.append(f"text={action.element_text_content}")
-
-        for selector in selectors:
-            try:
-                element = page.locator(selector)
-                # Check if element exists and is visible
-                await element.wait_for(state="visible", timeout=5000)
-                return element
-            except PlaywrightTimeoutError:
-                continue
-            except Exception as e:
-                logger.debug(f"Selector failed: {selector}, error: {str(e)}")
-                continue
-
-        return None
+            candidates.append(("text", f"text={action.element_text_content}"))
+
+        # The same selector under several strategies is probed once
+        unique = []
+        for strategy, selector in candidates:
+            if all(selector != seen for _, seen in unique):
+                unique.append((strategy, selector))
+
+        # A selector healed on an earlier run races alongside the originals
+        selectors = [selector for _, selector in unique]
+        for healed in await selector_healing_index.healed_selectors(
+            page.url, selectors
+        ):
+            if healed not in selectors:
+                unique.append(("healed", healed))
+
+        found = await selector_resolver.resolve(page, unique)
+        if found:
+            return found[0]
+
+        # Every selector missed; match the element's fingerprint instead
+        healed = await selector_healing_index.heal(
+            page, selectors, action.element_text_content
+        )
+        return healed[0] if healed else None
 
     async def _wait_for_element(
         self, page: Page, action: AtomicAction
@@ -129,6 +145,31 @@ class BaseActionExecutor(ABC):
         logger.error(f"Critical element not found: {action.target_selector}")
         return False
 
+    def _contains_unsafe_content(self, value: str) -> bool:
+        """Check if input value contains potentially unsafe content."""
+        try:
+            from app.security.input_sanitization import enterprise_sanitizer
+
+            # Use comprehensive sanitization
+            malicious_patterns = enterprise_sanitizer.detect_malicious_patterns(value)
+            return len(malicious_patterns) > 0
+
+        except Exception as e:
+            logger.error(f"Security check failed: {str(e)}")
+            # Fallback to basic patterns
+            unsafe_patterns = [
+                "<script",
+                "</script>",
+                "javascript:",
+                "data:text/html",
+                "vbscript:",
+                "onload=",
+                "onerror=",
+                "onclick=",
+            ]
+            value_lower = value.lower()
+            return any(pattern in value_lower for pattern in unsafe_patterns)
+
     def _log_action(self, action: AtomicAction, success: bool, details: str = ""):
         """Log action execution."""
         logger.info(
@@ -177,8 +218,8 @@ class ClickExecutor(BaseActionExecutor):
             if action.wait_condition:
                 await self._handle_wait_condition(page, action.wait_condition)
             else:
-                # Default wait for potential page changes
-                await asyncio.sleep(1)
+                # Default wait for potential page changes to settle
+                await wait_for_settle(page, timeout_ms=1000)
 
             self._log_action(action, True, f"Clicked element: {action.target_selector}")
             return True
@@ -201,7 +242,7 @@ class ClickExecutor(BaseActionExecutor):
                 await page.wait_for_selector(f"text={text}", timeout=10000)
             else:
                 # Default wait
-                await asyncio.sleep(2)
+                await wait_for_settle(page, timeout_ms=2000)
         except PlaywrightTimeoutError:
             logger.warning(f"Wait condition not met: {condition}")
 
@@ -253,7 +294,8 @@ class TypeExecutor(BaseActionExecutor):
 
             # Trigger change events
             await element.press("Tab")
-            await asyncio.sleep(0.5)  # Allow time for change events
+            # Allow change handlers to update the DOM
+            await wait_for_dom_quiet(page, quiet_ms=100, timeout_ms=500)
 
             self._log_action(
                 action,
@@ -266,31 +308,6 @@ class TypeExecutor(BaseActionExecutor):
             self._log_action(action, False, f"Type failed: {str(e)}")
             return False
 
-    def _contains_unsafe_content(self, value: str) -> bool:
-        """Check if input value contains potentially unsafe content."""
-        try:
-            from app.security.input_sanitization import enterprise_sanitizer
-
-            # Use comprehensive sanitization
-            malicious_patterns = enterprise_sanitizer.detect_malicious_patterns(value)
-            return len(malicious_patterns) > 0
-
-        except Exception as e:
-            logger.error(f"Security check failed: {str(e)}")
-            # Fallback to basic patterns
-            unsafe_patterns = [
-                "<script",
-                "</script>",
-                "javascript:",
-                "data:text/html",
-                "vbscript:",
-                "onload=",
-                "onerror=",
-                "onclick=",
-            ]
-            value_lower = value.lower()
-            return any(pattern in value_lower for pattern in unsafe_patterns)
-
 
 class NavigateExecutor(BaseActionExecutor):
     """Execute navigation actions."""
@@ -360,10 +377,12 @@ class WaitExecutor(BaseActionExecutor):
                     await page.wait_for_load_state(
                         "domcontentloaded", timeout=action.timeout_seconds * 1000
                     )
+            elif action.input_value:
+                # Explicit wait time from input_value
+                await asyncio.sleep(float(action.input_value))
             else:
-                # Default wait time from input_value or 2 seconds
-                wait_time = float(action.input_value) if action.input_value else 2.0
-                await asyncio.sleep(wait_time)
+                # Default wait for the page to settle, at most 2 seconds
+                await wait_for_settle(page, timeout_ms=2000)
 
             self._log_action(
                 action, True, f"Wait completed: {action.wait_condition or 'default'}"
@@ -498,7 +517,7 @@ class SubmitExecutor(BaseActionExecutor):
                 await page.evaluate("document.forms[0].submit()")
 
             # Wait for navigation or response
-            await asyncio.sleep(2)
+            await wait_for_settle(page, timeout_ms=2000)
 
             self._log_action(
                 action,
@@ -517,32 +536,20 @@ class ScreenshotExecutor(BaseActionExecutor):
 
     async def execute(self, page: Page, action: AtomicAction) -> bool:
         try:
-            from pathlib import Path
-
-            from app.core.config import settings
-
-            # Create screenshot filename
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-            filename = f"action_screenshot_{action.step_number}_{timestamp}.png"
-
-            screenshot_dir = Path(settings.SCREENSHOT_DIR)
-            screenshot_dir.mkdir(exist_ok=True)
-            filepath = screenshot_dir / filename
+            from app.services.screenshot_service import screenshot_service
 
-            # Take screenshot
+            # Screenshot of the specific element, falling back to full page
+            element = None
             if action.target_selector:
-                # Screenshot of specific element
                 element = await self._wait_for_element(page, action)
-                if element:
-                    await element.screenshot(path=str(filepath))
-                else:
-                    # Fallback to full page
-                    await page.screenshot(path=str(filepath), full_page=True)
-            else:
-                # Full page screenshot
-                await page.screenshot(path=str(filepath), full_page=True)
+            path = await screenshot_service.capture(
+                page, mode="full_page", element=element
+            )
+            if not path:
+                self._log_action(action, False, "Screenshot failed")
+                return False
 
-            self._log_action(action, True, f"Screenshot saved: {filename}")
+            self._log_action(action, True, f"Screenshot saved: {path}")
             return True
 
         except Exception as e:
@@ -565,7 +572,7 @@ class HoverExecutor(BaseActionExecutor):
             await element.hover()
 
             # Wait for any hover effects
-            await asyncio.sleep(1)
+            await wait_for_dom_quiet(page, quiet_ms=100, timeout_ms=1000)
 
             self._log_action(
                 action, True, f"Hovered over element: {action.target_selector}"
@@ -609,3 +616,85 @@ class KeyPressExecutor(BaseActionExecutor):
         except Exception as e:
             self._log_action(action, False, f"Key press failed: {str(e)}")
             return False
+
+
+class FormFillBatchExecutor(BaseActionExecutor):
+    """Fill a run of form fields in one in-page operation."""
+
+    BATCHABLE_TYPES = (ActionType.TYPE, ActionType.SELECT)
+
+    def can_batch(self, action: AtomicAction) -> bool:
+        """Plain type/select steps with no per-step waits or validation."""
+        return (
+            action.action_type in self.BATCHABLE_TYPES
+            and bool(action.input_value)
+            and not action.wait_condition
+            and not action.validation_criteria
+            and not self._contains_unsafe_content(action.input_value)
+        )
+
+    async def execute(self, page: Page, action: AtomicAction) -> bool:
+        results = await self.execute_batch(page, [action])
+        return bool(results and results[0])
+
+    async def execute_batch(
+        self, page: Page, actions: list[AtomicAction]
+    ) -> list[bool] | None:
+        """Fill every field, returning per-action success.
+
+        Returns None, without filling anything, when the fields are not all
+        in the same form.
+        """
+        # Elements are located concurrently; missing ones are left out
+        elements = await asyncio.gather(
+            *(self._find_element(page, action) for action in actions)
+        )
+        found = [
+            (position, element)
+            for position, element in enumerate(elements)
+            if element is not None
+        ]
+
+        if not found:
+            return [False] * len(actions)
+
+        handles = []
+        try:
+            handles = await asyncio.gather(
+                *(element.element_handle(timeout=5000) for _, element in found)
+            )
+            outcome = await page.evaluate(
+                FORM_FILL_SCRIPT,
+                {
+                    "elements": handles,
+                    "items": [
+                        {
+                            "kind": (
+                                "select"
+                                if actions[position].action_type == ActionType.SELECT
+                                else "type"
+                            ),
+                            "value": actions[position].input_value,
+                        }
+                        for position, _ in found
+                    ],
+                },
+            )
+        finally:
+            for handle in handles:
+                await handle.dispose()
+
+        if not outcome.get("sameForm"):
+            return None
+
+        success = [False] * len(actions)
+        for (position, _), result in zip(
+            found, batch_results(outcome, len(found)), strict=True
+        ):
+            success[position] = bool(result.get("ok"))
+            self._log_action(
+                actions[position],
+                success[position],
+                result.get("error") or "Filled in batch",
+            )
+        return success
@@ -108,6 +108,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
                 "request_id": request.scope.get("request_id"),
             }
         },
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -214,12 +215,80 @@ async def startup_event():
     except Exception as e:
         logger.error("Webhook service initialization failed", error=str(e))
 
+    # Start parse worker pool
+    try:
+        from app.services.parse_worker_pool import parse_worker_pool
+
+        await parse_worker_pool.initialize()
+        logger.info("Parse worker pool initialized")
+    except Exception as e:
+        logger.error("Parse worker pool initialization failed", error=str(e))
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown event handler."""
     logger.info("WebAgent shutting down")
 
+    # Cancel plan executions and store their results
+    try:
+        from app.services.action_executor import action_executor_service
+
+        await action_executor_service.shutdown()
+    except Exception as e:
+        logger.error("Error shutting down action executor service", error=str(e))
+
+    # Stop feeding batches into the parse queue
+    try:
+        from app.services.batch_parse_service import batch_parse_service
+
+        await batch_parse_service.shutdown()
+    except Exception as e:
+        logger.error("Error shutting down batch parse service", error=str(e))
+
+    # Drain queued and in-flight parses first; they need the database
+    try:
+        from app.services.parse_worker_pool import parse_worker_pool
+
+        await parse_worker_pool.shutdown()
+        logger.info("Parse worker pool drained")
+    except Exception as e:
+        logger.error("Error draining parse worker pool", error=str(e))
+
+    # Flush buffered task progress (before the database engine closes)
+    try:
+        from app.services.task_progress_writer import task_progress_writer
+
+        await task_progress_writer.shutdown()
+        logger.info("Task progress writer shutdown complete")
+    except Exception as e:
+        logger.error("Error shutting down task progress writer", error=str(e))
+
+    # Flush cache stats and stop the cache invalidation listener
+    try:
+        from app.services.webpage_cache_service import webpage_cache_service
+
+        await webpage_cache_service.shutdown()
+        logger.info("Webpage cache service shutdown complete")
+    except Exception as e:
+        logger.error("Error shutting down webpage cache service", error=str(e))
+
+    # Finish background screenshot writes
+    try:
+        from app.services.screenshot_service import screenshot_service
+
+        await screenshot_service.shutdown()
+    except Exception as e:
+        logger.error("Error shutting down screenshot service", error=str(e))
+
+    # Close the selector healing index connection
+    try:
+        from app.utils.selector_healing import selector_healing_index
+
+        await selector_healing_index.shutdown()
+    except Exception as e:
+        logger.error("Error shutting down selector healing index", error=str(e))
+
     # Close database connections
     try:
         from app.db.session import close_async_engine
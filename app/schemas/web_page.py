@@ -1,8 +1,11 @@
 from datetime import datetime
+from enum import Enum
 from typing import Any
 
 from pydantic import BaseModel, Field, HttpUrl, validator
 
+from app.models.task import TaskPriority
+
 
 class InteractiveElementBase(BaseModel):
     element_id: str | None = None
@@ -148,6 +151,13 @@ class WebPage(WebPageBase):
         return v
 
 
+class ParseProfile(str, Enum):
+    """How much of the page the browser loads while parsing."""
+
+    FULL = "full"  # Load every resource
+    LEAN = "lean"  # Block images, fonts, media and trackers
+
+
 class WebPageParseRequest(BaseModel):
     url: HttpUrl
     force_refresh: bool = False
@@ -157,6 +167,29 @@ class WebPageParseRequest(BaseModel):
     extract_forms: bool = True
     extract_links: bool = True
     semantic_analysis: bool = True
+    parse_profile: ParseProfile = ParseProfile.FULL
+    priority: TaskPriority = TaskPriority.MEDIUM
+
+
+class WebPageBatchParseRequest(BaseModel):
+    urls: list[HttpUrl] = Field(..., min_items=1, max_items=5000)
+    force_refresh: bool = False
+    include_screenshot: bool = False
+    wait_for_load: int = Field(default=3, ge=1, le=30)
+    wait_for_network_idle: bool = False
+    extract_forms: bool = True
+    extract_links: bool = True
+    semantic_analysis: bool = True
+    parse_profile: ParseProfile = ParseProfile.FULL
+    # Crawls yield to interactive parses by default
+    priority: TaskPriority = TaskPriority.LOW
+    max_concurrency: int = Field(default=5, ge=1, le=50)
+
+    def parse_request(self, url: str) -> WebPageParseRequest:
+        """The single-URL request each batch entry is parsed with."""
+        return WebPageParseRequest(
+            url=url, **self.dict(exclude={"urls", "max_concurrency"})
+        )
 
 
 class WebPageParseResponse(BaseModel):
@@ -166,3 +199,4 @@ class WebPageParseResponse(BaseModel):
     screenshots: list[str] = []  # List of screenshot URLs/paths
     warnings: list[str] = []
     errors: list[str] = []
+    parse_stats: dict[str, Any] = {}  # Network and strategy details of the parse
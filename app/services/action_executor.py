@@ -1,9 +1,11 @@
 import asyncio
+import json
 import uuid
-from datetime import datetime
-from pathlib import Path
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from typing import Any
 
+import redis.asyncio as redis
 from playwright.async_api import Page
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from sqlalchemy import select, update
@@ -11,8 +13,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.db.session import get_async_session_factory
 from app.executors.browser_actions import (
     ClickExecutor,
+    FormFillBatchExecutor,
     HoverExecutor,
     KeyPressExecutor,
     NavigateExecutor,
@@ -30,8 +34,25 @@ from app.models.execution_plan import (
     PlanStatus,
     StepStatus,
 )
+from app.services.screenshot_service import screenshot_service
 from app.services.webhook_service import webhook_service
 from app.utils.browser_pool import browser_pool
+from app.utils.execution_control import (
+    ExecutionCancelledError,
+    ExecutionControl,
+    backoff_delay,
+)
+from app.utils.execution_scheduler import (
+    DEFAULT_PRIORITY,
+    ExecutionScheduler,
+)
+from app.utils.form_batching import group_action_runs
+from app.utils.page_waits import (
+    wait_for_appearance,
+    wait_for_change,
+    wait_for_dom_quiet,
+    wait_for_network_quiet,
+)
 
 logger = get_logger(__name__)
 
@@ -44,7 +65,7 @@ class ExecutionResult:
         self.plan_id = plan_id
         self.started_at = datetime.utcnow()
         self.completed_at: datetime | None = None
-        self.status = "executing"
+        self.status = "queued"
         self.current_step = 0
         self.total_steps = 0
         self.success = False
@@ -91,7 +112,10 @@ class ActionExecutorService:
 
     def __init__(self):
         self.active_executions: dict[str, ExecutionResult] = {}
-        self.paused_executions: dict[str, bool] = {}
+        # Pause/resume/cancel signals of executions still running
+        self.execution_controls: dict[str, ExecutionControl] = {}
+        # Finished execution ids, oldest first, awaiting eviction
+        self.finished_executions: OrderedDict[str, datetime] = OrderedDict()
 
         # Action executors
         self.action_executors = {
@@ -107,35 +131,83 @@ class ActionExecutorService:
             ActionType.KEY_PRESS: KeyPressExecutor(),
         }
 
-        # Screenshot directory
-        self.screenshot_dir = Path(settings.SCREENSHOT_DIR)
-        self.screenshot_dir.mkdir(exist_ok=True)
+        # Consecutive form fills execute as one in-page operation
+        self.batch_executor = FormFillBatchExecutor()
+        self.batching_enabled = getattr(settings, "EXECUTION_BATCHING_ENABLED", True)
+        self.max_batch_size = getattr(settings, "EXECUTION_BATCH_MAX_ACTIONS", 20)
+
+        self.screenshot_quality = getattr(settings, "EXECUTION_SCREENSHOT_QUALITY", 80)
+        self.retry_backoff_cap = getattr(
+            settings, "EXECUTION_RETRY_BACKOFF_CAP_SECONDS", 30
+        )
+
+        # Scheduling
+        self.max_concurrent = getattr(settings, "EXECUTION_MAX_CONCURRENT", 8)
+        self.reserved_contexts = getattr(settings, "EXECUTION_RESERVED_CONTEXTS", 2)
+        self.scheduler = ExecutionScheduler(
+            capacity=self._execution_capacity,
+            max_queue_size=getattr(settings, "EXECUTION_QUEUE_MAX_SIZE", 1000),
+            max_per_tenant=getattr(settings, "EXECUTION_MAX_CONCURRENT_PER_TENANT", 0),
+            tenant_weights=getattr(settings, "EXECUTION_TENANT_WEIGHTS", {}),
+        )
+
+        # Finished results stay in memory for the TTL, then move to Redis
+        self.result_ttl_seconds = getattr(settings, "EXECUTION_RESULT_TTL_SECONDS", 900)
+        self.max_retained_results = getattr(
+            settings, "EXECUTION_MAX_RETAINED_RESULTS", 1000
+        )
+        self.result_store_ttl_seconds = getattr(
+            settings, "EXECUTION_RESULT_STORE_TTL_SECONDS", 604800
+        )
+        self.redis_url = getattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+        self.redis_client: redis.Redis | None = None
+        self._redis_initialized = False
+        self._eviction_task: asyncio.Task | None = None
+        self.RESULT_PREFIX = "execution_result:"
+
+        # Stats
+        self.results_evicted = 0
 
         logger.info("ActionExecutor service initialized")
 
+    def _execution_capacity(self) -> int:
+        """Concurrent executions allowed, leaving pool contexts for parsing."""
+        pool_capacity = browser_pool.max_size - self.reserved_contexts
+        return max(1, min(self.max_concurrent, pool_capacity))
+
     async def execute_plan_async(
         self,
         db: AsyncSession,
         plan_id: int,
         user_id: int,
         execution_options: dict[str, Any] | None = None,
+        tenant_id: int | None = None,
     ) -> str:
         """
-        Execute an approved ExecutionPlan asynchronously.
+        Queue an approved ExecutionPlan for asynchronous execution.
 
         Args:
             db: Database session
             plan_id: ID of the ExecutionPlan to execute
             user_id: ID of the user requesting execution
-            execution_options: Optional execution configuration
+            execution_options: Optional execution configuration; ``priority``
+                selects the scheduling lane (urgent, high, normal, low)
+            tenant_id: Tenant sharing capacity fairly with other tenants;
+                users without one are scheduled as their own tenant
 
         Returns:
             execution_id: Unique identifier for tracking this execution
+
+        Raises:
+            ExecutionQueueFullError: Too many executions are already waiting
         """
         execution_id = str(uuid.uuid4())
         execution_options = execution_options or {}
+        self._ensure_eviction_loop()
 
         try:
+            self.scheduler.check_capacity()
+
             # Validate plan exists and is approved
             plan = await self._get_and_validate_plan(db, plan_id, user_id)
             if not plan:
@@ -147,20 +219,28 @@ class ActionExecutorService:
             result = ExecutionResult(execution_id, plan_id)
             result.total_steps = len(plan.atomic_actions)
             self.active_executions[execution_id] = result
+            self.execution_controls[execution_id] = ExecutionControl()
 
             # Update plan status to executing
             await self._update_plan_status(db, plan_id, PlanStatus.EXECUTING)
 
-            # Start background execution
-            asyncio.create_task(
-                self._execute_plan_background(db, plan, execution_id, execution_options)
+            # Runs once the scheduler grants a slot
+            tenant = f"tenant:{tenant_id}" if tenant_id else f"user:{user_id}"
+            started = self.scheduler.submit(
+                execution_id,
+                tenant,
+                lambda: self._run_scheduled_execution(
+                    plan, execution_id, execution_options
+                ),
+                priority=execution_options.get("priority", DEFAULT_PRIORITY),
             )
 
             logger.info(
-                "Plan execution started",
+                "Plan execution started" if started else "Plan execution queued",
                 execution_id=execution_id,
                 plan_id=plan_id,
                 user_id=user_id,
+                tenant=tenant,
                 total_steps=result.total_steps,
             )
 
@@ -176,21 +256,41 @@ class ActionExecutorService:
             # Clean up if execution was created
             if execution_id in self.active_executions:
                 del self.active_executions[execution_id]
+            self.execution_controls.pop(execution_id, None)
             raise
 
+    async def _run_scheduled_execution(
+        self,
+        plan: ExecutionPlan,
+        execution_id: str,
+        execution_options: dict[str, Any],
+    ) -> None:
+        """Run an execution granted a slot, in its own database session."""
+        result = self.active_executions[execution_id]
+        result.started_at = datetime.utcnow()
+        if result.status == "queued":
+            result.status = "executing"
+
+        async with get_async_session_factory()() as db:
+            await self._execute_plan_background(
+                db, plan, execution_id, execution_options
+            )
+
     async def get_execution_status(self, execution_id: str) -> dict[str, Any] | None:
         """Get current status of an execution."""
         if execution_id not in self.active_executions:
-            return None
+            stored = await self._load_evicted_result(execution_id)
+            return stored["status"] if stored else None
 
         return self.active_executions[execution_id].to_dict()
 
     async def pause_execution(self, execution_id: str) -> bool:
-        """Pause an active execution."""
-        if execution_id not in self.active_executions:
+        """Pause an active execution before its next step."""
+        control = self.execution_controls.get(execution_id)
+        if control is None or control.cancelled:
             return False
 
-        self.paused_executions[execution_id] = True
+        control.pause()
         self.active_executions[execution_id].status = "paused"
 
         logger.info("Execution paused", execution_id=execution_id)
@@ -198,22 +298,34 @@ class ActionExecutorService:
 
     async def resume_execution(self, execution_id: str) -> bool:
         """Resume a paused execution."""
-        if execution_id not in self.active_executions:
+        control = self.execution_controls.get(execution_id)
+        if control is None or control.cancelled:
             return False
 
-        self.paused_executions[execution_id] = False
+        control.resume()
         self.active_executions[execution_id].status = "executing"
 
         logger.info("Execution resumed", execution_id=execution_id)
         return True
 
     async def cancel_execution(self, execution_id: str) -> bool:
-        """Cancel an active execution."""
+        """Cancel an active execution, interrupting its current step or wait."""
         if execution_id not in self.active_executions:
             return False
 
-        self.active_executions[execution_id].status = "cancelled"
-        self.active_executions[execution_id].completed_at = datetime.utcnow()
+        control = self.execution_controls.get(execution_id)
+        if control is not None:
+            control.cancel()
+        result = self.active_executions[execution_id]
+        result.status = "cancelled"
+        result.completed_at = datetime.utcnow()
+
+        # Never started, so nothing else will finish it
+        if self.scheduler.cancel(execution_id):
+            self.execution_controls.pop(execution_id, None)
+            self._mark_finished(execution_id)
+            async with get_async_session_factory()() as db:
+                await self._update_plan_status(db, result.plan_id, PlanStatus.CANCELLED)
 
         logger.info("Execution cancelled", execution_id=execution_id)
         return True
@@ -295,7 +407,8 @@ class ActionExecutorService:
     ) -> None:
         """Execute the plan in the background."""
         result = self.active_executions[execution_id]
-        context = None
+        control = self.execution_controls[execution_id]
+        lease = None
         page = None
 
         try:
@@ -303,8 +416,10 @@ class ActionExecutorService:
             if not browser_pool._initialized:
                 await browser_pool.initialize()
 
-            context = await browser_pool.acquire_context(f"execution-{execution_id}")
-            page = await context.new_page()
+            lease = await browser_pool.acquire_context(
+                f"execution-{execution_id}", target_url=plan.starting_url
+            )
+            page = await lease.new_page()
 
             # Configure page for automation
             await self._configure_page_for_execution(page)
@@ -314,101 +429,87 @@ class ActionExecutorService:
                 await page.goto(plan.starting_url, wait_until="domcontentloaded")
                 await self._take_screenshot(page, execution_id, "initial_page")
 
-            # Execute each action step
-            for action in plan.atomic_actions:
-                # Check if execution is paused
-                while self.paused_executions.get(execution_id, False):
-                    await asyncio.sleep(1)
-
-                # Check if execution was cancelled
-                if result.status == "cancelled":
+            # Execute each action step; runs of form fills go as one batch
+            for group in self._group_actions(plan.atomic_actions):
+                # Blocks while paused; raises once cancelled
+                try:
+                    await control.wait_if_paused()
+                except ExecutionCancelledError:
                     break
 
-                # Monitor execution health before each step
+                # Keep the browser lease alive while steps make progress
+                lease.renew()
+
+                # Monitor execution health before each step or batch
                 health_data = await self._monitor_execution_health(page, execution_id)
                 result.execution_logs.append(
                     {
                         "type": "health_check",
-                        "step_number": action.step_number,
+                        "step_number": group[0].step_number,
                         "data": health_data,
                         "timestamp": datetime.utcnow().isoformat(),
                     }
                 )
 
-                # Execute the action with retry logic
-                success = False
-                retry_count = 0
-                max_retries = action.max_retries or 3
-
-                while not success and retry_count <= max_retries:
+                batched: dict[int, bool] = {}
+                if len(group) > 1:
                     try:
-                        success = await self._execute_action(
-                            db, page, action, execution_id, execution_options
+                        batched = await self._execute_action_batch(
+                            db, page, group, execution_id
                         )
+                    except ExecutionCancelledError:
+                        break
+
+                aborted = False
+                for action in group:
+                    # Steps the batch could not fill run on their own
+                    if batched.get(action.step_number):
+                        success, retry_count = True, 0
+                    else:
+                        success, retry_count = await self._execute_with_retries(
+                            db, page, action, execution_id, execution_options, control
+                        )
+
+                    # Cancelled mid-step or mid-backoff
+                    if control.cancelled:
+                        aborted = True
+                        break
+
+                    result.current_step = action.step_number
 
-                        if not success and retry_count < max_retries:
-                            retry_count += 1
-                            logger.info(
-                                "Retrying action",
-                                execution_id=execution_id,
-                                step_number=action.step_number,
-                                retry_count=retry_count,
-                                max_retries=max_retries,
-                            )
-
-                            # Wait before retry
-                            await asyncio.sleep(action.retry_delay_seconds or 2)
-
-                            # Update action retry count in database
-                            await self._update_action_retry_count(
-                                db, action.id, retry_count
-                            )
-                        else:
-                            break
-
-                    except Exception as e:
+                    # Handle critical step failure
+                    if not success and action.is_critical:
+                        result.error_message = f"Critical step {action.step_number} failed: {action.description}"
                         logger.error(
-                            "Action execution error",
+                            "Critical step failed, aborting execution",
                             execution_id=execution_id,
                             step_number=action.step_number,
-                            retry_count=retry_count,
-                            error=str(e),
+                            description=action.description,
                         )
-                        if retry_count >= max_retries:
-                            break
-                        retry_count += 1
-                        await asyncio.sleep(action.retry_delay_seconds or 2)
-
-                result.current_step = action.step_number
-
-                # Handle critical step failure
-                if not success and action.is_critical:
-                    result.error_message = f"Critical step {action.step_number} failed: {action.description}"
-                    logger.error(
-                        "Critical step failed, aborting execution",
-                        execution_id=execution_id,
-                        step_number=action.step_number,
-                        description=action.description,
+                        aborted = True
+                        break
+
+                    # Log step completion
+                    result.execution_logs.append(
+                        {
+                            "type": "step_completed",
+                            "step_number": action.step_number,
+                            "success": success,
+                            "retry_count": retry_count,
+                            "batched": batched.get(action.step_number, False),
+                            "timestamp": datetime.utcnow().isoformat(),
+                        }
                     )
-                    break
 
-                # Log step completion
-                result.execution_logs.append(
-                    {
-                        "type": "step_completed",
-                        "step_number": action.step_number,
-                        "success": success,
-                        "retry_count": retry_count,
-                        "timestamp": datetime.utcnow().isoformat(),
-                    }
-                )
+                if aborted:
+                    break
 
                 # Send progress webhook notification
                 await self._send_execution_progress_webhook(
                     plan.user_id,
                     execution_id,
                     plan.id,
-                    action.step_number,
+                    result.current_step,
                     result.total_steps,
                 )
 
@@ -453,6 +554,8 @@ class ActionExecutorService:
 
         finally:
             result.completed_at = datetime.utcnow()
+            self.execution_controls.pop(execution_id, None)
+            self._mark_finished(execution_id)
 
             # Clean up browser resources
             if page:
@@ -461,11 +564,9 @@ class ActionExecutorService:
                 except:
                     pass
 
-            if context:
+            if lease:
                 try:
-                    await browser_pool.release_context(
-                        context, f"execution-{execution_id}"
-                    )
+                    await lease.release()
                 except:
                     pass
 
@@ -478,6 +579,192 @@ class ActionExecutorService:
                 total_steps=result.total_steps,
             )
 
+    def _group_actions(self, actions: list[AtomicAction]) -> list[list[AtomicAction]]:
+        """Group consecutive batchable form fills; other actions run alone."""
+        if not self.batching_enabled:
+            return [[action] for action in actions]
+        return group_action_runs(
+            actions, self.batch_executor.can_batch, self.max_batch_size
+        )
+
+    async def _execute_with_retries(
+        self,
+        db: AsyncSession,
+        page: Page,
+        action: AtomicAction,
+        execution_id: str,
+        execution_options: dict[str, Any],
+        control: ExecutionControl,
+    ) -> tuple[bool, int]:
+        """Execute one action, retrying failures; returns (success, retries)."""
+        success = False
+        retry_count = 0
+        max_retries = action.max_retries or 3
+
+        while not success and retry_count <= max_retries:
+            try:
+                success = await self._execute_action(
+                    db, page, action, execution_id, execution_options
+                )
+
+                if not success and retry_count < max_retries:
+                    retry_count += 1
+                    logger.info(
+                        "Retrying action",
+                        execution_id=execution_id,
+                        step_number=action.step_number,
+                        retry_count=retry_count,
+                        max_retries=max_retries,
+                    )
+
+                    await self._wait_before_retry(control, page, action, retry_count)
+
+                    # Update action retry count in database
+                    await self._update_action_retry_count(db, action.id, retry_count)
+                else:
+                    break
+
+            except ExecutionCancelledError:
+                break
+            except Exception as e:
+                logger.error(
+                    "Action execution error",
+                    execution_id=execution_id,
+                    step_number=action.step_number,
+                    retry_count=retry_count,
+                    error=str(e),
+                )
+                if retry_count >= max_retries:
+                    break
+                retry_count += 1
+                try:
+                    await self._wait_before_retry(control, page, action, retry_count)
+                except ExecutionCancelledError:
+                    break
+
+        return success, retry_count
+
+    async def _execute_action_batch(
+        self,
+        db: AsyncSession,
+        page: Page,
+        actions: list[AtomicAction],
+        execution_id: str,
+    ) -> dict[int, bool]:
+        """Fill a run of form fields at once; returns success per step number.
+
+        The batch shares one screenshot pair and one database write for its
+        filled steps. An empty result (fields in different forms, or the
+        batch failed) sends every step down the per-step path instead.
+        """
+        result = self.active_executions[execution_id]
+        control = self.execution_controls[execution_id]
+        started_at = datetime.utcnow()
+
+        before_screenshot = await self._take_screenshot(
+            page,
+            execution_id,
+            f"steps_{actions[0].step_number}_{actions[-1].step_number}_before",
+        )
+        try:
+            outcomes = await control.run(
+                asyncio.wait_for(
+                    self.batch_executor.execute_batch(page, actions),
+                    timeout=max(action.timeout_seconds for action in actions),
+                )
+            )
+        except ExecutionCancelledError:
+            raise
+        except Exception as e:
+            logger.warning(
+                "Action batch failed, executing steps individually",
+                execution_id=execution_id,
+                error=str(e),
+            )
+            return {}
+
+        if outcomes is None:
+            logger.info(
+                "Batched fields span several forms, executing steps individually",
+                execution_id=execution_id,
+                first_step=actions[0].step_number,
+            )
+            return {}
+
+        after_screenshot = await self._take_screenshot(
+            page,
+            execution_id,
+            f"steps_{actions[0].step_number}_{actions[-1].step_number}_after",
+        )
+
+        filled = [
+            action for action, success in zip(actions, outcomes, strict=True) if success
+        ]
+        await self._update_action_results_bulk(
+            db, [action.id for action in filled], before_screenshot, after_screenshot
+        )
+
+        completed_at = datetime.utcnow().isoformat()
+        for action in filled:
+            result.executed_actions.append(
+                {
+                    "step_number": action.step_number,
+                    "action_type": action.action_type.value,
+                    "success": True,
+                    "batched": True,
+                    "started_at": started_at.isoformat(),
+                    "completed_at": completed_at,
+                    "before_screenshot": before_screenshot,
+                    "after_screenshot": after_screenshot,
+                    "target_selector": action.target_selector,
+                }
+            )
+        result.execution_logs.append(
+            {
+                "type": "action_batch",
+                "step_numbers": [action.step_number for action in actions],
+                "filled": len(filled),
+                "duration_ms": int(
+                    (datetime.utcnow() - started_at).total_seconds() * 1000
+                ),
+                "timestamp": completed_at,
+            }
+        )
+
+        logger.info(
+            "Action batch executed",
+            execution_id=execution_id,
+            steps=len(actions),
+            filled=len(filled),
+        )
+        return {
+            action.step_number: success
+            for action, success in zip(actions, outcomes, strict=True)
+        }
+
+    async def _wait_before_retry(
+        self,
+        control: ExecutionControl,
+        page: Page,
+        action: AtomicAction,
+        retry_count: int,
+    ) -> None:
+        """Back off before a retry, waking early once the page has changed.
+
+        A missing target wakes the retry as soon as it appears; otherwise a
+        DOM mutation or a new request ends the wait. A page that is already
+        idle waits out the full delay.
+        """
+        delay = backoff_delay(
+            retry_count, action.retry_delay_seconds or 2, self.retry_backoff_cap
+        )
+        timeout_ms = int(delay * 1000)
+        if action.target_selector:
+            condition = wait_for_appearance(page, action.target_selector, timeout_ms)
+        else:
+            condition = wait_for_change(page, timeout_ms)
+        await control.sleep(delay, until=condition)
+
     async def _configure_page_for_execution(self, page: Page) -> None:
         """Configure page settings for reliable automation."""
         try:
@@ -537,9 +824,12 @@ class ActionExecutorService:
                     f"No executor found for action type: {action.action_type}"
                 )
 
-            # Execute the action with timeout
-            success = await asyncio.wait_for(
-                executor.execute(page, action), timeout=action.timeout_seconds
+            # Execute the action with timeout; cancellation abandons it
+            control = self.execution_controls[execution_id]
+            success = await control.run(
+                asyncio.wait_for(
+                    executor.execute(page, action), timeout=action.timeout_seconds
+                )
             )
 
             # Take after screenshot
@@ -586,6 +876,9 @@ class ActionExecutorService:
 
             return success
 
+        except ExecutionCancelledError:
+            raise
+
         except TimeoutError:
             error_msg = f"Action timed out after {action.timeout_seconds} seconds"
             await self._handle_action_failure(db, action, error_msg, execution_id, page)
@@ -657,6 +950,45 @@ class ActionExecutorService:
             )
             await db.rollback()
 
+    async def _update_action_results_bulk(
+        self,
+        db: AsyncSession,
+        action_ids: list[int],
+        before_screenshot: str | None,
+        after_screenshot: str | None,
+    ) -> None:
+        """Mark several actions completed with one bulk UPDATE."""
+        if not action_ids:
+            return
+        now = datetime.utcnow()
+        try:
+            await db.execute(
+                update(AtomicAction),
+                [
+                    {
+                        "id": action_id,
+                        "status": StepStatus.COMPLETED,
+                        "success": True,
+                        "error_message": None,
+                        "before_screenshot_path": before_screenshot,
+                        "after_screenshot_path": after_screenshot,
+                        "executed_at": now,
+                        "completed_at": now,
+                        "updated_at": now,
+                    }
+                    for action_id in action_ids
+                ],
+            )
+            await db.commit()
+
+        except Exception as e:
+            logger.error(
+                "Failed to update batched action results",
+                action_ids=action_ids,
+                error=str(e),
+            )
+            await db.rollback()
+
     async def _update_action_retry_count(
         self, db: AsyncSession, action_id: int, retry_count: int
     ) -> None:
@@ -769,7 +1101,7 @@ class ActionExecutorService:
                     f"Attempting page refresh recovery for step {action.step_number}"
                 )
                 await page.reload(wait_until="domcontentloaded")
-                await asyncio.sleep(2)
+                await wait_for_dom_quiet(page, timeout_ms=2000)
                 return True
 
             # Recovery strategy 2: Wait and retry for timeout errors
@@ -777,14 +1109,14 @@ class ActionExecutorService:
                 logger.info(
                     f"Attempting timeout recovery for step {action.step_number}"
                 )
-                await asyncio.sleep(5)
+                await wait_for_network_quiet(page, timeout_ms=5000)
                 return True
 
             # Recovery strategy 3: Scroll to top for element not found errors
             if "not found" in error_message.lower():
                 logger.info(f"Attempting scroll recovery for step {action.step_number}")
                 await page.evaluate("window.scrollTo(0, 0)")
-                await asyncio.sleep(1)
+                await wait_for_dom_quiet(page, quiet_ms=100, timeout_ms=1000)
                 return True
 
             return False
@@ -796,23 +1128,13 @@ class ActionExecutorService:
     async def _take_screenshot(
         self, page: Page, execution_id: str, name: str
     ) -> str | None:
-        """Take a screenshot and return the file path."""
-        try:
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-            filename = f"{execution_id}_{name}_{timestamp}.png"
-            filepath = self.screenshot_dir / filename
-
-            await page.screenshot(path=str(filepath), full_page=True)
-
-            # Store relative path for database
-            relative_path = f"screenshots/{filename}"
-
-            logger.debug("Screenshot taken", filepath=relative_path)
-            return relative_path
-
-        except Exception as e:
-            logger.warning("Failed to take screenshot", error=str(e))
-            return None
+        """Take a viewport screenshot and return its storage path."""
+        path = await screenshot_service.capture(page, quality=self.screenshot_quality)
+        if path:
+            logger.debug(
+                "Screenshot taken", execution_id=execution_id, name=name, path=path
+            )
+        return path
 
     async def _validate_action_success(
         self, page: Page, action: AtomicAction, execution_id: str
@@ -957,12 +1279,13 @@ class ActionExecutorService:
     async def get_execution_results(self, execution_id: str) -> dict[str, Any] | None:
         """Get detailed execution results after completion."""
         if execution_id not in self.active_executions:
-            return None
+            stored = await self._load_evicted_result(execution_id)
+            return stored["results"] if stored else None
 
         result = self.active_executions[execution_id]
 
         # Only return detailed results if execution is complete
-        if result.status == "executing":
+        if result.status in ("queued", "executing"):
             return None
 
         # Calculate performance metrics
@@ -1144,6 +1467,154 @@ class ActionExecutorService:
                 error=str(e),
             )
 
+    def _mark_finished(self, execution_id: str):
+        self.finished_executions[execution_id] = datetime.utcnow()
+        self.finished_executions.move_to_end(execution_id)
+
+    def _ensure_eviction_loop(self):
+        if self._eviction_task is None or self._eviction_task.done():
+            self._eviction_task = asyncio.create_task(self._eviction_loop())
+
+    async def _eviction_loop(self):
+        """Periodically move finished executions out of memory."""
+        interval = max(1, min(60, self.result_ttl_seconds))
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                await self.evict_finished_executions()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Error evicting finished executions", error=str(e))
+
+    async def evict_finished_executions(self, force: bool = False) -> int:
+        """Store finished executions past their TTL (or over the retention
+        limit) in Redis and drop them from memory."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.result_ttl_seconds)
+        overflow = len(self.finished_executions) - self.max_retained_results
+        expired = [
+            execution_id
+            for position, (execution_id, finished_at) in enumerate(
+                self.finished_executions.items()
+            )
+            if force or finished_at <= cutoff or position < overflow
+        ]
+
+        client = await self._get_redis()
+        for execution_id in expired:
+            result = self.active_executions.get(execution_id)
+            if result is not None and client is not None:
+                record = {
+                    "status": result.to_dict(),
+                    "results": await self.get_execution_results(execution_id),
+                }
+                try:
+                    await client.setex(
+                        f"{self.RESULT_PREFIX}{execution_id}",
+                        self.result_store_ttl_seconds,
+                        json.dumps(record, default=str),
+                    )
+                except Exception as e:
+                    logger.error(
+                        "Failed to store execution result",
+                        execution_id=execution_id,
+                        error=str(e),
+                    )
+
+            self.active_executions.pop(execution_id, None)
+            self.finished_executions.pop(execution_id, None)
+
+        self.results_evicted += len(expired)
+        if expired:
+            logger.info("Evicted finished executions", count=len(expired))
+        return len(expired)
+
+    async def _load_evicted_result(self, execution_id: str) -> dict[str, Any] | None:
+        client = await self._get_redis()
+        if client is None:
+            return None
+        try:
+            stored = await client.get(f"{self.RESULT_PREFIX}{execution_id}")
+            return json.loads(stored) if stored else None
+        except Exception as e:
+            logger.error(
+                "Failed to load execution result",
+                execution_id=execution_id,
+                error=str(e),
+            )
+            return None
+
+    async def _get_redis(self) -> redis.Redis | None:
+        """Lazily connect to Redis, where evicted results are kept."""
+        if self._redis_initialized:
+            return self.redis_client
+
+        self._redis_initialized = True
+        try:
+            self.redis_client = redis.from_url(
+                self.redis_url,
+                encoding="utf-8",
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+            )
+            await self.redis_client.ping()
+        except Exception as e:
+            logger.warning("Execution result store unavailable", error=str(e))
+            self.redis_client = None
+
+        return self.redis_client
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get execution service statistics."""
+        return {
+            "scheduler": self.scheduler.get_stats(),
+            "executions_in_memory": len(self.active_executions),
+            "finished_in_memory": len(self.finished_executions),
+            "results_evicted": self.results_evicted,
+        }
+
+    async def shutdown(self):
+        """Cancel running executions and store every result before exit."""
+        for execution_id, control in list(self.execution_controls.items()):
+            # Interrupted plans end as cancelled, not failed
+            result = self.active_executions.get(execution_id)
+            if result is not None:
+                result.status = "cancelled"
+            control.cancel()
+        dropped = await self.scheduler.shutdown()
+        for execution_id in dropped:
+            result = self.active_executions.get(execution_id)
+            if result is not None:
+                result.status = "cancelled"
+                result.completed_at = datetime.utcnow()
+                self._mark_finished(execution_id)
+                try:
+                    async with get_async_session_factory()() as db:
+                        await self._update_plan_status(
+                            db, result.plan_id, PlanStatus.CANCELLED
+                        )
+                except Exception as e:
+                    logger.error(
+                        "Failed to cancel queued plan",
+                        execution_id=execution_id,
+                        error=str(e),
+                    )
+
+        if self._eviction_task:
+            self._eviction_task.cancel()
+            await asyncio.gather(self._eviction_task, return_exceptions=True)
+            self._eviction_task = None
+
+        await self.evict_finished_executions(force=True)
+
+        if self.redis_client:
+            await self.redis_client.close()
+            self.redis_client = None
+        self._redis_initialized = False
+
+        logger.info("ActionExecutor service shutdown complete")
+
 
 # Global service instance
 action_executor_service = ActionExecutorService()
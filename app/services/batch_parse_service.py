@@ -0,0 +1,375 @@
+"""
+Batch parsing of many URLs submitted in one request.
+
+This service provides:
+- One bulk cache lookup and one bulk INSERT for every URL in a batch; cache
+  hits are recorded as completed tasks without being queued
+- Fan-out onto the shared parse worker pool with a per-batch concurrency cap
+- Aggregate batch progress from a single grouped query
+- Keyset-paginated results, also used for NDJSON streaming
+
+Batch membership is stored in the indexed ``Task.background_task_id``
+column, so progress and results are served by any API node.
+"""
+
+import asyncio
+import json
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+import structlog
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import get_async_session_factory
+from app.models.task import Task, TaskStatus
+from app.schemas.web_page import WebPageBatchParseRequest
+from app.services.parse_worker_pool import ParseQueueFullError, parse_worker_pool
+from app.services.task_status_service import TaskStatusService
+from app.services.webpage_cache_service import webpage_cache_service
+
+logger = structlog.get_logger(__name__)
+
+FINISHED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+
+class BatchParseService:
+    """Creates parse batches and dispatches them onto the parse worker pool."""
+
+    def __init__(self):
+        self.max_urls = getattr(settings, "PARSE_BATCH_MAX_URLS", 5000)
+        self.max_concurrency = getattr(settings, "PARSE_BATCH_MAX_CONCURRENCY", 20)
+        self.results_page_size = getattr(settings, "PARSE_BATCH_RESULTS_PAGE_SIZE", 100)
+
+        # Prefix of Task.background_task_id for batch members
+        self.BATCH_PREFIX = "parse-batch:"
+        self.QUEUE_NAME = "parse_batch"
+
+        # batch_id -> dispatcher feeding the worker pool
+        self.dispatchers: dict[str, asyncio.Task] = {}
+        # Tasks whose dispatch was cut short by shutdown; failed on shutdown
+        self._undispatched: list[int] = []
+        self._stopping = False
+
+        # Stats
+        self.batches_created = 0
+        self.urls_submitted = 0
+        self.cache_hits = 0
+
+    def batch_key(self, batch_id: str) -> str:
+        return f"{self.BATCH_PREFIX}{batch_id}"
+
+    async def create_batch(
+        self, db: AsyncSession, user_id: int, request: WebPageBatchParseRequest
+    ) -> dict[str, Any]:
+        """Record every URL of the batch as a task and start dispatching.
+
+        Duplicate URLs are parsed once. Cached results complete their tasks
+        immediately.
+        """
+        urls = list(dict.fromkeys(str(url) for url in request.urls))
+        if len(urls) > self.max_urls:
+            raise ValueError(f"Batch exceeds {self.max_urls} URLs")
+
+        batch_id = uuid.uuid4().hex
+        cached = await self._lookup_cached(urls, request)
+        now = datetime.utcnow()
+
+        rows = []
+        for url in urls:
+            row = {
+                "user_id": user_id,
+                "title": f"Parse webpage: {url}",
+                "description": f"Semantic analysis and element extraction for {url}",
+                "goal": "Extract interactive elements and analyze webpage structure",
+                "target_url": url,
+                "priority": request.priority,
+                "status": TaskStatus.PENDING,
+                "background_task_id": self.batch_key(batch_id),
+                "queue_name": self.QUEUE_NAME,
+                "max_retries": 3,
+                "timeout_seconds": 300,
+                "require_confirmation": False,
+                "allow_sensitive_actions": False,
+            }
+            result = cached.get(url)
+            if result is not None:
+                row.update(
+                    status=TaskStatus.COMPLETED,
+                    progress_percentage=100,
+                    result_data=json.loads(result.json()),
+                    processing_completed_at=now,
+                    completed_at=now,
+                )
+            rows.append(row)
+
+        # One multi-row INSERT; ids come back in parameter order
+        inserted = await db.execute(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True), rows
+        )
+        task_ids = list(inserted.scalars())
+        await db.commit()
+
+        jobs = [
+            (task_id, url)
+            for task_id, url in zip(task_ids, urls, strict=True)
+            if url not in cached
+        ]
+        concurrency = min(request.max_concurrency, self.max_concurrency)
+        if jobs:
+            self.dispatchers[batch_id] = asyncio.create_task(
+                self._dispatch(batch_id, jobs, request, concurrency)
+            )
+
+        self.batches_created += 1
+        self.urls_submitted += len(urls)
+        self.cache_hits += len(cached)
+        logger.info(
+            "Parse batch created",
+            batch_id=batch_id,
+            user_id=user_id,
+            urls=len(urls),
+            cached=len(cached),
+            concurrency=concurrency,
+        )
+
+        return {
+            "batch_id": batch_id,
+            "total": len(urls),
+            "cached": len(cached),
+            "queued": len(jobs),
+            "max_concurrency": concurrency,
+        }
+
+    async def _lookup_cached(
+        self, urls: list[str], request: WebPageBatchParseRequest
+    ) -> dict[str, Any]:
+        """Map URLs to cached parse results with one bulk lookup."""
+        if request.force_refresh:
+            return {}
+        if not webpage_cache_service._initialized:
+            await webpage_cache_service.initialize()
+
+        options = request.parse_request(urls[0]).dict()
+        keys = {
+            url: webpage_cache_service._generate_cache_key(url, options) for url in urls
+        }
+        hits = await webpage_cache_service.get_cached_results_by_keys(
+            list(keys.values())
+        )
+        return {url: hits[key] for url, key in keys.items() if key in hits}
+
+    async def _dispatch(
+        self,
+        batch_id: str,
+        jobs: list[tuple[int, str]],
+        request: WebPageBatchParseRequest,
+        concurrency: int,
+    ):
+        """Feed a batch into the worker pool, at most ``concurrency`` at a time."""
+        slots = asyncio.Semaphore(concurrency)
+        dispatched = 0
+        interrupted = False
+        try:
+            for task_id, url in jobs:
+                await slots.acquire()
+                try:
+                    done = await parse_worker_pool.enqueue(
+                        task_id, url, request.parse_request(url), request.priority
+                    )
+                except ParseQueueFullError:
+                    # The pool is draining for shutdown
+                    slots.release()
+                    interrupted = True
+                    break
+                done.add_done_callback(lambda _: slots.release())
+                dispatched += 1
+
+            # Wait for the last jobs before reporting the batch dispatched
+            for _ in range(concurrency):
+                await slots.acquire()
+
+            logger.info(
+                "Parse batch dispatched",
+                batch_id=batch_id,
+                dispatched=dispatched,
+                skipped=len(jobs) - dispatched,
+            )
+        except asyncio.CancelledError:
+            logger.info("Parse batch dispatch stopped", batch_id=batch_id)
+            raise
+        finally:
+            self.dispatchers.pop(batch_id, None)
+            if interrupted or self._stopping:
+                self._undispatched.extend(task_id for task_id, _ in jobs[dispatched:])
+
+    async def cancel_batch(self, db: AsyncSession, batch_id: str, user_id: int) -> int:
+        """Stop dispatching a batch and cancel its pending tasks.
+
+        Jobs already in the worker pool queue are skipped when they come up,
+        as workers only claim tasks that are still pending.
+        """
+        result = await db.execute(
+            update(Task)
+            .where(
+                Task.background_task_id == self.batch_key(batch_id),
+                Task.user_id == user_id,
+                Task.status == TaskStatus.PENDING,
+            )
+            .values(status=TaskStatus.CANCELLED, updated_at=datetime.utcnow())
+        )
+        await db.commit()
+
+        # Only the batch owner can have pending tasks in it
+        dispatcher = self.dispatchers.get(batch_id)
+        if result.rowcount and dispatcher is not None:
+            dispatcher.cancel()
+        return result.rowcount
+
+    async def get_batch_progress(
+        self, db: AsyncSession, batch_id: str, user_id: int
+    ) -> dict[str, Any] | None:
+        """Aggregate progress of every task in a batch."""
+        result = await db.execute(
+            select(
+                Task.status,
+                func.count(Task.id),
+                func.coalesce(func.sum(Task.progress_percentage), 0),
+            )
+            .where(
+                Task.background_task_id == self.batch_key(batch_id),
+                Task.user_id == user_id,
+            )
+            .group_by(Task.status)
+        )
+        rows = result.all()
+        if not rows:
+            return None
+
+        counts = {status.value: count for status, count, _ in rows}
+        total = sum(counts.values())
+        finished = sum(counts.get(status.value, 0) for status in FINISHED_STATUSES)
+        # Finished tasks count as fully progressed whatever their last report
+        progress = sum(
+            count * 100 if status in FINISHED_STATUSES else progress_sum
+            for status, count, progress_sum in rows
+        )
+
+        return {
+            "batch_id": batch_id,
+            "total": total,
+            "finished": finished,
+            "status_counts": counts,
+            "progress_percentage": round(progress / total, 1),
+            "dispatching": batch_id in self.dispatchers,
+            "done": finished == total,
+        }
+
+    async def get_batch_results(
+        self,
+        db: AsyncSession,
+        batch_id: str,
+        user_id: int,
+        after_task_id: int = 0,
+        limit: int | None = None,
+        finished_only: bool = False,
+    ) -> list[dict[str, Any]]:
+        """One page of batch results, ordered by task id after a cursor."""
+        query = (
+            select(
+                Task.id,
+                Task.target_url,
+                Task.status,
+                Task.result_data,
+                Task.error_message,
+            )
+            .where(
+                Task.background_task_id == self.batch_key(batch_id),
+                Task.user_id == user_id,
+                Task.id > after_task_id,
+            )
+            .order_by(Task.id)
+            .limit(limit or self.results_page_size)
+        )
+        if finished_only:
+            query = query.where(Task.status.in_(FINISHED_STATUSES))
+
+        result = await db.execute(query)
+        return [
+            {
+                "task_id": row.id,
+                "url": row.target_url,
+                "status": row.status.value,
+                "result": (
+                    row.result_data if row.status == TaskStatus.COMPLETED else None
+                ),
+                "error_message": row.error_message,
+            }
+            for row in result
+        ]
+
+    async def iter_batch_results(
+        self,
+        db: AsyncSession,
+        batch_id: str,
+        user_id: int,
+        finished_only: bool = False,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield every result of a batch, one page per query."""
+        after_task_id = 0
+        while True:
+            page = await self.get_batch_results(
+                db, batch_id, user_id, after_task_id, finished_only=finished_only
+            )
+            for entry in page:
+                yield entry
+            if len(page) < self.results_page_size:
+                return
+            after_task_id = page[-1]["task_id"]
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get batch parsing statistics."""
+        return {
+            "active_batches": len(self.dispatchers),
+            "batches_created": self.batches_created,
+            "urls_submitted": self.urls_submitted,
+            "cache_hits": self.cache_hits,
+        }
+
+    async def shutdown(self):
+        """Stop dispatching and fail the tasks that were never dispatched.
+
+        Dispatchers only live in this process, so nothing would pick those
+        tasks up after a restart. Jobs already queued are drained by the pool.
+        """
+        self._stopping = True
+        for dispatcher in list(self.dispatchers.values()):
+            dispatcher.cancel()
+        await asyncio.gather(*list(self.dispatchers.values()), return_exceptions=True)
+        self.dispatchers.clear()
+
+        if self._undispatched:
+            try:
+                session_factory = get_async_session_factory()
+                async with session_factory() as db:
+                    await TaskStatusService.fail_pending_tasks(
+                        db,
+                        self._undispatched,
+                        "Batch dispatch stopped by server shutdown",
+                    )
+            except Exception as e:
+                logger.error(
+                    "Failed to record undispatched batch tasks",
+                    tasks=len(self._undispatched),
+                    error=str(e),
+                )
+            self._undispatched = []
+
+        logger.info("Batch parse service shutdown complete")
+
+
+# Global batch parse service instance
+batch_parse_service = BatchParseService()
@@ -0,0 +1,224 @@
+"""
+Parse Coalescer for single-flight deduplication of concurrent parses.
+
+This service provides:
+- In-process single-flight: concurrent parses of one cache key share a future
+- Cross-node single-flight through a Redis lock and a result channel
+- Fallback to an independent parse when the leader fails or times out
+- Coalescing hit/miss statistics
+"""
+
+import asyncio
+import json
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import structlog
+
+from app.core.config import settings
+from app.schemas.web_page import WebPageParseResponse
+from app.services.webpage_cache_service import webpage_cache_service
+
+logger = structlog.get_logger(__name__)
+
+# Delete the lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class ParseCoalescer:
+    """Deduplicates concurrent parses of the same URL and options."""
+
+    def __init__(self):
+        self.enabled = getattr(settings, "PARSE_COALESCING_ENABLED", True)
+        self.distributed = getattr(settings, "PARSE_COALESCING_DISTRIBUTED", True)
+        self.lock_ttl_seconds = getattr(
+            settings, "PARSE_COALESCING_LOCK_TTL_SECONDS", 120
+        )
+
+        # Redis key prefixes
+        self.LOCK_PREFIX = "inflight:lock:"
+        self.CHANNEL_PREFIX = "inflight:result:"
+
+        # cache_key -> future resolved by the in-process leader
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        # Stats
+        self.leader_parses = 0
+        self.local_followers = 0
+        self.remote_followers = 0
+        self.remote_fallbacks = 0
+
+    async def run(
+        self,
+        cache_key: str,
+        producer: Callable[[], Awaitable[WebPageParseResponse]],
+    ) -> tuple[WebPageParseResponse, bool]:
+        """Run ``producer`` once per cache key.
+
+        Returns the result and whether it was produced by another request.
+        """
+        if not self.enabled:
+            return await producer(), False
+
+        future = self._inflight.get(cache_key)
+        if future is not None:
+            self.local_followers += 1
+            logger.info("Attached to in-flight parse", cache_key=cache_key)
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled, not us: take over
+                return await self.run(cache_key, producer)
+            return result.copy(deep=True), True
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark exceptions as retrieved when nobody else is waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[cache_key] = future
+
+        try:
+            result, coalesced = await self._run_distributed(cache_key, producer)
+            future.set_result(result)
+            return result, coalesced
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    async def _run_distributed(
+        self,
+        cache_key: str,
+        producer: Callable[[], Awaitable[WebPageParseResponse]],
+    ) -> tuple[WebPageParseResponse, bool]:
+        """Elect one leader across API nodes using a Redis lock."""
+        client = webpage_cache_service.redis_client
+        if not self.distributed or not client:
+            self.leader_parses += 1
+            return await producer(), False
+
+        lock_key = f"{self.LOCK_PREFIX}{cache_key}"
+        channel = f"{self.CHANNEL_PREFIX}{cache_key}"
+        token = str(uuid.uuid4())
+
+        try:
+            acquired = await client.set(
+                lock_key, token, nx=True, ex=self.lock_ttl_seconds
+            )
+        except Exception as e:
+            logger.warning(
+                "Coalescing lock unavailable, parsing independently",
+                cache_key=cache_key,
+                error=str(e),
+            )
+            self.leader_parses += 1
+            return await producer(), False
+
+        if acquired:
+            self.leader_parses += 1
+            status = "failed"
+            try:
+                result = await producer()
+                status = "done"
+                return result, False
+            finally:
+                await self._publish_and_release(
+                    client, lock_key, channel, token, status
+                )
+
+        result = await self._wait_for_remote_leader(client, cache_key, channel)
+        if result is not None:
+            self.remote_followers += 1
+            return result, True
+
+        # Leader failed, timed out or could not cache: parse ourselves
+        self.remote_fallbacks += 1
+        logger.info(
+            "Remote leader unavailable, parsing independently", cache_key=cache_key
+        )
+        return await producer(), False
+
+    async def _publish_and_release(
+        self, client: Any, lock_key: str, channel: str, token: str, status: str
+    ):
+        """Notify remote followers and release the lock."""
+        try:
+            await client.publish(channel, json.dumps({"status": status}))
+            await client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except Exception as e:
+            logger.warning("Failed to release coalescing lock", error=str(e))
+
+    async def _wait_for_remote_leader(
+        self, client: Any, cache_key: str, channel: str
+    ) -> WebPageParseResponse | None:
+        """Wait for another node's parse and read its cached result."""
+        pubsub = client.pubsub()
+        try:
+            # Subscribe before checking the cache so a completion is not missed
+            await pubsub.subscribe(channel)
+
+            cached = await webpage_cache_service.get_cached_result_by_key(cache_key)
+            if cached is not None:
+                return cached
+
+            logger.info("Waiting for remote in-flight parse", cache_key=cache_key)
+
+            async def _next_status() -> str:
+                # Poll with a short timeout; a blocking listen() would trip the
+                # client's socket_timeout long before the lock expires
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if message and message.get("type") == "message":
+                        return json.loads(message["data"]).get("status", "failed")
+
+            status = await asyncio.wait_for(
+                _next_status(), timeout=self.lock_ttl_seconds
+            )
+            if status != "done":
+                return None
+
+            return await webpage_cache_service.get_cached_result_by_key(cache_key)
+
+        except TimeoutError:
+            logger.warning("Timed out waiting for remote parse", cache_key=cache_key)
+            return None
+        except Exception as e:
+            logger.warning(
+                "Failed waiting for remote parse", cache_key=cache_key, error=str(e)
+            )
+            return None
+        finally:
+            try:
+                await pubsub.unsubscribe(channel)
+                await pubsub.close()
+            except Exception:
+                pass
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get coalescing statistics."""
+        return {
+            "enabled": self.enabled,
+            "distributed": self.distributed,
+            "in_flight_keys": len(self._inflight),
+            "leader_parses": self.leader_parses,
+            "local_followers": self.local_followers,
+            "remote_followers": self.remote_followers,
+            "remote_fallbacks": self.remote_fallbacks,
+        }
+
+
+# Global parse coalescer instance
+parse_coalescer = ParseCoalescer()
@@ -0,0 +1,330 @@
+"""
+Parse Worker Pool for bounded, prioritized webpage parsing.
+
+This service provides:
+- A fixed number of asyncio parse workers on the application event loop
+- Priority queue keyed on Task.priority (FIFO within a priority)
+- Backpressure with a Retry-After estimate when the queue is full
+- Awaitable submission for batch dispatchers that wait for queue space and
+  job completion instead of being rejected
+- Graceful drain of queued and in-flight parses on shutdown
+"""
+
+import asyncio
+import itertools
+import math
+import time
+from typing import Any
+
+import structlog
+
+from app.core.config import settings
+from app.db.session import get_async_session, get_async_session_factory
+from app.models.task import TaskPriority
+from app.schemas.web_page import WebPageParseRequest
+
+logger = structlog.get_logger(__name__)
+
+# Lower rank is served first
+PRIORITY_RANK = {
+    TaskPriority.URGENT: 0,
+    TaskPriority.HIGH: 1,
+    TaskPriority.MEDIUM: 2,
+    TaskPriority.LOW: 3,
+}
+
+
+class ParseQueueFullError(Exception):
+    """Raised when the parse queue cannot accept more work."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Parse queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ParseWorkerPool:
+    """Runs webpage parsing jobs on a bounded pool of asyncio workers."""
+
+    def __init__(self):
+        self.concurrency = getattr(settings, "PARSE_WORKER_CONCURRENCY", 5)
+        self.max_queue_size = getattr(settings, "PARSE_QUEUE_MAX_SIZE", 100)
+        self.drain_timeout_seconds = getattr(
+            settings, "PARSE_WORKER_DRAIN_TIMEOUT_SECONDS", 60
+        )
+
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue(
+            maxsize=self.max_queue_size
+        )
+        self.workers: list[asyncio.Task] = []
+        self.in_flight: dict[int, float] = {}  # task_id -> started monotonic time
+        self._sequence = itertools.count()
+        self._accepting = True
+        self._initialized = False
+
+        # Stats
+        self.jobs_submitted = 0
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self.jobs_rejected = 0
+        self.jobs_skipped = 0
+        self._avg_duration_seconds = 30.0  # Seed with the advertised estimate
+
+    async def initialize(self):
+        """Start the parse workers."""
+        if self._initialized:
+            return
+
+        self._accepting = True
+        self.workers = [
+            asyncio.create_task(self._worker(worker_index))
+            for worker_index in range(self.concurrency)
+        ]
+
+        self._initialized = True
+        logger.info(
+            "Parse worker pool initialized",
+            concurrency=self.concurrency,
+            max_queue_size=self.max_queue_size,
+        )
+
+    def retry_after_seconds(self) -> int:
+        """Estimate how long until queue capacity frees up."""
+        backlog = self.queue.qsize() + len(self.in_flight)
+        waves = math.ceil(backlog / max(1, self.concurrency))
+        return max(1, int(waves * self._avg_duration_seconds / 2))
+
+    def check_capacity(self):
+        """Raise ParseQueueFullError if a new job would be rejected."""
+        if not self._accepting or self.queue.full():
+            self.jobs_rejected += 1
+            raise ParseQueueFullError(self.retry_after_seconds())
+
+    async def submit(
+        self,
+        task_id: int,
+        url: str,
+        options: WebPageParseRequest,
+        priority: TaskPriority = TaskPriority.MEDIUM,
+    ):
+        """Queue a parse job without waiting for it to run."""
+        if not self._initialized:
+            await self.initialize()
+
+        self.check_capacity()
+
+        rank = PRIORITY_RANK.get(priority, PRIORITY_RANK[TaskPriority.MEDIUM])
+        job = {"task_id": task_id, "url": url, "options": options}
+
+        try:
+            self.queue.put_nowait((rank, next(self._sequence), job))
+        except asyncio.QueueFull:
+            self.jobs_rejected += 1
+            raise ParseQueueFullError(self.retry_after_seconds())
+
+        self.jobs_submitted += 1
+        logger.info(
+            "Parse job queued",
+            task_id=task_id,
+            priority=getattr(priority, "value", priority),
+            queue_depth=self.queue.qsize(),
+        )
+
+    async def enqueue(
+        self,
+        task_id: int,
+        url: str,
+        options: WebPageParseRequest,
+        priority: TaskPriority = TaskPriority.MEDIUM,
+    ) -> asyncio.Future:
+        """Queue a parse job, waiting for queue space rather than rejecting.
+
+        Returns a future resolved with True (parsed) or False (failed) once
+        the job has run.
+        """
+        if not self._initialized:
+            await self.initialize()
+        if not self._accepting:
+            raise ParseQueueFullError(self.retry_after_seconds())
+
+        rank = PRIORITY_RANK.get(priority, PRIORITY_RANK[TaskPriority.MEDIUM])
+        done = asyncio.get_running_loop().create_future()
+        job = {"task_id": task_id, "url": url, "options": options, "done": done}
+
+        await self.queue.put((rank, next(self._sequence), job))
+        self.jobs_submitted += 1
+        return done
+
+    async def _worker(self, worker_index: int):
+        """Consume parse jobs until cancelled."""
+        while True:
+            _, _, job = await self.queue.get()
+            try:
+                await self._run_job(job)
+            except Exception as e:
+                logger.error(
+                    "Parse worker job crashed",
+                    worker=worker_index,
+                    task_id=job["task_id"],
+                    error=str(e),
+                )
+            finally:
+                self.queue.task_done()
+
+    async def _run_job(self, job: dict[str, Any]):
+        """Parse one webpage inside its own database session."""
+        from app.services.task_status_service import TaskStatusService
+        from app.services.web_parser import web_parser_service
+
+        task_id = job["task_id"]
+        url = job["url"]
+        started = time.monotonic()
+        self.in_flight[task_id] = started
+        claimed = False
+        succeeded = False
+
+        try:
+            async for db in get_async_session():
+                # Tasks cancelled while queued are skipped, not parsed
+                if not await TaskStatusService.claim_pending_task(
+                    db, task_id, f"webparser-{task_id}"
+                ):
+                    self.jobs_skipped += 1
+                    break
+                claimed = True
+
+                try:
+                    await web_parser_service.parse_webpage_async(
+                        db, task_id, url, job["options"]
+                    )
+                    self.jobs_completed += 1
+                    succeeded = True
+                    logger.info("Parse job completed", task_id=task_id, url=url)
+
+                except Exception as e:
+                    # parse_webpage_async has already recorded the failure
+                    self.jobs_failed += 1
+                    logger.error(
+                        "Parse job failed", task_id=task_id, url=url, error=str(e)
+                    )
+
+                # Only one session is needed per job
+                break
+        finally:
+            if claimed:
+                duration = time.monotonic() - started
+                # Exponential moving average used for Retry-After estimates
+                self._avg_duration_seconds = (
+                    0.8 * self._avg_duration_seconds + 0.2 * duration
+                )
+            self.in_flight.pop(task_id, None)
+
+            done = job.get("done")
+            if done is not None and not done.done():
+                done.set_result(succeeded)
+
+    def _abandon_queued(self) -> list[int]:
+        """Empty the queue, resolving awaitable jobs as not parsed."""
+        abandoned = []
+        while not self.queue.empty():
+            _, _, job = self.queue.get_nowait()
+            self.queue.task_done()
+            abandoned.append(job["task_id"])
+
+            done = job.get("done")
+            if done is not None and not done.done():
+                done.set_result(False)
+        return abandoned
+
+    async def _fail_abandoned(
+        self,
+        task_ids: list[int],
+        error_message: str = "Parsing did not start before server shutdown",
+        interrupted: bool = False,
+    ):
+        """Record abandoned tasks as failed so they can be retried."""
+        from app.services.task_status_service import TaskStatusService
+
+        try:
+            session_factory = get_async_session_factory()
+            async with session_factory() as db:
+                await TaskStatusService.fail_pending_tasks(
+                    db, task_ids, error_message, include_in_progress=interrupted
+                )
+        except Exception as e:
+            logger.error(
+                "Failed to record abandoned parse jobs",
+                tasks=len(task_ids),
+                error=str(e),
+            )
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get worker pool statistics."""
+        return {
+            "concurrency": self.concurrency,
+            "queue_depth": self.queue.qsize(),
+            "max_queue_size": self.max_queue_size,
+            "in_flight": len(self.in_flight),
+            "jobs_submitted": self.jobs_submitted,
+            "jobs_completed": self.jobs_completed,
+            "jobs_failed": self.jobs_failed,
+            "jobs_rejected": self.jobs_rejected,
+            "jobs_skipped": self.jobs_skipped,
+            "average_duration_seconds": round(self._avg_duration_seconds, 2),
+            "accepting": self._accepting,
+            "initialized": self._initialized,
+        }
+
+    async def shutdown(self, drain_timeout: float | None = None):
+        """Stop accepting work, drain the queue, then stop the workers."""
+        if not self._initialized:
+            return
+
+        self._accepting = False
+        timeout = (
+            drain_timeout if drain_timeout is not None else self.drain_timeout_seconds
+        )
+
+        logger.info(
+            "Draining parse worker pool",
+            queue_depth=self.queue.qsize(),
+            in_flight=len(self.in_flight),
+            timeout_seconds=timeout,
+        )
+
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+        except TimeoutError:
+            logger.warning(
+                "Parse worker pool drain timed out",
+                queue_depth=self.queue.qsize(),
+                in_flight=len(self.in_flight),
+            )
+
+        # Parses still running past the timeout are cut short; their tasks are
+        # already in progress and would otherwise never leave that state
+        interrupted = list(self.in_flight)
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+
+        # Jobs never started still have dispatchers awaiting them, and tasks
+        # no restarted process will pick up
+        abandoned = self._abandon_queued()
+        if abandoned:
+            logger.warning("Parse jobs abandoned at shutdown", jobs=len(abandoned))
+            await self._fail_abandoned(abandoned)
+        if interrupted:
+            logger.warning("Parse jobs interrupted at shutdown", jobs=len(interrupted))
+            await self._fail_abandoned(
+                interrupted,
+                "Parsing was interrupted by server shutdown",
+                interrupted=True,
+            )
+
+        self.workers = []
+        self._initialized = False
+        logger.info("Parse worker pool shutdown completed")
+
+
+# Global parse worker pool instance
+parse_worker_pool = ParseWorkerPool()
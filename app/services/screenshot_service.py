@@ -0,0 +1,325 @@
+"""
+Screenshot capture and storage for parsing and plan execution.
+
+This module provides:
+- JPEG, WebP or PNG output with configurable quality
+- Full-page, viewport-only, clip-rectangle and element capture modes
+- Hashing, transcoding and storage writes on a dedicated thread pool, with
+  writes completing in the background so callers only wait for the capture
+- Content-addressed keys, so identical frames (e.g. before/after a step that
+  changed nothing) are stored once
+- Pluggable storage: a local directory or an S3-compatible bucket
+
+WebP needs Pillow to transcode the browser's PNG output; without it captures
+fall back to JPEG.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import structlog
+from playwright.async_api import Locator, Page
+
+from app.core.config import settings
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+logger = structlog.get_logger(__name__)
+
+SCREENSHOT_FORMATS = {
+    "jpeg": ("jpg", "image/jpeg"),
+    "png": ("png", "image/png"),
+    "webp": ("webp", "image/webp"),
+}
+SCREENSHOT_MODES = ("full_page", "viewport", "clip", "element")
+
+# Content hashes remembered for dedup without asking the storage backend
+DEDUP_INDEX_LIMIT = 10000
+
+
+class ScreenshotStorage(ABC):
+    """Blocking storage backend; called from the screenshot thread pool."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether a screenshot is already stored under the key."""
+        pass
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        """Store a screenshot under the key."""
+        pass
+
+    @abstractmethod
+    def reference(self, key: str) -> str:
+        """Path or URL recorded for a stored screenshot."""
+        pass
+
+
+class LocalScreenshotStorage(ScreenshotStorage):
+    """Stores screenshots under a local directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def reference(self, key: str) -> str:
+        return f"{self.directory}/{key}"
+
+
+class S3ScreenshotStorage(ScreenshotStorage):
+    """Stores screenshots in an S3-compatible bucket (AWS, MinIO, ...)."""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str | None = None):
+        if boto3 is None:
+            raise RuntimeError("S3 screenshot storage requires boto3")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.endpoint_url = endpoint_url
+        self.client = boto3.client("s3", endpoint_url=endpoint_url or None)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except Exception:
+            return False
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Body=data,
+            ContentType=content_type,
+        )
+
+    def reference(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self._object_key(key)}"
+
+
+def create_storage() -> ScreenshotStorage:
+    """Build the configured storage backend, falling back to local disk."""
+    backend = getattr(settings, "SCREENSHOT_STORAGE_BACKEND", "local")
+    directory = getattr(settings, "SCREENSHOT_DIR", "screenshots")
+    if backend == "s3":
+        try:
+            return S3ScreenshotStorage(
+                bucket=getattr(settings, "SCREENSHOT_S3_BUCKET", ""),
+                prefix=getattr(settings, "SCREENSHOT_S3_PREFIX", "screenshots"),
+                endpoint_url=getattr(settings, "SCREENSHOT_S3_ENDPOINT_URL", None),
+            )
+        except Exception as e:
+            logger.warning(
+                "S3 screenshot storage unavailable, using local disk", error=str(e)
+            )
+    return LocalScreenshotStorage(directory)
+
+
+class ScreenshotService:
+    """Captures screenshots and stores them without blocking the event loop."""
+
+    def __init__(self, storage: ScreenshotStorage | None = None):
+        self.format = getattr(settings, "SCREENSHOT_FORMAT", "jpeg")
+        self.quality = getattr(settings, "SCREENSHOT_QUALITY", 80)
+        self.mode = getattr(settings, "SCREENSHOT_MODE", "viewport")
+        self.dedup_enabled = getattr(settings, "SCREENSHOT_DEDUP_ENABLED", True)
+
+        if self.format not in SCREENSHOT_FORMATS:
+            logger.warning("Unknown screenshot format, using jpeg", format=self.format)
+            self.format = "jpeg"
+        if self.format == "webp" and Image is None:
+            logger.warning("WebP screenshots need Pillow, using jpeg")
+            self.format = "jpeg"
+        if self.mode not in SCREENSHOT_MODES:
+            logger.warning("Unknown screenshot mode, using viewport", mode=self.mode)
+            self.mode = "viewport"
+
+        self._storage = storage
+        self._executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "SCREENSHOT_IO_WORKERS", 4),
+            thread_name_prefix="screenshot-io",
+        )
+        # content key -> None, least recently seen first
+        self._stored_keys: OrderedDict[str, None] = OrderedDict()
+        self._pending_writes: set[asyncio.Task] = set()
+
+        # Stats
+        self.captures = 0
+        self.failures = 0
+        self.dedup_hits = 0
+        self.bytes_written = 0
+        self.capture_ms_total = 0.0
+
+    @property
+    def storage(self) -> ScreenshotStorage:
+        if self._storage is None:
+            self._storage = create_storage()
+        return self._storage
+
+    def _screenshot_options(
+        self, image_format: str, quality: int, mode: str, clip: dict | None
+    ) -> dict[str, Any]:
+        # Playwright encodes PNG or JPEG; WebP is transcoded from lossless PNG
+        options: dict[str, Any] = {"type": "jpeg" if image_format == "jpeg" else "png"}
+        if image_format == "jpeg":
+            options["quality"] = quality
+        if mode == "full_page":
+            options["full_page"] = True
+        elif mode == "clip" and clip:
+            options["clip"] = clip
+        return options
+
+    def _encode(self, raw: bytes, image_format: str, quality: int) -> bytes:
+        if image_format != "webp":
+            return raw
+        with Image.open(io.BytesIO(raw)) as image:
+            output = io.BytesIO()
+            image.save(output, format="WEBP", quality=quality, method=4)
+            return output.getvalue()
+
+    def _prepare(
+        self, raw: bytes, image_format: str, quality: int
+    ) -> tuple[str, bytes]:
+        data = self._encode(raw, image_format, quality)
+        digest = hashlib.sha256(data).hexdigest()
+        extension = SCREENSHOT_FORMATS[image_format][0]
+        return f"{digest[:2]}/{digest}.{extension}", data
+
+    def _store(self, key: str, data: bytes, content_type: str) -> bool:
+        if self.dedup_enabled and self.storage.exists(key):
+            return False
+        self.storage.put(key, data, content_type)
+        return True
+
+    async def capture(
+        self,
+        page: Page,
+        mode: str | None = None,
+        clip: dict[str, float] | None = None,
+        element: Locator | None = None,
+        image_format: str | None = None,
+        quality: int | None = None,
+    ) -> str | None:
+        """Capture the page (or ``element``) and return its storage reference.
+
+        The write finishes in the background; the reference is valid as soon
+        as it is returned since keys are derived from the image content.
+        """
+        image_format = image_format or self.format
+        if image_format == "webp" and Image is None:
+            image_format = "jpeg"
+        quality = quality or self.quality
+        mode = "element" if element is not None else (mode or self.mode)
+        loop = asyncio.get_running_loop()
+
+        try:
+            started = loop.time()
+            options = self._screenshot_options(image_format, quality, mode, clip)
+            if element is not None:
+                options.pop("full_page", None)
+                raw = await element.screenshot(**options)
+            else:
+                raw = await page.screenshot(**options)
+            self.capture_ms_total += (loop.time() - started) * 1000
+
+            key, data = await loop.run_in_executor(
+                self._executor, self._prepare, raw, image_format, quality
+            )
+        except Exception as e:
+            self.failures += 1
+            logger.warning("Failed to capture screenshot", mode=mode, error=str(e))
+            return None
+
+        self.captures += 1
+        if self.dedup_enabled and key in self._stored_keys:
+            self._stored_keys.move_to_end(key)
+            self.dedup_hits += 1
+            return self.storage.reference(key)
+
+        self._remember(key)
+        write = asyncio.create_task(
+            self._write(key, data, SCREENSHOT_FORMATS[image_format][1])
+        )
+        self._pending_writes.add(write)
+        write.add_done_callback(self._pending_writes.discard)
+        return self.storage.reference(key)
+
+    def _remember(self, key: str):
+        self._stored_keys[key] = None
+        if len(self._stored_keys) > DEDUP_INDEX_LIMIT:
+            self._stored_keys.popitem(last=False)
+
+    async def _write(self, key: str, data: bytes, content_type: str):
+        try:
+            written = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._store, key, data, content_type
+            )
+            if written:
+                self.bytes_written += len(data)
+            else:
+                self.dedup_hits += 1
+        except Exception as e:
+            self._stored_keys.pop(key, None)
+            logger.error("Failed to store screenshot", key=key, error=str(e))
+
+    async def drain(self):
+        """Wait for background writes to finish."""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get screenshot statistics."""
+        return {
+            "format": self.format,
+            "quality": self.quality,
+            "mode": self.mode,
+            "storage": type(self.storage).__name__,
+            "captures": self.captures,
+            "failures": self.failures,
+            "dedup_hits": self.dedup_hits,
+            "pending_writes": len(self._pending_writes),
+            "bytes_written_mb": round(self.bytes_written / 1024 / 1024, 2),
+            "avg_capture_ms": (
+                round(self.capture_ms_total / self.captures, 2) if self.captures else 0
+            ),
+        }
+
+    async def shutdown(self):
+        """Finish pending writes and stop the I/O thread pool."""
+        await self.drain()
+        self._executor.shutdown(wait=True)
+        logger.info("Screenshot service shutdown complete")
+
+
+# Global screenshot service instance
+screenshot_service = ScreenshotService()
@@ -0,0 +1,431 @@
+"""
+Task Progress Writer for batched, debounced task progress reporting.
+
+This service provides:
+- In-memory coalescing of progress updates per task
+- Periodic bulk UPDATE of all pending tasks in one transaction
+- Immediate flush on status transitions
+- Optional Redis pub/sub fast path for live status readers
+- A replayable per-task Redis stream of progress, partial results and the
+  terminal outcome, for streaming endpoints
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+import redis.asyncio as redis
+import structlog
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.db.session import get_async_session_factory
+from app.models.task import Task, TaskStatus
+
+logger = structlog.get_logger(__name__)
+
+# Stream events after which a task produces no further events
+TERMINAL_STREAM_EVENTS = frozenset({"completed", "failed"})
+
+
+class TaskProgressWriter:
+    """Coalesces task progress updates and writes them to the database in bulk."""
+
+    def __init__(self):
+        self.flush_interval_ms = getattr(
+            settings, "TASK_PROGRESS_FLUSH_INTERVAL_MS", 500
+        )
+        self.pubsub_enabled = getattr(settings, "TASK_PROGRESS_PUBSUB_ENABLED", False)
+        self.redis_url = getattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+
+        self.stream_enabled = getattr(settings, "TASK_STREAM_ENABLED", True)
+        self.stream_batch_size = getattr(settings, "TASK_STREAM_BATCH_SIZE", 50)
+        self.stream_max_events = getattr(settings, "TASK_STREAM_MAX_EVENTS", 1000)
+        self.stream_ttl_seconds = getattr(settings, "TASK_STREAM_TTL_SECONDS", 600)
+
+        # Channel prefix for live progress events
+        self.CHANNEL_PREFIX = "task_progress:"
+        # Key prefix for replayable task event streams
+        self.STREAM_PREFIX = "task_stream:"
+
+        # task_id -> latest coalesced update
+        self._pending: dict[int, dict[str, Any]] = {}
+        # Tasks discarded while a flush was in flight; never re-queued
+        self._discarded: set[int] = set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+        # (task_id, event type, serialized data) awaiting the stream sender
+        self._stream_buffer: list[tuple[int, str, str]] = []
+        self._stream_task: asyncio.Task | None = None
+
+        # Stats
+        self.reports_received = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self.stream_events = 0
+
+        self.redis_client: redis.Redis | None = None
+        self._redis_initialized = False
+
+    def _ensure_started(self):
+        """Start the background flush loop if it is not running."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def report(
+        self,
+        task_id: int,
+        progress_percentage: int | None = None,
+        current_step: str | None = None,
+        status: TaskStatus | None = None,
+        estimated_completion: datetime | None = None,
+        memory_usage_mb: int | None = None,
+    ) -> None:
+        """Record a progress update; it is written on the next flush."""
+
+        now = datetime.utcnow()
+        pending = self._pending.setdefault(task_id, {})
+
+        if progress_percentage is not None:
+            pending["progress_percentage"] = max(0, min(100, progress_percentage))
+        if current_step is not None:
+            pending["current_step"] = current_step
+        if status is not None:
+            pending["status"] = status
+        if estimated_completion is not None:
+            pending["estimated_completion_at"] = estimated_completion
+        if memory_usage_mb is not None:
+            pending["memory_usage_mb"] = memory_usage_mb
+        pending["updated_at"] = now
+
+        self.reports_received += 1
+
+        if self.pubsub_enabled or self.stream_enabled:
+            event = {
+                "task_id": task_id,
+                "status": status.value if status is not None else None,
+                "progress_percentage": pending.get("progress_percentage"),
+                "current_step": pending.get("current_step"),
+                "timestamp": now.isoformat(),
+            }
+            if self.pubsub_enabled:
+                await self._publish(task_id, event)
+            self.stream_event(task_id, "progress", event)
+
+        # State transitions are written through immediately
+        if status is not None:
+            await self.flush([task_id])
+        else:
+            self._ensure_started()
+
+    async def discard(self, task_id: int) -> None:
+        """Drop pending updates for a task and wait for any in-flight flush.
+
+        Called before terminal writes (complete/fail) so a stale progress row
+        cannot land on top of the final task state.
+        """
+        self._pending.pop(task_id, None)
+        if self._flush_lock.locked():
+            # The in-flight batch may hold this task; keep a failed flush
+            # from putting it back
+            self._discarded.add(task_id)
+        async with self._flush_lock:
+            pass
+
+    async def flush(self, task_ids: list[int] | None = None) -> int:
+        """Write pending updates (all, or only ``task_ids``) in one bulk UPDATE."""
+
+        async with self._flush_lock:
+            try:
+                return await self._flush_locked(task_ids)
+            finally:
+                self._discarded.clear()
+
+    async def _flush_locked(self, task_ids: list[int] | None) -> int:
+        """Flush body; the caller holds ``_flush_lock``."""
+        if task_ids is None:
+            batch, self._pending = self._pending, {}
+        else:
+            batch = {
+                task_id: self._pending.pop(task_id)
+                for task_id in task_ids
+                if task_id in self._pending
+            }
+
+        if not batch:
+            return 0
+
+        session_factory = get_async_session_factory()
+        async with session_factory() as db:
+            try:
+                # One SELECT for all tasks to merge progress details
+                result = await db.execute(
+                    select(Task.id, Task.progress_details).where(
+                        Task.id.in_(list(batch.keys()))
+                    )
+                )
+                existing_details = {
+                    row.id: dict(row.progress_details or {}) for row in result
+                }
+
+                rows = []
+                for task_id, pending in batch.items():
+                    if task_id not in existing_details:
+                        continue
+
+                    row = {
+                        key: value
+                        for key, value in pending.items()
+                        if key != "current_step"
+                    }
+                    row["id"] = task_id
+
+                    details = existing_details[task_id]
+                    if "current_step" in pending:
+                        details["current_step"] = pending["current_step"]
+                    if "progress_percentage" in pending:
+                        details["progress"] = pending["progress_percentage"]
+                    details["last_updated"] = pending["updated_at"].isoformat()
+                    row["progress_details"] = details
+
+                    rows.append(row)
+
+                if rows:
+                    # ORM bulk UPDATE by primary key (executemany)
+                    await db.execute(update(Task), rows)
+                    await db.commit()
+
+                self.flushes += 1
+                self.rows_written += len(rows)
+
+                logger.debug(
+                    "Task progress flushed",
+                    tasks=len(rows),
+                    total_rows_written=self.rows_written,
+                )
+                return len(rows)
+
+            except Exception as e:
+                logger.error(
+                    "Failed to flush task progress",
+                    tasks=len(batch),
+                    error=str(e),
+                )
+                await db.rollback()
+
+                # Re-queue, letting newer reports win over the failed batch;
+                # tasks discarded meanwhile already have their final state
+                for task_id, pending in batch.items():
+                    if task_id in self._discarded:
+                        continue
+                    self._pending[task_id] = {
+                        **pending,
+                        **self._pending.get(task_id, {}),
+                    }
+                return 0
+
+    async def _flush_loop(self):
+        """Background loop flushing pending updates every interval."""
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval_ms / 1000)
+
+                if self._pending:
+                    await self.flush()
+                else:
+                    # Nothing to do; exit until the next report restarts us
+                    return
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error in task progress flush loop", error=str(e))
+
+    async def _get_redis(self) -> redis.Redis | None:
+        """Lazily connect to Redis for the pub/sub fast path."""
+        if self._redis_initialized:
+            return self.redis_client
+
+        self._redis_initialized = True
+        try:
+            self.redis_client = redis.from_url(
+                self.redis_url,
+                encoding="utf-8",
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+            )
+            await self.redis_client.ping()
+        except Exception as e:
+            logger.warning("Task progress pub/sub unavailable", error=str(e))
+            self.redis_client = None
+
+        return self.redis_client
+
+    async def _publish(self, task_id: int, event: dict[str, Any]):
+        """Publish a progress event for live readers."""
+        client = await self._get_redis()
+        if not client:
+            return
+
+        try:
+            await client.publish(f"{self.CHANNEL_PREFIX}{task_id}", json.dumps(event))
+        except Exception as e:
+            logger.warning(
+                "Failed to publish task progress", task_id=task_id, error=str(e)
+            )
+
+    async def subscribe(self, task_id: int) -> AsyncIterator[dict[str, Any]]:
+        """Yield live progress events for a task from Redis pub/sub."""
+        client = await self._get_redis()
+        if not client:
+            return
+
+        pubsub = client.pubsub()
+        await pubsub.subscribe(f"{self.CHANNEL_PREFIX}{task_id}")
+        try:
+            while True:
+                # Poll with a timeout below the socket timeout, so a quiet
+                # channel does not surface as a connection error
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                if message is None or message.get("type") != "message":
+                    continue
+                yield json.loads(message["data"])
+        finally:
+            await pubsub.unsubscribe(f"{self.CHANNEL_PREFIX}{task_id}")
+            await pubsub.close()
+
+    def stream_event(self, task_id: int, event_type: str, data: dict[str, Any]):
+        """Queue an event for the task's stream without waiting on Redis.
+
+        The data is serialized immediately, so later changes to it are not
+        streamed. One background sender appends queued events in order.
+        """
+        if not self.stream_enabled:
+            return
+        self._stream_buffer.append((task_id, event_type, json.dumps(data, default=str)))
+        if self._stream_task is None or self._stream_task.done():
+            self._stream_task = asyncio.create_task(self._send_stream_events())
+
+    async def _send_stream_events(self):
+        """Write queued stream events, one pipelined round trip per drain."""
+        client = await self._get_redis()
+        while self._stream_buffer:
+            events, self._stream_buffer = self._stream_buffer, []
+            if not client:
+                continue  # Nowhere to stream to; readers fall back to the DB
+
+            keys = set()
+            try:
+                async with client.pipeline(transaction=False) as pipe:
+                    for task_id, event_type, payload in events:
+                        key = f"{self.STREAM_PREFIX}{task_id}"
+                        keys.add(key)
+                        pipe.xadd(
+                            key,
+                            {"type": event_type, "data": payload},
+                            maxlen=self.stream_max_events,
+                            approximate=True,
+                        )
+                    for key in keys:
+                        pipe.expire(key, self.stream_ttl_seconds)
+                    await pipe.execute()
+                self.stream_events += len(events)
+            except Exception as e:
+                logger.warning(
+                    "Failed to stream task events",
+                    events=len(events),
+                    error=str(e),
+                )
+
+    def stream_partial(
+        self, task_id: int, stage: str, items: list[dict[str, Any]]
+    ) -> None:
+        """Stream a stage's results in batches as soon as they are available."""
+        if not self.stream_enabled:
+            return
+        total = len(items)
+        for offset in range(0, max(total, 1), self.stream_batch_size):
+            self.stream_event(
+                task_id,
+                "partial",
+                {
+                    "stage": stage,
+                    "offset": offset,
+                    "total": total,
+                    "items": items[offset : offset + self.stream_batch_size],
+                },
+            )
+
+    async def read_stream(
+        self, task_id: int, last_event_id: str = "0", block_ms: int = 1000
+    ) -> AsyncIterator[tuple[str | None, str, dict[str, Any]]]:
+        """Replay and follow a task's events until its terminal event.
+
+        Yields ``(event_id, event_type, data)``. A ``(None, "heartbeat", {})``
+        is yielded whenever ``block_ms`` passes without new events, so callers
+        can check for disconnected clients.
+        """
+        client = await self._get_redis()
+        if not client:
+            return
+
+        key = f"{self.STREAM_PREFIX}{task_id}"
+        while True:
+            response = await client.xread({key: last_event_id}, block=block_ms)
+            if not response:
+                yield None, "heartbeat", {}
+                continue
+
+            for event_id, fields in response[0][1]:
+                last_event_id = event_id
+                event_type = fields.get("type", "message")
+                yield event_id, event_type, json.loads(fields.get("data") or "{}")
+                if event_type in TERMINAL_STREAM_EVENTS:
+                    return
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get progress writer statistics."""
+        return {
+            "pending_tasks": len(self._pending),
+            "reports_received": self.reports_received,
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "flush_interval_ms": self.flush_interval_ms,
+            "pubsub_enabled": self.pubsub_enabled and self.redis_client is not None,
+            "stream_enabled": self.stream_enabled and self.redis_client is not None,
+            "stream_events": self.stream_events,
+        }
+
+    async def shutdown(self):
+        """Flush remaining updates and stop the background loop."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        await self.flush()
+
+        # Let queued stream events reach Redis before disconnecting
+        if self._stream_task:
+            await self._stream_task
+            self._stream_task = None
+
+        if self.redis_client:
+            await self.redis_client.close()
+            self.redis_client = None
+        self._redis_initialized = False
+
+        logger.info("Task progress writer shutdown complete")
+
+
+# Global task progress writer instance
+task_progress_writer = TaskProgressWriter()
@@ -17,6 +17,7 @@ from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.task import Task, TaskStatus
+from app.services.task_progress_writer import task_progress_writer
 
 logger = structlog.get_logger(__name__)
 
@@ -122,6 +123,74 @@ class TaskStatusService:
             await db.rollback()
             return False
 
+    @staticmethod
+    async def claim_pending_task(
+        db: AsyncSession, task_id: int, worker_id: str
+    ) -> bool:
+        """Atomically move a pending task to in progress.
+
+        Returns False when the task is no longer pending (e.g. it was
+        cancelled while queued), in which case it must not be processed.
+        """
+
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(Task)
+            .where(Task.id == task_id, Task.status == TaskStatus.PENDING)
+            .values(
+                status=TaskStatus.IN_PROGRESS,
+                processing_started_at=now,
+                worker_id=worker_id,
+                updated_at=now,
+            )
+        )
+        await db.commit()
+
+        if result.rowcount == 0:
+            logger.info("Task no longer pending, not claimed", task_id=task_id)
+            return False
+        return True
+
+    @staticmethod
+    async def fail_pending_tasks(
+        db: AsyncSession,
+        task_ids: list[int],
+        error_message: str,
+        include_in_progress: bool = False,
+    ) -> int:
+        """Fail tasks that will never be processed, if they are still pending.
+
+        With ``include_in_progress``, tasks whose processing was interrupted
+        are failed as well.
+        """
+
+        if not task_ids:
+            return 0
+
+        statuses = [TaskStatus.PENDING]
+        if include_in_progress:
+            statuses.append(TaskStatus.IN_PROGRESS)
+            # Buffered progress must not overwrite the final state
+            for task_id in task_ids:
+                await task_progress_writer.discard(task_id)
+
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids), Task.status.in_(statuses))
+            .values(
+                status=TaskStatus.FAILED,
+                error_message=error_message,
+                last_error_at=now,
+                completed_at=now,
+                updated_at=now,
+            )
+        )
+        await db.commit()
+
+        logger.info("Pending tasks failed", tasks=result.rowcount, reason=error_message)
+        return result.rowcount
+
     @staticmethod
     async def complete_task(
         db: AsyncSession,
@@ -133,6 +202,9 @@ class TaskStatusService:
 
         logger.info("🔧 COMPLETE_TASK: Starting complete_task", task_id=task_id)
 
+        # Drop buffered progress so it cannot overwrite the final state
+        await task_progress_writer.discard(task_id)
+
         try:
             completion_time = datetime.utcnow()
 
@@ -205,6 +277,17 @@ class TaskStatusService:
                 duration_seconds=actual_duration,
                 result_size=len(str(result_data)),
             )
+
+            task_progress_writer.stream_event(
+                task_id,
+                "completed",
+                {
+                    "task_id": task_id,
+                    "status": TaskStatus.COMPLETED.value,
+                    "duration_seconds": actual_duration,
+                    "performance_metrics": performance_metrics or {},
+                },
+            )
             return True
 
         except Exception as e:
@@ -233,6 +316,9 @@ class TaskStatusService:
     ) -> bool:
         """Mark task as failed with error details."""
 
+        # Drop buffered progress so it cannot overwrite the final state
+        await task_progress_writer.discard(task_id)
+
         try:
             failure_time = datetime.utcnow()
 
@@ -294,6 +380,18 @@ class TaskStatusService:
                 retry_count=current_retries + 1,
                 will_retry=should_retry,
             )
+
+            # A retried task streams its results again from the start
+            task_progress_writer.stream_event(
+                task_id,
+                "retrying" if should_retry else "failed",
+                {
+                    "task_id": task_id,
+                    "status": new_status.value,
+                    "error_message": str(error),
+                    "retry_count": current_retries + 1,
+                },
+            )
             return True
 
         except Exception as e:
@@ -18,17 +18,36 @@ from datetime import datetime
 from typing import Any
 from urllib.parse import urlparse
 
+import aiohttp
 import psutil
 import structlog
-from playwright.async_api import BrowserContext, Page
+from playwright.async_api import Page
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.schemas.web_page import WebPageParseRequest, WebPageParseResponse
+from app.core.http_client import http_client_manager
+from app.schemas.web_page import (
+    ParseProfile,
+    WebPageParseRequest,
+    WebPageParseResponse,
+)
+from app.services.parse_coalescer import parse_coalescer
+from app.services.screenshot_service import screenshot_service
+from app.services.task_progress_writer import task_progress_writer
 from app.services.task_status_service import TaskStatusService
 from app.services.webpage_cache_service import webpage_cache_service
 from app.utils.browser_pool import browser_pool
+from app.utils.dom_extraction import (
+    empty_dom_snapshot,
+    extract_dom_snapshot,
+    extract_page_snapshot,
+)
+from app.utils.element_scoring import score_elements
+from app.utils.incremental_analysis import apply_region_index, build_region_index
+from app.utils.resource_blocking import ResourceBlocker
+from app.utils.selector_healing import selector_healing_index
+from app.utils.static_extraction import detect_js_rendering, extract_static_snapshot
 
 logger = structlog.get_logger(__name__)
 
@@ -38,8 +57,29 @@ class WebParserService:
 
     def __init__(self):
         self.max_wait_time = getattr(settings, "PARSER_MAX_WAIT_TIME", 30)
-        self.screenshot_quality = getattr(settings, "SCREENSHOT_QUALITY", 80)
         self.max_elements_per_page = getattr(settings, "MAX_ELEMENTS_PER_PAGE", 1000)
+        self.max_content_blocks = getattr(settings, "MAX_CONTENT_BLOCKS_PER_PAGE", 200)
+        self.static_parse_enabled = getattr(settings, "STATIC_PARSE_ENABLED", True)
+        self.frame_extraction_enabled = getattr(
+            settings, "FRAME_EXTRACTION_ENABLED", True
+        )
+        self.frame_max_count = getattr(settings, "FRAME_EXTRACTION_MAX_FRAMES", 20)
+        self.frame_max_elements = getattr(
+            settings, "FRAME_EXTRACTION_MAX_ELEMENTS", 200
+        )
+        self.frame_max_blocks = getattr(settings, "FRAME_EXTRACTION_MAX_BLOCKS", 50)
+        self.frame_timeout_seconds = getattr(
+            settings, "FRAME_EXTRACTION_TIMEOUT_SECONDS", 2.0
+        )
+        self.incremental_parse_enabled = getattr(
+            settings, "INCREMENTAL_PARSE_ENABLED", True
+        )
+        self.static_parse_max_bytes = getattr(
+            settings, "STATIC_PARSE_MAX_BYTES", 5 * 1024 * 1024
+        )
+        self.static_parse_timeout_seconds = getattr(
+            settings, "STATIC_PARSE_TIMEOUT_SECONDS", 10
+        )
 
     async def parse_webpage_async(
         self, db: AsyncSession, task_id: int, url: str, options: WebPageParseRequest
@@ -47,7 +87,6 @@ class WebParserService:
         """Main async parsing method for background execution."""
 
         start_time = datetime.utcnow()
-        context = None
 
         try:
             # Update task status - starting
@@ -55,8 +94,8 @@ class WebParserService:
                 db, task_id, f"webparser-{task_id}"
             )
 
-            await TaskStatusService.update_task_progress(
-                db, task_id, progress_percentage=5, current_step="checking_cache"
+            await task_progress_writer.report(
+                task_id, progress_percentage=5, current_step="checking_cache"
             )
 
             # Initialize cache service if needed
@@ -96,80 +135,24 @@ class WebParserService:
 
                 return cached_result
 
-            await TaskStatusService.update_task_progress(
-                db,
-                task_id,
-                progress_percentage=10,
-                current_step="acquiring_browser_context",
-            )
-
-            # Acquire browser context with timeout and fallback
-            context = None
-            use_fallback = False
-
-            try:
-                logger.info(
-                    "🔍 Attempting to acquire browser context from pool",
-                    task_id=task_id,
-                )
-                context = await asyncio.wait_for(
-                    browser_pool.acquire_context(task_id),
-                    timeout=30.0,  # 30 second timeout
-                )
-                logger.info("✅ Browser context acquired from pool", task_id=task_id)
-            except (TimeoutError, Exception) as e:
-                logger.warning(
-                    "⚠️ Pool acquisition failed, trying direct browser creation",
-                    task_id=task_id,
-                    error=str(e),
-                )
-                use_fallback = True
-
-                # Fallback: Create browser context directly
-                try:
-                    from playwright.async_api import async_playwright
-
-                    logger.info("🔄 Creating direct browser context", task_id=task_id)
-                    playwright = await async_playwright().start()
-                    browser = await playwright.chromium.launch(headless=True)
-                    context = await browser.new_context(
-                        viewport={"width": 1920, "height": 1080}
-                    )
-                    logger.info("✅ Direct browser context created", task_id=task_id)
-
-                    # Store references for cleanup
-                    context._playwright = playwright
-                    context._browser = browser
-
-                except Exception as fallback_error:
-                    logger.error(
-                        "❌ Direct browser creation also failed",
-                        task_id=task_id,
-                        error=str(fallback_error),
-                    )
-                    raise Exception(
-                        f"Both pool and direct browser creation failed: {str(fallback_error)}"
-                    )
-
-            await TaskStatusService.update_task_progress(
-                db, task_id, progress_percentage=20, current_step="navigating_to_page"
+            # Share one parse between concurrent requests for this URL
+            cache_key = webpage_cache_service._generate_cache_key(url, options.dict())
+            result, coalesced = await parse_coalescer.run(
+                cache_key,
+                lambda: self._parse_tiered(db, task_id, url, options),
             )
 
-            # Perform the actual parsing
-            result = await self._perform_parsing(context, url, options, task_id, db)
-
-            # Cache the result for future use
-            await webpage_cache_service.cache_result(url, result, options.dict())
-
             # Complete the task
             performance_metrics = {
                 "parsing_duration_seconds": (
                     datetime.utcnow() - start_time
                 ).total_seconds(),
                 "cache_hit": False,
+                "coalesced": coalesced,
                 "elements_extracted": result.web_page.interactive_elements_count,
                 "content_blocks": len(result.web_page.content_blocks),
                 "screenshot_captured": len(result.screenshots) > 0,
+                **result.parse_stats,
             }
 
             logger.info("🔧 FINALIZATION: Starting finalization step", task_id=task_id)
@@ -235,6 +218,202 @@ class WebParserService:
                 "Webpage parsing failed", task_id=task_id, url=url, error=str(e)
             )
             raise
+
+    async def _parse_tiered(
+        self, db: AsyncSession, task_id: int, url: str, options: WebPageParseRequest
+    ) -> WebPageParseResponse:
+        """Parse from static HTML when possible, escalating to the browser."""
+
+        escalation_reason = self._static_tier_blocker(options)
+        if escalation_reason is None:
+            result, escalation_reason = await self._parse_static(task_id, url, options)
+            if result is not None:
+                await webpage_cache_service.cache_result(url, result, options.dict())
+                return result
+
+            logger.info(
+                "Escalating parse to browser",
+                task_id=task_id,
+                url=url,
+                reason=escalation_reason,
+            )
+
+        result = await self._parse_with_browser(db, task_id, url, options)
+        result.parse_stats["parse_tier"] = "browser"
+        result.parse_stats["escalation_reason"] = escalation_reason
+
+        # Cache the result for future use
+        await webpage_cache_service.cache_result(url, result, options.dict())
+
+        return result
+
+    def _static_tier_blocker(self, options: WebPageParseRequest) -> str | None:
+        """Return why the static tier cannot serve these options, if it cannot."""
+
+        if not self.static_parse_enabled:
+            return "static_tier_disabled"
+        if options.include_screenshot:
+            return "screenshot_requested"
+        if options.wait_for_network_idle:
+            return "network_idle_requested"
+        if not http_client_manager.is_initialized:
+            return "http_client_unavailable"
+        return None
+
+    async def _parse_static(
+        self, task_id: int, url: str, options: WebPageParseRequest
+    ) -> tuple[WebPageParseResponse | None, str | None]:
+        """Parse server-rendered HTML without a browser.
+
+        Returns the response, or None and the reason a browser is required.
+        """
+
+        parsing_start_time = datetime.utcnow()
+
+        await task_progress_writer.report(
+            task_id, progress_percentage=10, current_step="fetching_static_html"
+        )
+
+        try:
+            async with http_client_manager.session.get(
+                url,
+                headers={"Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8"},
+                timeout=aiohttp.ClientTimeout(total=self.static_parse_timeout_seconds),
+            ) as response:
+                if response.status != 200:
+                    return None, f"http_status:{response.status}"
+                if response.content_type not in ("text/html", "application/xhtml+xml"):
+                    return None, f"content_type:{response.content_type}"
+
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    body.extend(chunk)
+                    if len(body) > self.static_parse_max_bytes:
+                        return None, "document_too_large"
+
+                encoding = response.charset
+                final_url = str(response.url)
+
+        except Exception as e:
+            logger.warning(
+                "Static fetch failed", task_id=task_id, url=url, error=str(e)
+            )
+            return None, "fetch_failed"
+
+        fetch_ms = int((datetime.utcnow() - parsing_start_time).total_seconds() * 1000)
+
+        await task_progress_writer.report(
+            task_id, progress_percentage=40, current_step="extracting_page_metadata"
+        )
+
+        # lxml parsing is CPU bound; keep it off the event loop
+        snapshot = await asyncio.to_thread(
+            extract_static_snapshot,
+            bytes(body),
+            final_url,
+            encoding,
+            self.max_elements_per_page,
+            self.max_content_blocks,
+        )
+
+        escalation_reason = detect_js_rendering(snapshot)
+        if escalation_reason:
+            return None, escalation_reason
+
+        metadata, interactive_elements, content_blocks, analysis_stats = (
+            await self._analyze_snapshot(snapshot, task_id, url, rendered=False)
+        )
+
+        parse_stats: dict[str, Any] = {
+            "parse_tier": "static",
+            "parse_profile": options.parse_profile.value,
+            "fetch_ms": fetch_ms,
+            "document_bytes": len(body),
+            "incremental": analysis_stats,
+        }
+
+        response = await self._build_parse_response(
+            url,
+            metadata,
+            interactive_elements,
+            content_blocks,
+            parsing_start_time,
+            task_id=task_id,
+            region_fingerprints=self._region_fingerprints(snapshot),
+            parse_stats=parse_stats,
+        )
+        return response, None
+
+    async def _parse_with_browser(
+        self, db: AsyncSession, task_id: int, url: str, options: WebPageParseRequest
+    ) -> WebPageParseResponse:
+        """Acquire a browser context and parse the rendered page."""
+
+        context = None
+        lease = None
+        use_fallback = False
+
+        try:
+            await task_progress_writer.report(
+                task_id,
+                progress_percentage=10,
+                current_step="acquiring_browser_context",
+            )
+
+            # Acquire browser context with timeout and fallback
+            try:
+                logger.info(
+                    "🔍 Attempting to acquire browser context from pool",
+                    task_id=task_id,
+                )
+                lease = await asyncio.wait_for(
+                    browser_pool.acquire_context(task_id, target_url=url),
+                    timeout=30.0,  # 30 second timeout
+                )
+                context = lease.context
+                logger.info("✅ Browser context acquired from pool", task_id=task_id)
+            except (TimeoutError, Exception) as e:
+                logger.warning(
+                    "⚠️ Pool acquisition failed, trying direct browser creation",
+                    task_id=task_id,
+                    error=str(e),
+                )
+                use_fallback = True
+
+                # Fallback: Create browser context directly
+                try:
+                    from playwright.async_api import async_playwright
+
+                    logger.info("🔄 Creating direct browser context", task_id=task_id)
+                    playwright = await async_playwright().start()
+                    browser = await playwright.chromium.launch(headless=True)
+                    context = await browser.new_context(
+                        viewport={"width": 1920, "height": 1080}
+                    )
+                    logger.info("✅ Direct browser context created", task_id=task_id)
+
+                    # Store references for cleanup
+                    context._playwright = playwright
+                    context._browser = browser
+
+                except Exception as fallback_error:
+                    logger.error(
+                        "❌ Direct browser creation also failed",
+                        task_id=task_id,
+                        error=str(fallback_error),
+                    )
+                    raise Exception(
+                        f"Both pool and direct browser creation failed: {str(fallback_error)}"
+                    )
+
+            await task_progress_writer.report(
+                task_id, progress_percentage=20, current_step="navigating_to_page"
+            )
+
+            # Perform the actual parsing
+            page = await lease.new_page() if lease else await context.new_page()
+            return await self._perform_parsing(page, url, options, task_id, db)
+
         finally:
             if context:
                 if use_fallback:
@@ -256,11 +435,11 @@ class WebParserService:
                         )
                 else:
                     # Release context back to pool
-                    await browser_pool.release_context(task_id, context)
+                    await lease.release()
 
     async def _perform_parsing(
         self,
-        context: BrowserContext,
+        page: Page,
         url: str,
         options: WebPageParseRequest,
         task_id: int,
@@ -269,14 +448,23 @@ class WebParserService:
         """Perform the actual webpage parsing with progress updates."""
 
         parsing_start_time = datetime.utcnow()
-        page = await context.new_page()
+        warnings: list[str] = []
+
+        # Lean profile: skip downloads that never affect extraction
+        blocker = None
+        if options.parse_profile == ParseProfile.LEAN:
+            blocker = ResourceBlocker()
+            await blocker.install(page)
 
         try:
             # Navigate to the page
+            navigation_start = datetime.utcnow()
             await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            navigation_ms = int(
+                (datetime.utcnow() - navigation_start).total_seconds() * 1000
+            )
 
-            await TaskStatusService.update_task_progress(
-                db,
+            await task_progress_writer.report(
                 task_id,
                 progress_percentage=30,
                 current_step="waiting_for_page_load",
@@ -293,479 +481,296 @@ class WebParserService:
                 except PlaywrightTimeoutError:
                     logger.warning("Network idle timeout", task_id=task_id, url=url)
 
-            await TaskStatusService.update_task_progress(
-                db,
+            await task_progress_writer.report(
                 task_id,
                 progress_percentage=40,
                 current_step="extracting_page_metadata",
             )
 
-            # Extract page metadata
-            metadata = await self._extract_page_metadata(page)
-
-            await TaskStatusService.update_task_progress(
-                db,
-                task_id,
-                progress_percentage=50,
-                current_step="extracting_interactive_elements",
-            )
-
-            # Extract interactive elements
-            interactive_elements = await self._extract_interactive_elements(page)
-
-            await TaskStatusService.update_task_progress(
-                db,
-                task_id,
-                progress_percentage=70,
-                current_step="extracting_content_blocks",
-            )
-
-            # Extract content blocks
-            content_blocks = await self._extract_content_blocks(page)
-
-            await TaskStatusService.update_task_progress(
-                db,
-                task_id,
-                progress_percentage=80,
-                current_step="analyzing_action_capabilities",
-            )
-
-            # Analyze action capabilities
-            action_capabilities = await self._analyze_action_capabilities(
-                interactive_elements, metadata
+            # Walk the DOM once for metadata, elements and content blocks
+            snapshot = await self._extract_page_snapshot(page)
+            metadata, interactive_elements, content_blocks, analysis_stats = (
+                await self._analyze_snapshot(snapshot, task_id, url)
             )
 
             screenshot_path = None
             if options.include_screenshot:
-                await TaskStatusService.update_task_progress(
-                    db,
+                await task_progress_writer.report(
                     task_id,
                     progress_percentage=90,
                     current_step="capturing_screenshot",
                 )
                 screenshot_path = await self._capture_screenshot(page, task_id)
+                if blocker:
+                    warnings.append(
+                        "Screenshot captured with the lean profile; images and fonts were not loaded"
+                    )
 
-            await TaskStatusService.update_task_progress(
-                db, task_id, progress_percentage=95, current_step="finalizing_results"
+            parse_stats: dict[str, Any] = {
+                "parse_profile": options.parse_profile.value,
+                "navigation_ms": navigation_ms,
+                "incremental": analysis_stats,
+            }
+            if blocker:
+                parse_stats["resource_blocking"] = blocker.get_stats()
+            if snapshot.get("frames"):
+                parse_stats["frames"] = snapshot["frames"]
+            if snapshot.get("shadow_roots"):
+                parse_stats["shadow_roots"] = snapshot["shadow_roots"]
+
+            return await self._build_parse_response(
+                url,
+                metadata,
+                interactive_elements,
+                content_blocks,
+                parsing_start_time,
+                task_id=task_id,
+                region_fingerprints=self._region_fingerprints(snapshot),
+                screenshot_path=screenshot_path,
+                warnings=warnings,
+                parse_stats=parse_stats,
             )
 
-            # Create content hash
-            content_hash = self._generate_content_hash(
-                metadata, interactive_elements, content_blocks
-            )
+        finally:
+            await page.close()
 
-            # Calculate parsing duration
-            parsing_duration_ms = int(
-                (datetime.utcnow() - parsing_start_time).total_seconds() * 1000
-            )
+    async def _analyze_snapshot(
+        self, snapshot: dict[str, Any], task_id: int, url: str, rendered: bool = True
+    ) -> tuple[
+        dict[str, Any], list[dict[str, Any]], list[dict[str, Any]], dict[str, Any]
+    ]:
+        """Turn a page snapshot into metadata, elements and content blocks.
+
+        Analysis cached for regions whose fingerprint is unchanged since the
+        last parse of the URL is reused; only changed regions are analyzed.
+        Each stage's output is streamed to live readers as soon as it is ready.
+        Only ``rendered`` (browser tier) snapshots feed the selector healing
+        index.
+        """
+
+        metadata = self._extract_page_metadata(snapshot)
+        task_progress_writer.stream_event(
+            task_id, "partial", {"stage": "metadata", "metadata": metadata}
+        )
 
-            # Build the WebPage object
-            from app.schemas.web_page import WebPage
+        incremental = self.incremental_parse_enabled and bool(snapshot.get("regions"))
+        region_index = None
+        if incremental:
+            region_index = await webpage_cache_service.get_region_index(url)
+        reused_elements, reused_blocks, analysis_stats = apply_region_index(
+            snapshot, region_index
+        )
 
-            web_page = WebPage(
-                id=0,  # Temporary ID for response
-                url=url,
-                canonical_url=metadata.get("canonical_url", url),
-                title=metadata.get("title", ""),
-                domain=urlparse(url).netloc,
-                content_hash=content_hash,
-                interactive_elements_count=len(interactive_elements),
-                form_count=metadata.get("form_count", 0),
-                link_count=metadata.get("link_count", 0),
-                image_count=metadata.get("image_count", 0),
-                semantic_data=metadata,
-                parsed_at=datetime.utcnow(),
-                parsing_duration_ms=parsing_duration_ms,
-                success=True,
-                interactive_elements=[],  # Will be populated separately if needed
-                content_blocks=[],  # Will be populated separately if needed
-                action_capabilities=[],  # Will be populated separately if needed
-            )
+        await task_progress_writer.report(
+            task_id,
+            progress_percentage=50,
+            current_step="extracting_interactive_elements",
+        )
 
-            # Build the response
-            response = WebPageParseResponse(
-                web_page=web_page,
-                processing_time_ms=parsing_duration_ms,
-                cache_hit=False,
-                screenshots=[screenshot_path] if screenshot_path else [],
-                warnings=[],
-                errors=[],
+        # Extract interactive elements
+        interactive_elements = self._extract_interactive_elements(
+            snapshot, reused_elements
+        )
+        task_progress_writer.stream_partial(
+            task_id, "interactive_elements", interactive_elements
+        )
+
+        await task_progress_writer.report(
+            task_id,
+            progress_percentage=70,
+            current_step="extracting_content_blocks",
+        )
+
+        # Extract content blocks
+        content_blocks = self._extract_content_blocks(snapshot, reused_blocks)
+        task_progress_writer.stream_partial(task_id, "content_blocks", content_blocks)
+
+        await task_progress_writer.report(
+            task_id,
+            progress_percentage=80,
+            current_step="analyzing_action_capabilities",
+        )
+
+        # Analyze action capabilities
+        await self._analyze_action_capabilities(interactive_elements, metadata)
+
+        if incremental:
+            await webpage_cache_service.cache_region_index(
+                url, build_region_index(snapshot, interactive_elements, content_blocks)
             )
 
-            return response
+        # Static snapshots carry no css_selector, so there is nothing to index
+        if rendered:
+            await selector_healing_index.record_page(url, interactive_elements)
 
-        finally:
-            await page.close()
+        return metadata, interactive_elements, content_blocks, analysis_stats
 
-    async def _extract_page_metadata(self, page: Page) -> dict[str, Any]:
-        """Extract comprehensive page metadata."""
+    def _region_fingerprints(self, snapshot: dict[str, Any]) -> list[str]:
+        # Child frames (ads, widgets) churn independently of the page itself
+        return [
+            region["fingerprint"]
+            for region in snapshot.get("regions", [])
+            if "frame" not in region
+        ]
+
+    async def _build_parse_response(
+        self,
+        url: str,
+        metadata: dict[str, Any],
+        interactive_elements: list[dict[str, Any]],
+        content_blocks: list[dict[str, Any]],
+        parsing_start_time: datetime,
+        task_id: int,
+        region_fingerprints: list[str] | None = None,
+        screenshot_path: str | None = None,
+        warnings: list[str] | None = None,
+        parse_stats: dict[str, Any] | None = None,
+    ) -> WebPageParseResponse:
+        """Assemble the parse response shared by every parsing tier."""
+
+        await task_progress_writer.report(
+            task_id, progress_percentage=95, current_step="finalizing_results"
+        )
+
+        # Create content hash
+        content_hash = self._generate_content_hash(
+            metadata, interactive_elements, content_blocks, region_fingerprints
+        )
+
+        # Calculate parsing duration
+        parsing_duration_ms = int(
+            (datetime.utcnow() - parsing_start_time).total_seconds() * 1000
+        )
+
+        # Build the WebPage object
+        from app.schemas.web_page import WebPage
+
+        web_page = WebPage(
+            id=0,  # Temporary ID for response
+            url=url,
+            canonical_url=metadata.get("canonical_url", url),
+            title=metadata.get("title", ""),
+            domain=urlparse(url).netloc,
+            content_hash=content_hash,
+            interactive_elements_count=len(interactive_elements),
+            form_count=metadata.get("form_count", 0),
+            link_count=metadata.get("link_count", 0),
+            image_count=metadata.get("image_count", 0),
+            semantic_data=metadata,
+            parsed_at=datetime.utcnow(),
+            parsing_duration_ms=parsing_duration_ms,
+            success=True,
+            interactive_elements=[],  # Will be populated separately if needed
+            content_blocks=[],  # Will be populated separately if needed
+            action_capabilities=[],  # Will be populated separately if needed
+        )
+
+        # Build the response
+        return WebPageParseResponse(
+            web_page=web_page,
+            processing_time_ms=parsing_duration_ms,
+            cache_hit=False,
+            screenshots=[screenshot_path] if screenshot_path else [],
+            warnings=warnings or [],
+            errors=[],
+            parse_stats=parse_stats or {},
+        )
+
+    async def _extract_page_snapshot(self, page: Page) -> dict[str, Any]:
+        """Extract the raw page snapshot in a single DOM walk per frame."""
 
         try:
-            # Basic page information
-            title = await page.title()
-            url = page.url
-
-            # Extract meta tags
-            meta_tags = await page.evaluate(
-                """
-                () => {
-                    const metas = {};
-                    document.querySelectorAll('meta').forEach(meta => {
-                        const name = meta.getAttribute('name') || meta.getAttribute('property');
-                        const content = meta.getAttribute('content');
-                        if (name && content) {
-                            metas[name] = content;
-                        }
-                    });
-                    return metas;
-                }
-            """
+            if self.frame_extraction_enabled:
+                return await extract_page_snapshot(
+                    page,
+                    max_elements=self.max_elements_per_page,
+                    max_blocks=self.max_content_blocks,
+                    max_frames=self.frame_max_count,
+                    frame_max_elements=self.frame_max_elements,
+                    frame_max_blocks=self.frame_max_blocks,
+                    frame_timeout_seconds=self.frame_timeout_seconds,
+                )
+            return await extract_dom_snapshot(
+                page,
+                max_elements=self.max_elements_per_page,
+                max_blocks=self.max_content_blocks,
             )
 
-            # Extract links
-            links = await page.evaluate(
-                """
-                () => {
-                    const links = [];
-                    document.querySelectorAll('a[href]').forEach(link => {
-                        links.push({
-                            text: link.textContent.trim(),
-                            href: link.href,
-                            title: link.title || null
-                        });
-                    });
-                    return links.slice(0, 100); // Limit to first 100 links
-                }
-            """
-            )
+        except Exception as e:
+            logger.error("Failed to extract page snapshot", error=str(e))
+            snapshot = empty_dom_snapshot(page.url)
+            snapshot["error"] = str(e)
+            return snapshot
 
-            # Count various elements
-            element_counts = await page.evaluate(
-                """
-                () => {
-                    return {
-                        forms: document.querySelectorAll('form').length,
-                        inputs: document.querySelectorAll('input, textarea, select').length,
-                        buttons: document.querySelectorAll('button, input[type="submit"], input[type="button"]').length,
-                        images: document.querySelectorAll('img').length,
-                        links: document.querySelectorAll('a[href]').length,
-                        scripts: document.querySelectorAll('script').length
-                    };
-                }
-            """
-            )
+    def _extract_page_metadata(self, snapshot: dict[str, Any]) -> dict[str, Any]:
+        """Build comprehensive page metadata from the page snapshot."""
 
-            # Check for JavaScript frameworks
-            frameworks = await page.evaluate(
-                """
-                () => {
-                    const frameworks = [];
-                    if (window.React) frameworks.push('React');
-                    if (window.Vue) frameworks.push('Vue');
-                    if (window.angular) frameworks.push('Angular');
-                    if (window.jQuery || window.$) frameworks.push('jQuery');
-                    return frameworks;
-                }
-            """
-            )
+        url = snapshot.get("url", "")
 
+        if snapshot.get("error"):
             return {
-                "title": title,
+                "title": snapshot.get("title", ""),
                 "current_url": url,
-                "canonical_url": meta_tags.get("canonical", url),
-                "description": meta_tags.get("description", ""),
-                "keywords": meta_tags.get("keywords", ""),
-                "language": meta_tags.get("language", "en"),
-                "viewport": meta_tags.get("viewport", ""),
-                "meta_tags": meta_tags,
-                "links": links,
-                "form_count": element_counts["forms"],
-                "input_count": element_counts["inputs"],
-                "button_count": element_counts["buttons"],
-                "image_count": element_counts["images"],
-                "link_count": element_counts["links"],
-                "has_javascript": element_counts["scripts"] > 0,
-                "javascript_frameworks": frameworks,
+                "error": snapshot["error"],
                 "extracted_at": datetime.utcnow().isoformat(),
             }
 
-        except Exception as e:
-            logger.error("Failed to extract page metadata", error=str(e))
-            return {
-                "title": "",
-                "current_url": page.url,
-                "error": str(e),
-                "extracted_at": datetime.utcnow().isoformat(),
-            }
+        meta_tags = snapshot.get("meta_tags", {})
+        element_counts = snapshot.get("counts", {})
+
+        return {
+            "title": snapshot.get("title", ""),
+            "current_url": url,
+            "canonical_url": snapshot.get("canonical_link")
+            or meta_tags.get("canonical", url),
+            "description": meta_tags.get("description", ""),
+            "keywords": meta_tags.get("keywords", ""),
+            "language": meta_tags.get("language") or snapshot.get("lang") or "en",
+            "viewport": meta_tags.get("viewport", ""),
+            "meta_tags": meta_tags,
+            "links": snapshot.get("links", []),
+            "form_count": element_counts.get("forms", 0),
+            "input_count": element_counts.get("inputs", 0),
+            "button_count": element_counts.get("buttons", 0),
+            "image_count": element_counts.get("images", 0),
+            "link_count": element_counts.get("links", 0),
+            "has_javascript": element_counts.get("scripts", 0) > 0,
+            "javascript_frameworks": snapshot.get("frameworks", []),
+            "extracted_at": datetime.utcnow().isoformat(),
+        }
+
+    def _extract_interactive_elements(
+        self, snapshot: dict[str, Any], reused: set[int] | None = None
+    ) -> list[dict[str, Any]]:
+        """Score the interactive elements captured in the page snapshot.
 
-    async def _extract_interactive_elements(self, page: Page) -> list[dict[str, Any]]:
-        """Extract interactive elements from the page."""
+        Elements at ``reused`` positions already carry cached semantic analysis
+        and only get their geometry-dependent fields recomputed.
+        """
 
         try:
-            elements = await page.evaluate(
-                """
-                () => {
-                    const elements = [];
-                    const selectors = [
-                        'button',
-                        'input',
-                        'select',
-                        'textarea',
-                        'a[href]',
-                        '[onclick]',
-                        '[role="button"]',
-                        '[tabindex]'
-                    ];
-
-                    selectors.forEach(selector => {
-                        document.querySelectorAll(selector).forEach((el, index) => {
-                            const rect = el.getBoundingClientRect();
-                            const isVisible = rect.width > 0 && rect.height > 0 &&
-                                            window.getComputedStyle(el).visibility !== 'hidden' &&
-                                            window.getComputedStyle(el).display !== 'none';
-
-                            if (isVisible) {
-                                elements.push({
-                                    tag_name: el.tagName.toLowerCase(),
-                                    element_type: el.type || 'unknown',
-                                    text_content: el.textContent?.trim().substring(0, 200) || '',
-                                    placeholder: el.placeholder || null,
-                                    value: el.value || null,
-                                    aria_label: el.getAttribute('aria-label') || null,
-                                    title: el.title || null,
-                                    element_id: el.id || null,
-                                    element_class: el.className || null,
-                                    x_coordinate: Math.round(rect.left),
-                                    y_coordinate: Math.round(rect.top),
-                                    width: Math.round(rect.width),
-                                    height: Math.round(rect.height),
-                                    is_visible: isVisible,
-                                    is_enabled: !el.disabled,
-                                    href: el.href || null,
-                                    form_id: el.form?.id || null,
-                                    required: el.required || false,
-                                    element_index: index
-                                });
-                            }
-                        });
-                    });
-
-                    return elements.slice(0, 1000); // Limit to prevent memory issues
-                }
-            """
-            )
-
-            # Enhance elements with additional analysis
-            enhanced_elements = []
-            for element in elements:
-                enhanced_element = await self._enhance_element_data(element)
-                enhanced_elements.append(enhanced_element)
-
-            return enhanced_elements
+            return score_elements(snapshot.get("elements", []), reused)
 
         except Exception as e:
             logger.error("Failed to extract interactive elements", error=str(e))
             return []
 
-    async def _enhance_element_data(self, element: dict[str, Any]) -> dict[str, Any]:
-        """Enhance element data with semantic analysis."""
-
-        # Determine semantic role
-        semantic_role = self._determine_semantic_role(element)
-
-        # Calculate interaction confidence
-        interaction_confidence = self._calculate_interaction_confidence(element)
-
-        # Determine supported interactions
-        supported_interactions = self._determine_supported_interactions(element)
-
-        element.update(
-            {
-                "semantic_role": semantic_role,
-                "interaction_confidence": interaction_confidence,
-                "supported_interactions": supported_interactions,
-                "automation_complexity": self._calculate_automation_complexity(element),
-                "discovered_at": datetime.utcnow().isoformat(),
-            }
-        )
+    def _extract_content_blocks(
+        self, snapshot: dict[str, Any], reused: set[int] | None = None
+    ) -> list[dict[str, Any]]:
+        """Enhance the content blocks captured in the page snapshot.
 
-        return element
-
-    def _determine_semantic_role(self, element: dict[str, Any]) -> str:
-        """Determine the semantic role of an element."""
-
-        tag = element.get("tag_name", "").lower()
-        element_type = element.get("element_type", "").lower()
-        text = element.get("text_content", "").lower()
-        aria_label = element.get("aria_label", "").lower()
-
-        # Button-like elements
-        if tag == "button" or element_type in ["button", "submit"]:
-            if any(
-                word in text or word in aria_label
-                for word in ["submit", "send", "save"]
-            ):
-                return "submit_button"
-            elif any(
-                word in text or word in aria_label
-                for word in ["cancel", "close", "back"]
-            ):
-                return "cancel_button"
-            elif any(word in text or word in aria_label for word in ["search", "find"]):
-                return "search_button"
-            return "action_button"
-
-        # Input elements
-        if tag == "input":
-            if element_type in ["email", "text"] and any(
-                word in text or word in aria_label for word in ["email", "mail"]
-            ):
-                return "email_input"
-            elif element_type == "password":
-                return "password_input"
-            elif element_type in ["text", "search"] and any(
-                word in text or word in aria_label for word in ["search", "query"]
-            ):
-                return "search_input"
-            elif element_type == "checkbox":
-                return "checkbox"
-            elif element_type == "radio":
-                return "radio_button"
-            return "text_input"
-
-        # Links
-        if tag == "a":
-            return "navigation_link"
-
-        # Select elements
-        if tag == "select":
-            return "dropdown"
-
-        # Textarea
-        if tag == "textarea":
-            return "text_area"
-
-        return "interactive_element"
-
-    def _calculate_interaction_confidence(self, element: dict[str, Any]) -> float:
-        """Calculate confidence score for successful interaction."""
-
-        confidence = 0.5  # Base confidence
-
-        # Boost confidence for visible elements
-        if element.get("is_visible", False):
-            confidence += 0.2
-
-        # Boost confidence for enabled elements
-        if element.get("is_enabled", True):
-            confidence += 0.1
-
-        # Boost confidence for elements with clear labels
-        if (
-            element.get("aria_label")
-            or element.get("title")
-            or element.get("text_content")
-        ):
-            confidence += 0.1
-
-        # Boost confidence for standard form elements
-        if element.get("tag_name") in ["button", "input", "select", "textarea"]:
-            confidence += 0.1
-
-        return min(1.0, confidence)
-
-    def _determine_supported_interactions(self, element: dict[str, Any]) -> list[str]:
-        """Determine what interactions are supported by this element."""
-
-        interactions = []
-        tag = element.get("tag_name", "").lower()
-        element_type = element.get("element_type", "").lower()
-
-        if tag == "button" or element_type in ["button", "submit"]:
-            interactions.extend(["click", "focus"])
-        elif tag == "input":
-            if element_type in ["text", "email", "password", "search", "url", "tel"]:
-                interactions.extend(["type", "clear", "focus", "blur"])
-            elif element_type in ["checkbox", "radio"]:
-                interactions.extend(["check", "uncheck", "click"])
-            elif element_type == "file":
-                interactions.extend(["upload", "click"])
-        elif tag == "select":
-            interactions.extend(["select_option", "focus"])
-        elif tag == "textarea":
-            interactions.extend(["type", "clear", "focus", "blur"])
-        elif tag == "a":
-            interactions.extend(["click", "navigate"])
-
-        return interactions
-
-    def _calculate_automation_complexity(self, element: dict[str, Any]) -> float:
-        """Calculate automation complexity score (0.0 = easy, 1.0 = complex)."""
-
-        complexity = 0.1  # Base complexity
-
-        # Increase complexity for elements without clear identifiers
-        if not any(
-            [element.get("element_id"), element.get("aria_label"), element.get("title")]
-        ):
-            complexity += 0.2
-
-        # Increase complexity for elements with dynamic classes
-        class_name = element.get("element_class", "")
-        if any(
-            indicator in class_name for indicator in ["random", "hash", "generated"]
-        ):
-            complexity += 0.3
-
-        # Increase complexity for small or overlapping elements
-        width = element.get("width", 0)
-        height = element.get("height", 0)
-        if width < 20 or height < 20:
-            complexity += 0.2
-
-        return min(1.0, complexity)
-
-    async def _extract_content_blocks(self, page: Page) -> list[dict[str, Any]]:
-        """Extract content blocks from the page."""
+        Blocks at ``reused`` positions already carry cached analysis.
+        """
 
         try:
-            content_blocks = await page.evaluate(
-                """
-                () => {
-                    const blocks = [];
-                    const selectors = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'div', 'article', 'section', 'main'];
-
-                    selectors.forEach(selector => {
-                        document.querySelectorAll(selector).forEach((el, index) => {
-                            const text = el.textContent?.trim();
-                            if (text && text.length > 10) { // Only meaningful content
-                                const rect = el.getBoundingClientRect();
-                                blocks.push({
-                                    block_type: selector,
-                                    text_content: text.substring(0, 500), // Limit text length
-                                    x_coordinate: Math.round(rect.left),
-                                    y_coordinate: Math.round(rect.top),
-                                    width: Math.round(rect.width),
-                                    height: Math.round(rect.height),
-                                    is_visible: rect.width > 0 && rect.height > 0,
-                                    element_index: index
-                                });
-                            }
-                        });
-                    });
-
-                    return blocks.slice(0, 200); // Limit to prevent memory issues
-                }
-            """
-            )
-
-            # Enhance content blocks with semantic analysis
             enhanced_blocks = []
-            for block in content_blocks:
-                block["semantic_importance"] = self._calculate_semantic_importance(
-                    block
-                )
-                block["semantic_category"] = self._categorize_content(block)
+            for position, block in enumerate(snapshot.get("blocks", [])):
+                if not (reused and position in reused):
+                    block["semantic_importance"] = self._calculate_semantic_importance(
+                        block
+                    )
+                    block["semantic_category"] = self._categorize_content(block)
                 block["discovered_at"] = datetime.utcnow().isoformat()
                 enhanced_blocks.append(block)
 
@@ -883,40 +888,32 @@ class WebParserService:
         return capabilities
 
     async def _capture_screenshot(self, page: Page, task_id: int) -> str | None:
-        """Capture screenshot of the page."""
-
-        try:
-            # Create screenshots directory if it doesn't exist
-            import os
-
-            screenshot_dir = "screenshots"
-            os.makedirs(screenshot_dir, exist_ok=True)
+        """Capture a full-page screenshot of the parsed page."""
 
-            # Generate filename
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-            filename = f"task_{task_id}_{timestamp}.png"
-            filepath = os.path.join(screenshot_dir, filename)
-
-            # Capture screenshot
-            await page.screenshot(
-                path=filepath, full_page=True, quality=self.screenshot_quality
-            )
-
-            logger.info("Screenshot captured", task_id=task_id, path=filepath)
-            return filepath
-
-        except Exception as e:
-            logger.error("Failed to capture screenshot", task_id=task_id, error=str(e))
-            return None
+        path = await screenshot_service.capture(page, mode="full_page")
+        if path:
+            logger.info("Screenshot captured", task_id=task_id, path=path)
+        return path
 
     def _generate_content_hash(
         self,
         metadata: dict[str, Any],
         interactive_elements: list[dict[str, Any]],
         content_blocks: list[dict[str, Any]],
+        region_fingerprints: list[str] | None = None,
     ) -> str:
         """Generate a hash of the page content for caching."""
 
+        # Region fingerprints cover the whole document structure and text
+        if region_fingerprints:
+            content_str = json.dumps(
+                {
+                    "title": metadata.get("title", ""),
+                    "regions": region_fingerprints,
+                }
+            )
+            return hashlib.md5(content_str.encode(), usedforsecurity=False).hexdigest()
+
         # Create a string representation of key content
         content_str = json.dumps(
             {
@@ -3,14 +3,21 @@ Webpage Cache Service for intelligent caching of parsing results.
 
 This service provides:
 - Redis-based caching for webpage parsing results
+- Compressed binary payloads through a versioned codec
+- MAX_CACHE_SIZE_MB enforced with expiry-ordered eviction
+- In-process LRU tier of validated results, invalidated via Redis pub/sub
 - Content-aware cache keys for efficient lookups
 - TTL management and cache invalidation
-- Cache hit/miss metrics
+- Batched, pipelined cache hit/miss metrics
+- Long-lived region analysis indexes for incremental re-parsing
 - Intelligent cache warming
 """
 
+import asyncio
 import hashlib
 import json
+import uuid
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Any
 from urllib.parse import urlparse
@@ -20,9 +27,67 @@ import structlog
 
 from app.core.config import settings
 from app.schemas.web_page import WebPageParseResponse
+from app.utils.cache_codec import CacheCodec
+from app.utils.lru_cache import LRUCache
 
 logger = structlog.get_logger(__name__)
 
+# Reserve room for a new entry within the size budget, atomically across nodes.
+# Accounting for expired entries is dropped first; then the entries closest to
+# expiry are evicted until the new entry fits.
+# KEYS: expiry zset, size hash, total bytes key
+# ARGV: cache key, size, expires_at, now, max bytes, metadata key prefix
+# Returns {accepted (0|1), evicted keys...}
+RESERVE_CACHE_SPACE_SCRIPT = """
+local key = ARGV[1]
+local size = tonumber(ARGV[2])
+local now = tonumber(ARGV[4])
+local max_bytes = tonumber(ARGV[5])
+local total = tonumber(redis.call('GET', KEYS[3]) or '0')
+
+local function forget(k)
+    total = total - tonumber(redis.call('HGET', KEYS[2], k) or '0')
+    redis.call('HDEL', KEYS[2], k)
+    redis.call('ZREM', KEYS[1], k)
+end
+
+forget(key)
+for _, expired in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now)) do
+    forget(expired)
+end
+
+local result = {0}
+if size > max_bytes then
+    redis.call('SET', KEYS[3], math.max(total, 0))
+    return result
+end
+
+while total + size > max_bytes do
+    local victim = redis.call('ZRANGE', KEYS[1], 0, 0)[1]
+    if not victim then break end
+    forget(victim)
+    redis.call('DEL', victim, ARGV[6] .. victim)
+    table.insert(result, victim)
+end
+
+redis.call('HSET', KEYS[2], key, size)
+redis.call('ZADD', KEYS[1], tonumber(ARGV[3]), key)
+redis.call('SET', KEYS[3], math.max(total, 0) + size)
+result[1] = 1
+return result
+"""
+
+# Drop size accounting for one entry
+# KEYS: expiry zset, size hash, total bytes key; ARGV: cache key
+RELEASE_CACHE_SPACE_SCRIPT = """
+local size = tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '0')
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('ZREM', KEYS[1], ARGV[1])
+local total = tonumber(redis.call('GET', KEYS[3]) or '0') - size
+redis.call('SET', KEYS[3], math.max(total, 0))
+return size
+"""
+
 
 class WebpageCacheService:
     """Service for caching webpage parsing results with intelligent key management."""
@@ -31,14 +96,52 @@ class WebpageCacheService:
         self.redis_url = getattr(settings, "REDIS_URL", "redis://localhost:6379/0")
         self.default_ttl = getattr(settings, "REDIS_CACHE_TTL", 3600)  # 1 hour
         self.max_cache_size = getattr(settings, "MAX_CACHE_SIZE_MB", 100)
+        self.max_cache_bytes = self.max_cache_size * 1024 * 1024
+        self.region_index_ttl = getattr(
+            settings, "INCREMENTAL_PARSE_INDEX_TTL_SECONDS", 7 * 24 * 3600
+        )
+        self.local_cache_enabled = getattr(settings, "LOCAL_CACHE_ENABLED", True)
+        self.local_cache_ttl = getattr(settings, "LOCAL_CACHE_TTL_SECONDS", 300)
+        self.stats_flush_interval = getattr(
+            settings, "CACHE_STATS_FLUSH_INTERVAL_SECONDS", 5
+        )
+
+        # In-process tier holding validated WebPageParseResponse objects
+        self.local_cache = LRUCache(
+            max_entries=getattr(settings, "LOCAL_CACHE_MAX_ENTRIES", 256),
+            max_bytes=getattr(settings, "LOCAL_CACHE_MAX_SIZE_MB", 64) * 1024 * 1024,
+        )
+        self.node_id = uuid.uuid4().hex
+        self.INVALIDATION_CHANNEL = "webpage_cache:invalidate"
+        self._invalidation_task: asyncio.Task | None = None
+
+        # Stats counters waiting for the next pipelined flush
+        self._pending_stats: Counter = Counter()
+        self._stats_flush_task: asyncio.Task | None = None
 
         # Cache key prefixes
         self.WEBPAGE_PREFIX = "webpage:"
         self.METADATA_PREFIX = "meta:"
         self.STATS_PREFIX = "stats:"
-
-        # Redis connection
+        self.ANALYSIS_PREFIX = "analysis:"
+
+        # Size accounting keys for MAX_CACHE_SIZE_MB enforcement
+        self.SIZE_EXPIRY_KEY = "cache:size:expiry"
+        self.SIZE_ENTRIES_KEY = "cache:size:entries"
+        self.SIZE_TOTAL_KEY = "cache:size:total"
+
+        self.codec = CacheCodec(
+            serializer=getattr(settings, "CACHE_CODEC_SERIALIZER", "auto"),
+            compressor=getattr(settings, "CACHE_CODEC_COMPRESSOR", "auto"),
+            level=getattr(settings, "CACHE_COMPRESSION_LEVEL", 3),
+            min_compress_bytes=getattr(settings, "CACHE_COMPRESSION_MIN_BYTES", 1024),
+        )
+        self.entries_evicted = 0
+        self.entries_rejected = 0
+
+        # Redis connections; payloads are binary so they use their own client
         self.redis_client: redis.Redis | None = None
+        self.binary_client: redis.Redis | None = None
         self._initialized = False
 
     async def initialize(self):
@@ -55,9 +158,21 @@ class WebpageCacheService:
                 socket_timeout=5,
             )
 
+            self.binary_client = redis.from_url(
+                self.redis_url,
+                decode_responses=False,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+            )
+
             # Test connection
             await self.redis_client.ping()
 
+            if self.local_cache_enabled:
+                self._invalidation_task = asyncio.create_task(
+                    self._listen_for_invalidations()
+                )
+
             self._initialized = True
             logger.info("Webpage cache service initialized", redis_url=self.redis_url)
 
@@ -65,6 +180,7 @@ class WebpageCacheService:
             logger.error("Failed to initialize webpage cache service", error=str(e))
             # Continue without caching if Redis is not available
             self.redis_client = None
+            self.binary_client = None
 
     def _generate_cache_key(self, url: str, options: dict[str, Any] = None) -> str:
         """Generate a content-aware cache key for the webpage."""
@@ -88,6 +204,12 @@ class WebpageCacheService:
                 "wait_for_load": options.get("wait_for_load", 0),
                 "wait_for_network_idle": options.get("wait_for_network_idle", False),
             }
+            # Only non-default profiles join the key so existing entries stay valid
+            parse_profile = getattr(
+                options.get("parse_profile"), "value", options.get("parse_profile")
+            )
+            if parse_profile and parse_profile != "full":
+                relevant_options["parse_profile"] = parse_profile
             options_str = json.dumps(relevant_options, sort_keys=True)
             options_hash = hashlib.md5(
                 options_str.encode(), usedforsecurity=False
@@ -112,26 +234,38 @@ class WebpageCacheService:
         if not self.redis_client:
             return None
 
-        try:
-            cache_key = self._generate_cache_key(url, options)
+        return await self.get_cached_result_by_key(
+            self._generate_cache_key(url, options), url=url
+        )
 
+    async def get_cached_result_by_key(
+        self, cache_key: str, url: str | None = None
+    ) -> WebPageParseResponse | None:
+        """Get cached parsing result for an already generated cache key."""
+
+        if not self.redis_client:
+            return None
+
+        # Hot path: already validated, no network hop
+        if self.local_cache_enabled:
+            local_result = self.local_cache.get(cache_key)
+            if local_result is not None:
+                await self._update_cache_stats(cache_key, "hit")
+                logger.debug("Local cache hit", url=url, cache_key=cache_key)
+                # Shallow copy: callers may set top-level fields, nested data
+                # is shared and must be treated as read-only
+                return local_result.copy()
+
+        try:
             # Get cached data
-            cached_data = await self.redis_client.get(cache_key)
+            cached_data = await self.binary_client.get(cache_key)
 
             if cached_data:
                 # Update access statistics
                 await self._update_cache_stats(cache_key, "hit")
 
-                # Parse cached result
-                result_dict = json.loads(cached_data)
-
-                # Add cache metadata
-                result_dict["cached"] = True
-                result_dict["cache_key"] = cache_key
-                result_dict["retrieved_at"] = datetime.utcnow().isoformat()
-
                 logger.info("Cache hit", url=url, cache_key=cache_key)
-                return WebPageParseResponse(**result_dict)
+                return self._load_cached_payload(cache_key, cached_data)
             else:
                 # Update miss statistics
                 await self._update_cache_stats(cache_key, "miss")
@@ -139,9 +273,79 @@ class WebpageCacheService:
                 return None
 
         except Exception as e:
-            logger.error("Failed to get cached result", url=url, error=str(e))
+            logger.error(
+                "Failed to get cached result",
+                url=url,
+                cache_key=cache_key,
+                error=str(e),
+            )
             return None
 
+    async def get_cached_results_by_keys(
+        self, cache_keys: list[str]
+    ) -> dict[str, WebPageParseResponse]:
+        """Look up many cache keys at once: local tier, then one Redis MGET.
+
+        Returns only the keys that hit.
+        """
+
+        if not self.redis_client or not cache_keys:
+            return {}
+
+        results: dict[str, WebPageParseResponse] = {}
+        remote_keys = []
+        for cache_key in dict.fromkeys(cache_keys):
+            local_result = (
+                self.local_cache.get(cache_key) if self.local_cache_enabled else None
+            )
+            if local_result is not None:
+                await self._update_cache_stats(cache_key, "hit")
+                results[cache_key] = local_result.copy()
+            else:
+                remote_keys.append(cache_key)
+
+        if not remote_keys:
+            return results
+
+        try:
+            payloads = await self.binary_client.mget(remote_keys)
+        except Exception as e:
+            logger.error(
+                "Failed to get cached results", keys=len(remote_keys), error=str(e)
+            )
+            return results
+
+        for cache_key, cached_data in zip(remote_keys, payloads, strict=True):
+            if not cached_data:
+                await self._update_cache_stats(cache_key, "miss")
+                continue
+            try:
+                results[cache_key] = self._load_cached_payload(cache_key, cached_data)
+                await self._update_cache_stats(cache_key, "hit")
+            except Exception as e:
+                logger.error(
+                    "Failed to decode cached result", cache_key=cache_key, error=str(e)
+                )
+
+        logger.debug("Bulk cache lookup", keys=len(cache_keys), hits=len(results))
+        return results
+
+    def _load_cached_payload(
+        self, cache_key: str, cached_data: bytes
+    ) -> WebPageParseResponse:
+        """Decode a Redis payload, keep it in the local tier and return a copy."""
+
+        result_dict, raw_size = self.codec.decode_with_size(cached_data)
+
+        # Add cache metadata
+        result_dict["cached"] = True
+        result_dict["cache_key"] = cache_key
+        result_dict["retrieved_at"] = datetime.utcnow().isoformat()
+
+        result = WebPageParseResponse(**result_dict)
+        self._store_local(cache_key, result, self._remaining_ttl(result_dict), raw_size)
+        return result.copy()
+
     async def cache_result(
         self,
         url: str,
@@ -163,13 +367,29 @@ class WebpageCacheService:
             cache_data["cached_at"] = datetime.utcnow().isoformat()
             cache_data["cache_ttl"] = ttl
 
+            # Encode once; the payload size drives all size accounting
+            payload, raw_size = self.codec.encode_with_size(cache_data)
+
+            if not await self._reserve_cache_space(cache_key, len(payload), ttl):
+                logger.warning(
+                    "Result larger than cache budget, not cached",
+                    url=url,
+                    size_kb=round(len(payload) / 1024, 1),
+                    max_cache_size_mb=self.max_cache_size,
+                )
+                return False
+
             # Store in Redis
-            await self.redis_client.setex(
-                cache_key, ttl, json.dumps(cache_data, default=str)
-            )
+            await self.binary_client.setex(cache_key, ttl, payload)
+
+            # Keep a validated copy locally and drop stale copies on other nodes
+            self._store_local(cache_key, result.copy(), ttl, raw_size)
+            await self._publish_invalidation(cache_key)
 
             # Store metadata
-            await self._store_cache_metadata(cache_key, url, result, ttl)
+            await self._store_cache_metadata(
+                cache_key, url, result, ttl, len(payload), raw_size
+            )
 
             # Update statistics
             await self._update_cache_stats(cache_key, "store")
@@ -179,7 +399,8 @@ class WebpageCacheService:
                 url=url,
                 cache_key=cache_key,
                 ttl=ttl,
-                size_kb=len(json.dumps(cache_data)) / 1024,
+                size_kb=round(len(payload) / 1024, 1),
+                raw_size_kb=round(raw_size / 1024, 1),
             )
             return True
 
@@ -187,6 +408,146 @@ class WebpageCacheService:
             logger.error("Failed to cache result", url=url, error=str(e))
             return False
 
+    async def _reserve_cache_space(self, cache_key: str, size: int, ttl: int) -> bool:
+        """Make room for an entry within MAX_CACHE_SIZE_MB, evicting if needed."""
+
+        now = datetime.utcnow().timestamp()
+        result = await self.redis_client.eval(
+            RESERVE_CACHE_SPACE_SCRIPT,
+            3,
+            self.SIZE_EXPIRY_KEY,
+            self.SIZE_ENTRIES_KEY,
+            self.SIZE_TOTAL_KEY,
+            cache_key,
+            size,
+            now + ttl,
+            now,
+            self.max_cache_bytes,
+            self.METADATA_PREFIX,
+        )
+
+        accepted, evicted = int(result[0]), result[1:]
+        if not accepted:
+            self.entries_rejected += 1
+            return False
+
+        if evicted:
+            self.entries_evicted += len(evicted)
+            logger.info(
+                "Evicted cache entries to stay within size budget",
+                evicted=len(evicted),
+                max_cache_size_mb=self.max_cache_size,
+            )
+            for evicted_key in evicted:
+                self.local_cache.delete(evicted_key)
+                await self._publish_invalidation(evicted_key)
+
+        return True
+
+    def _store_local(
+        self, cache_key: str, result: WebPageParseResponse, ttl: float, size: int
+    ):
+        """Put a validated result in the in-process tier."""
+        if self.local_cache_enabled:
+            self.local_cache.set(
+                cache_key, result, min(ttl, self.local_cache_ttl), size
+            )
+
+    def _remaining_ttl(self, result_dict: dict[str, Any]) -> float:
+        """Seconds until a Redis entry read back from the cache expires."""
+        try:
+            cached_at = datetime.fromisoformat(result_dict["cached_at"])
+            expires_at = cached_at + timedelta(seconds=int(result_dict["cache_ttl"]))
+            return (expires_at - datetime.utcnow()).total_seconds()
+        except (KeyError, TypeError, ValueError):
+            return self.local_cache_ttl
+
+    async def _publish_invalidation(self, cache_key: str):
+        """Tell other nodes to drop their local copy of ``cache_key``."""
+        if not self.local_cache_enabled:
+            return
+
+        try:
+            await self.redis_client.publish(
+                self.INVALIDATION_CHANNEL,
+                json.dumps({"key": cache_key, "node": self.node_id}),
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to publish cache invalidation",
+                cache_key=cache_key,
+                error=str(e),
+            )
+
+    async def _listen_for_invalidations(self):
+        """Drop local entries invalidated by other nodes."""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if not message or message.get("type") != "message":
+                        continue
+
+                    payload = json.loads(message["data"])
+                    if payload.get("node") != self.node_id:
+                        self.local_cache.delete(payload.get("key", ""))
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may have been missed while disconnected
+                self.local_cache.clear()
+                logger.warning("Cache invalidation listener error", error=str(e))
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.unsubscribe(self.INVALIDATION_CHANNEL)
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    def _region_index_key(self, url: str) -> str:
+        """Key the region index by URL only; analysis does not depend on options."""
+        return self._generate_cache_key(url).replace(
+            self.WEBPAGE_PREFIX, self.ANALYSIS_PREFIX, 1
+        )
+
+    async def get_region_index(self, url: str) -> dict[str, Any] | None:
+        """Get the region analysis index left by the last parse of a URL."""
+
+        if not self.redis_client:
+            return None
+
+        try:
+            cached_index = await self.binary_client.get(self._region_index_key(url))
+            return self.codec.decode(cached_index) if cached_index else None
+
+        except Exception as e:
+            logger.error("Failed to get region index", url=url, error=str(e))
+            return None
+
+    async def cache_region_index(self, url: str, region_index: dict[str, Any]) -> bool:
+        """Store the region analysis index; it outlives the parse result."""
+
+        if not self.redis_client:
+            return False
+
+        try:
+            await self.binary_client.setex(
+                self._region_index_key(url),
+                self.region_index_ttl,
+                self.codec.encode(region_index),
+            )
+            return True
+
+        except Exception as e:
+            logger.error("Failed to cache region index", url=url, error=str(e))
+            return False
+
     def _calculate_intelligent_ttl(self, url: str, result: WebPageParseResponse) -> int:
         """Calculate intelligent TTL based on content characteristics."""
 
@@ -219,7 +580,13 @@ class WebpageCacheService:
         return base_ttl
 
     async def _store_cache_metadata(
-        self, cache_key: str, url: str, result: WebPageParseResponse, ttl: int
+        self,
+        cache_key: str,
+        url: str,
+        result: WebPageParseResponse,
+        ttl: int,
+        size_bytes: int,
+        raw_size_bytes: int,
     ):
         """Store metadata about cached entries."""
 
@@ -235,6 +602,8 @@ class WebpageCacheService:
                 "content_blocks": len(result.web_page.content_blocks),
                 "has_screenshot": len(result.screenshots) > 0,
                 "content_hash": result.web_page.content_hash,
+                "size_bytes": size_bytes,
+                "raw_size_bytes": raw_size_bytes,
             }
 
             await self.redis_client.setex(
@@ -249,22 +618,42 @@ class WebpageCacheService:
             )
 
     async def _update_cache_stats(self, cache_key: str, operation: str):
-        """Update cache statistics."""
+        """Count a cache operation; counters are flushed to Redis in batches."""
+
+        self._pending_stats[operation] += 1
+        if self._stats_flush_task is None or self._stats_flush_task.done():
+            self._stats_flush_task = asyncio.create_task(self._stats_flush_loop())
+
+    async def _stats_flush_loop(self):
+        """Flush pending counters every interval until none are left."""
+        while self._pending_stats:
+            await asyncio.sleep(self.stats_flush_interval)
+            await self._flush_cache_stats()
+
+    async def _flush_cache_stats(self):
+        """Write pending counters in one pipelined round-trip."""
+
+        if not self._pending_stats or not self.redis_client:
+            return
 
+        pending, self._pending_stats = self._pending_stats, Counter()
         try:
             stats_key = (
                 f"{self.STATS_PREFIX}daily:{datetime.utcnow().strftime('%Y-%m-%d')}"
             )
 
-            # Increment counters
-            await self.redis_client.hincrby(stats_key, f"{operation}_count", 1)
-            await self.redis_client.hincrby(stats_key, "total_operations", 1)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for operation, count in pending.items():
+                    pipe.hincrby(stats_key, f"{operation}_count", count)
+                pipe.hincrby(stats_key, "total_operations", sum(pending.values()))
 
-            # Set expiry for stats (keep for 7 days)
-            await self.redis_client.expire(stats_key, 7 * 24 * 3600)
+                # Set expiry for stats (keep for 7 days)
+                pipe.expire(stats_key, 7 * 24 * 3600)
+                await pipe.execute()
 
         except Exception as e:
             logger.error("Failed to update cache stats", error=str(e))
+            self._pending_stats.update(pending)
 
     async def invalidate_cache(self, url: str, options: dict[str, Any] = None) -> bool:
         """Invalidate cached result for a specific URL."""
@@ -279,6 +668,16 @@ class WebpageCacheService:
             deleted_count = await self.redis_client.delete(
                 cache_key, f"{self.METADATA_PREFIX}{cache_key}"
             )
+            await self.redis_client.eval(
+                RELEASE_CACHE_SPACE_SCRIPT,
+                3,
+                self.SIZE_EXPIRY_KEY,
+                self.SIZE_ENTRIES_KEY,
+                self.SIZE_TOTAL_KEY,
+                cache_key,
+            )
+            self.local_cache.delete(cache_key)
+            await self._publish_invalidation(cache_key)
 
             logger.info(
                 "Cache invalidated", url=url, cache_key=cache_key, deleted=deleted_count
@@ -296,6 +695,8 @@ class WebpageCacheService:
             return {"error": "Redis not available"}
 
         try:
+            await self._flush_cache_stats()
+
             today = datetime.utcnow().strftime("%Y-%m-%d")
             stats_key = f"{self.STATS_PREFIX}daily:{today}"
 
@@ -321,12 +722,47 @@ class WebpageCacheService:
                     redis_info.get("used_memory", 0) / 1024 / 1024, 2
                 ),
                 "redis_connected": True,
+                "cache_size_mb": round(
+                    int(await self.redis_client.get(self.SIZE_TOTAL_KEY) or 0)
+                    / 1024
+                    / 1024,
+                    2,
+                ),
+                "max_cache_size_mb": self.max_cache_size,
+                "entries_evicted": self.entries_evicted,
+                "entries_rejected": self.entries_rejected,
+                "codec": self.codec.get_stats(),
+                "local_cache": self.local_cache.get_stats(),
             }
 
         except Exception as e:
             logger.error("Failed to get cache stats", error=str(e))
             return {"error": str(e)}
 
+    async def shutdown(self):
+        """Flush pending stats and stop the invalidation listener."""
+        for task in (self._invalidation_task, self._stats_flush_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._invalidation_task = None
+        self._stats_flush_task = None
+
+        await self._flush_cache_stats()
+        self.local_cache.clear()
+
+        for client in (self.redis_client, self.binary_client):
+            if client:
+                await client.close()
+        self.redis_client = None
+        self.binary_client = None
+        self._initialized = False
+
+        logger.info("Webpage cache service shutdown complete")
+
 
 # Global cache service instance
 webpage_cache_service = WebpageCacheService()
@@ -0,0 +1,395 @@
+"""
+Shared on-disk cache for static assets loaded by browser contexts.
+
+This module provides:
+- Context-level request routing that serves scripts, stylesheets, fonts and
+  images from disk instead of the network
+- Entries keyed by URL and ETag, revalidated with conditional requests
+- Freshness from Cache-Control, honoring no-store, no-cache and private
+- A size-bounded store with least-recently-used eviction, shared by every
+  pooled context (and every worker process pointing at the same directory).
+  The budget covers what is on disk when the cache is first used, plus what
+  this process stores or reads afterwards
+- Hit, revalidation and bytes-saved accounting
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any
+
+import structlog
+from playwright.async_api import BrowserContext, Route
+
+logger = structlog.get_logger(__name__)
+
+CACHEABLE_RESOURCE_TYPES = frozenset({"script", "stylesheet", "font", "image"})
+
+# Only URLs that look like static files are routed at all
+STATIC_ASSET_PATTERN = re.compile(
+    r"^https?://[^?#]+\.(?:m?js|css|woff2?|ttf|otf|eot|png|jpe?g|gif|webp|avif|svg|ico)"
+    r"(?:[?#]|$)",
+    re.IGNORECASE,
+)
+
+# Response headers replayed when serving from disk. Bodies are stored
+# decoded, so content-encoding and content-length are deliberately dropped.
+REPLAYED_HEADERS = frozenset(
+    {
+        "content-type",
+        "cache-control",
+        "etag",
+        "last-modified",
+        "expires",
+        "access-control-allow-origin",
+        "access-control-allow-credentials",
+        "timing-allow-origin",
+        "cross-origin-resource-policy",
+    }
+)
+
+MAX_AGE_PATTERN = re.compile(r"(?:^|,)\s*max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+# Unreferenced bodies younger than this may belong to a write in progress
+ORPHAN_GRACE_SECONDS = 300
+
+
+def _cache_control(headers: dict[str, str]) -> str:
+    return headers.get("cache-control", "").lower()
+
+
+def freshness_lifetime(headers: dict[str, str]) -> float | None:
+    """Seconds a response may be served without revalidation.
+
+    Returns None when the response must not be stored by a shared cache.
+    """
+    cache_control = _cache_control(headers)
+    if "no-store" in cache_control or "private" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0.0
+    match = MAX_AGE_PATTERN.search(cache_control)
+    if match:
+        return float(match.group(1))
+    # Without an explicit lifetime the entry is only useful for revalidation
+    if headers.get("etag") or headers.get("last-modified"):
+        return 0.0
+    return None
+
+
+class AssetCache:
+    """Serves static assets for browser contexts from a shared disk cache."""
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_asset_bytes: int = 10 * 1024 * 1024,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_asset_bytes = max_asset_bytes
+
+        # url -> entry metadata, least recently used first
+        self._index: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._bytes = 0
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+        # Stats
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    async def install(self, context: BrowserContext):
+        """Route the context's static asset requests through the cache."""
+        await context.route(STATIC_ASSET_PATTERN, self._handle_route)
+
+    @staticmethod
+    def _key(value: str) -> str:
+        return hashlib.sha256(value.encode()).hexdigest()
+
+    def _meta_path(self, url: str) -> str:
+        key = self._key(url)
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _body_path(self, url: str, etag: str) -> str:
+        key = self._key(f"{url}\n{etag}")
+        return os.path.join(self.directory, key[:2], f"{key}.body")
+
+    async def _handle_route(self, route: Route):
+        request = route.request
+        if request.method != "GET" or request.resource_type not in (
+            CACHEABLE_RESOURCE_TYPES
+        ):
+            await route.fallback()
+            return
+
+        url = request.url
+        try:
+            entry = await self._lookup(url)
+            body = None
+            if entry is not None:
+                body = await asyncio.to_thread(self._read_file, entry["body_path"])
+                if body is None:
+                    self._forget(url)
+                    entry = None
+
+            if entry is not None and entry["fresh_until"] > time.time():
+                self.hits += 1
+                self.bytes_saved += len(body)
+                await route.fulfill(
+                    status=entry["status"], headers=entry["headers"], body=body
+                )
+                return
+
+            headers = dict(request.headers)
+            if entry is not None:
+                if entry.get("etag"):
+                    headers["if-none-match"] = entry["etag"]
+                if entry["headers"].get("last-modified"):
+                    headers["if-modified-since"] = entry["headers"]["last-modified"]
+            response = await route.fetch(headers=headers)
+        except Exception as e:
+            # The page may have closed; let the request proceed uncached
+            logger.debug("Asset cache lookup failed", url=url, error=str(e))
+            await self._fall_back(route)
+            return
+
+        try:
+            if entry is not None and response.status == 304:
+                self.revalidations += 1
+                self.bytes_saved += len(body)
+                lifetime = freshness_lifetime(response.headers)
+                entry["fresh_until"] = time.time() + (lifetime or 0.0)
+                await asyncio.to_thread(self._write_meta, url, entry)
+                await route.fulfill(
+                    status=entry["status"], headers=entry["headers"], body=body
+                )
+                return
+
+            self.misses += 1
+            fresh_body = await response.body()
+            if response.status == 200:
+                await self._store(url, response.headers, fresh_body)
+            await route.fulfill(response=response, body=fresh_body)
+
+        except Exception as e:
+            # Storing failed (e.g. a full or unwritable cache directory); the
+            # request must still be answered with what was fetched
+            logger.debug("Asset cache fill failed", url=url, error=str(e))
+            try:
+                if response.status == 304 and body is not None:
+                    await route.fulfill(
+                        status=entry["status"], headers=entry["headers"], body=body
+                    )
+                else:
+                    await route.fulfill(response=response)
+            except Exception:
+                await self._fall_back(route)
+
+    @staticmethod
+    async def _fall_back(route: Route):
+        """Let the request proceed uncached, ignoring a closed page."""
+        try:
+            await route.fallback()
+        except Exception:
+            pass
+
+    async def _ensure_loaded(self):
+        """Index entries left on disk by earlier runs and other workers."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            for url, entry in await asyncio.to_thread(self._scan):
+                if url not in self._index:
+                    self._track(url, entry)
+            self._loaded = True
+            logger.info(
+                "Asset cache index loaded", entries=len(self._index), bytes=self._bytes
+            )
+        await self._evict()
+
+    async def _lookup(self, url: str) -> dict[str, Any] | None:
+        await self._ensure_loaded()
+        entry = self._index.get(url)
+        if entry is not None:
+            self._index.move_to_end(url)
+            return entry
+
+        # Another worker sharing the directory may have stored it
+        entry = await asyncio.to_thread(self._read_meta, url)
+        if entry is not None:
+            self._track(url, entry)
+        return entry
+
+    async def _store(self, url: str, headers: dict[str, str], body: bytes):
+        await self._ensure_loaded()
+        lifetime = freshness_lifetime(headers)
+        vary = headers.get("vary", "").lower()
+        if (
+            lifetime is None
+            or len(body) > self.max_asset_bytes
+            or "*" in vary
+            or "cookie" in vary
+        ):
+            return
+
+        etag = headers.get("etag", "")
+        entry = {
+            "url": url,
+            "etag": etag,
+            "status": 200,
+            "headers": {
+                name: value
+                for name, value in headers.items()
+                if name.lower() in REPLAYED_HEADERS
+            },
+            "size": len(body),
+            "fresh_until": time.time() + lifetime,
+            "body_path": self._body_path(url, etag),
+        }
+        previous = self._index.get(url)
+        await asyncio.to_thread(self._write_entry, url, entry, body, previous)
+
+        self._forget(url)
+        self._track(url, entry)
+        self.stores += 1
+        await self._evict()
+
+    def _track(self, url: str, entry: dict[str, Any]):
+        self._index[url] = entry
+        self._bytes += entry["size"]
+
+    def _forget(self, url: str):
+        entry = self._index.pop(url, None)
+        if entry is not None:
+            self._bytes -= entry["size"]
+
+    async def _evict(self):
+        while self._bytes > self.max_bytes and self._index:
+            url, entry = self._index.popitem(last=False)
+            self._bytes -= entry["size"]
+            self.evictions += 1
+            await asyncio.to_thread(
+                self._remove_files, [self._meta_path(url), entry["body_path"]]
+            )
+
+    @staticmethod
+    def _remove_files(paths: list[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _scan(self) -> list[tuple[str, dict[str, Any]]]:
+        """Entries on disk, least recently written first.
+
+        Meta files whose body is gone are removed, as are bodies and partial
+        writes no entry points at once they are past the grace period.
+        """
+        metas = []
+        others = {}
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    modified = os.stat(path).st_mtime
+                except OSError:
+                    continue
+                if name.endswith(".json"):
+                    metas.append((modified, path))
+                else:
+                    others[path] = modified
+
+        entries = []
+        dangling = []
+        for _, path in sorted(metas):
+            raw = self._read_file(path)
+            try:
+                entry = json.loads(raw) if raw is not None else None
+            except ValueError:
+                entry = None
+            if not isinstance(entry, dict) or "url" not in entry:
+                continue
+            if others.pop(entry.get("body_path"), None) is None:
+                dangling.append(path)
+                continue
+            entries.append((entry["url"], entry))
+
+        cutoff = time.time() - ORPHAN_GRACE_SECONDS
+        self._remove_files(
+            dangling + [path for path, modified in others.items() if modified < cutoff]
+        )
+        return entries
+
+    @staticmethod
+    def _read_file(path: str) -> bytes | None:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _read_meta(self, url: str) -> dict[str, Any] | None:
+        raw = self._read_file(self._meta_path(url))
+        if raw is None:
+            return None
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return None
+        return entry if entry.get("url") == url else None
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _write_meta(self, url: str, entry: dict[str, Any]):
+        self._atomic_write(self._meta_path(url), json.dumps(entry).encode())
+
+    def _write_entry(
+        self,
+        url: str,
+        entry: dict[str, Any],
+        body: bytes,
+        previous: dict[str, Any] | None,
+    ):
+        # Body first, so a readable meta file always points at a full body
+        self._atomic_write(entry["body_path"], body)
+        self._write_meta(url, entry)
+        if previous and previous["body_path"] != entry["body_path"]:
+            self._remove_files([previous["body_path"]])
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get asset cache statistics."""
+        served = self.hits + self.revalidations
+        requests = served + self.misses
+        return {
+            "entries": len(self._index),
+            "size_mb": round(self._bytes / 1024 / 1024, 2),
+            "max_size_mb": round(self.max_bytes / 1024 / 1024, 2),
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "bytes_saved_mb": round(self.bytes_saved / 1024 / 1024, 2),
+            "hit_rate_percentage": (
+                round(served / requests * 100, 2) if requests else 0
+            ),
+        }
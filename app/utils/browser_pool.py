@@ -3,51 +3,288 @@ Browser Pool Manager for efficient browser context management.
 
 This module provides:
 - Browser context pooling for resource efficiency
+- Sharding of contexts across several Chromium processes
+- Per-browser health checks and recycling of hung or bloated browsers
 - Anti-detection features and stealth mode
-- Resource monitoring and cleanup
-- Context lifecycle management
+- Autoscaling between min/max bounds on acquire wait time and idleness
+- Chromium memory monitoring via the process tree and CDP metrics
+- Context lifecycle management through leases released exactly once
+- Fast CDP-based context reset with a blank page kept ready for the next task
+- Per-domain warm contexts with optional preconnect for hot target sites
+- An optional shared disk cache for static assets and HAR record/replay
 - Performance optimization
 """
 
 import asyncio
+import glob
+import heapq
+import math
+import os
+import time
 import uuid
-from datetime import datetime
+from collections import Counter, deque
+from datetime import datetime, timedelta
 from typing import Any
+from urllib.parse import urlsplit
 
 import psutil
 import structlog
-from playwright.async_api import Browser, BrowserContext, async_playwright
+from playwright.async_api import Browser, BrowserContext, Page, async_playwright
 
 from app.core.config import settings
+from app.utils.asset_cache import AssetCache
 
 logger = structlog.get_logger(__name__)
 
+CHROMIUM_PROCESS_NAMES = ("chrome", "chromium", "headless_shell")
+
+# Acquire wait samples kept for percentiles; the autoscaler looks at a
+# shorter recent window
+WAIT_SAMPLE_LIMIT = 1000
+WAIT_WINDOW_SECONDS = 60
+
+# Consecutive failed liveness probes before a browser is recycled
+HEALTH_CHECK_MAX_FAILURES = 2
+
+# How often expired leases are reclaimed
+LEASE_REAP_INTERVAL_SECONDS = 10
+
+# Recent target origins considered when deciding which domains are hot
+DOMAIN_HISTORY_LIMIT = 200
+
+# Permissions every context is created with, restored after each reset
+BASELINE_PERMISSIONS = ["geolocation"]
+
+
+def origin_of(url: str | None) -> str | None:
+    """``scheme://host[:port]`` of an http(s) URL, else None."""
+    if not url:
+        return None
+    parts = urlsplit(url)
+    if parts.scheme in ("http", "https") and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc}"
+    return None
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list (0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def measure_chromium_memory() -> dict[str, Any]:
+    """Sum resident memory of the Chromium processes spawned by this process.
+
+    Playwright launches Chromium under its driver, so the browser, GPU,
+    utility and renderer processes are all descendants of the interpreter.
+    """
+    total_bytes = 0
+    processes = 0
+    renderer_bytes: list[int] = []
+
+    for child in psutil.Process().children(recursive=True):
+        try:
+            name = child.name().lower()
+            if not any(marker in name for marker in CHROMIUM_PROCESS_NAMES):
+                continue
+            rss = child.memory_info().rss
+            total_bytes += rss
+            processes += 1
+            if "--type=renderer" in child.cmdline():
+                renderer_bytes.append(rss)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+
+    return {
+        "total_rss_mb": round(total_bytes / 1024 / 1024, 1),
+        "processes": processes,
+        "renderers": len(renderer_bytes),
+        "max_renderer_rss_mb": round(max(renderer_bytes, default=0) / 1024 / 1024, 1),
+    }
+
+
+def measure_processes_memory(pids: list[int]) -> float:
+    """Sum resident memory of the given processes in MB, skipping exited ones."""
+    total_bytes = 0
+    for pid in pids:
+        try:
+            total_bytes += psutil.Process(pid).memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+    return round(total_bytes / 1024 / 1024, 1)
+
+
+class BrowserLease:
+    """Exclusive use of one pooled browser context.
+
+    Release it exactly once, either explicitly or by using the lease as an
+    async context manager. Leases not released before they expire are
+    reclaimed by the pool and their context is closed.
+    """
+
+    def __init__(
+        self,
+        pool: "BrowserPoolManager",
+        context_info: dict[str, Any],
+        timeout_seconds: float,
+    ):
+        self.id = str(uuid.uuid4())
+        self.task_id = context_info["current_task_id"]
+        self.context_id = context_info["id"]
+        self.context: BrowserContext = context_info["context"]
+        self.target_origin: str | None = None
+        self._ready_page: Page | None = context_info["blank_page"]
+        context_info["blank_page"] = None
+        self.acquired_at = time.monotonic()
+        self.expires_at = self.acquired_at + timeout_seconds
+        self.released = False
+        self._pool = pool
+
+    async def new_page(self) -> Page:
+        """Open a page, using the context's pre-created blank page first."""
+        page, self._ready_page = self._ready_page, None
+        if page is not None and not page.is_closed():
+            return page
+        return await self.context.new_page()
+
+    async def release(self):
+        """Return the context to the pool; later calls are no-ops."""
+        await self._pool.release_context(self)
+
+    def renew(self, timeout_seconds: float | None = None):
+        """Push the expiry out for long-running work."""
+        self._pool.renew_lease(self, timeout_seconds)
+
+    async def __aenter__(self) -> "BrowserLease":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
+
 
 class BrowserPoolManager:
     """Manages a pool of browser contexts for efficient resource utilization."""
 
     def __init__(self):
-        self.pool_size = getattr(settings, "BROWSER_POOL_SIZE", 5)
+        self.min_size = getattr(settings, "BROWSER_POOL_MIN_SIZE", 2)
+        self.max_size = max(
+            self.min_size, getattr(settings, "BROWSER_POOL_MAX_SIZE", 10)
+        )
+        self.acquire_timeout_seconds = getattr(
+            settings, "BROWSER_POOL_ACQUIRE_TIMEOUT_SECONDS", 30
+        )
+        self.scale_up_wait_seconds = (
+            getattr(settings, "BROWSER_POOL_SCALE_UP_WAIT_MS", 500) / 1000
+        )
+        self.scale_down_idle_seconds = getattr(
+            settings, "BROWSER_POOL_SCALE_DOWN_IDLE_SECONDS", 120
+        )
+        self.autoscale_interval_seconds = getattr(
+            settings, "BROWSER_POOL_AUTOSCALE_INTERVAL_SECONDS", 5
+        )
+        self.min_free_memory_mb = getattr(
+            settings, "BROWSER_POOL_MIN_FREE_MEMORY_MB", 1024
+        )
         self.max_context_age_minutes = getattr(
             settings, "BROWSER_CONTEXT_MAX_AGE_MINUTES", 30
         )
         self.max_memory_mb = getattr(settings, "BROWSER_MAX_MEMORY_MB", 512)
+        self.max_total_memory_mb = getattr(
+            settings, "BROWSER_MAX_TOTAL_MEMORY_MB", 4096
+        )
+        self.browser_count = max(1, getattr(settings, "BROWSER_POOL_BROWSERS", 2))
+        self.max_browser_memory_mb = getattr(
+            settings, "BROWSER_MAX_PROCESS_MEMORY_MB", 2048
+        )
+        self.health_check_interval_seconds = getattr(
+            settings, "BROWSER_HEALTH_CHECK_INTERVAL_SECONDS", 30
+        )
+        self.health_check_timeout_seconds = getattr(
+            settings, "BROWSER_HEALTH_CHECK_TIMEOUT_SECONDS", 5
+        )
+        self.lease_timeout_seconds = getattr(
+            settings, "BROWSER_LEASE_TIMEOUT_SECONDS", 600
+        )
+        self.reset_mode = getattr(settings, "BROWSER_CONTEXT_RESET_MODE", "cdp")
+        self.warm_domains = set(getattr(settings, "BROWSER_WARM_DOMAINS", []))
+        self.warm_domain_min_hits = getattr(settings, "BROWSER_WARM_DOMAIN_MIN_HITS", 3)
+        self.preconnect_enabled = getattr(settings, "BROWSER_PRECONNECT_ENABLED", True)
+
+        # Network routing: HAR record/replay for benchmarks, else the
+        # optional shared asset cache
+        self.har_mode = getattr(settings, "BROWSER_HAR_MODE", "off")
+        self.har_dir = getattr(settings, "BROWSER_HAR_DIR", "har")
+        self.har_not_found = getattr(settings, "BROWSER_HAR_NOT_FOUND", "abort")
+        self.asset_cache: AssetCache | None = None
+        if self.har_mode == "off" and getattr(
+            settings, "BROWSER_ASSET_CACHE_ENABLED", False
+        ):
+            self.asset_cache = AssetCache(
+                getattr(settings, "BROWSER_ASSET_CACHE_DIR", "cache/assets"),
+                max_bytes=getattr(settings, "BROWSER_ASSET_CACHE_MAX_SIZE_MB", 512)
+                * 1024
+                * 1024,
+            )
 
-        # Pool management
-        self.available_contexts: asyncio.Queue = asyncio.Queue(maxsize=self.pool_size)
+        # Pool management. LIFO hands out the most recently released context
+        # first so surplus contexts actually go idle and can be retired.
+        self.available_contexts: asyncio.LifoQueue = asyncio.LifoQueue(
+            maxsize=self.max_size
+        )
         self.active_contexts: dict[str, dict] = {}  # context_id -> context_info
-        self.browser: Browser | None = None
+        self.browsers: dict[str, dict] = {}  # browser_id -> browser_info
+        self.leases: dict[str, BrowserLease] = {}  # lease_id -> lease
+
+        # (expires_at, lease_id); entries for released or renewed leases
+        # are skipped lazily when popped
+        self._lease_expiries: list[tuple[float, str]] = []
         self.playwright = None
 
+        # Every open context, including ones being created
+        self._context_count = 0
+
+        # Acquire wait tracking: start times of pending acquires (oldest
+        # first) and (finished_at, wait_seconds) samples
+        self._waiters: list[float] = []
+        self._wait_samples: deque[tuple[float, float]] = deque(maxlen=WAIT_SAMPLE_LIMIT)
+        self._scale_event = asyncio.Event()
+        self.browser_memory: dict[str, Any] = {}
+
+        # Recent acquire target origins, to find hot domains worth keeping warm
+        self._recent_domains: deque[str] = deque(maxlen=DOMAIN_HISTORY_LIMIT)
+        self._domain_counts: Counter[str] = Counter()
+
         # Stats
         self.contexts_created = 0
         self.contexts_reused = 0
         self.contexts_cleanup = 0
-
-        # Cleanup task
+        self.acquire_timeouts = 0
+        self.scale_ups = 0
+        self.scale_downs = 0
+        self.scale_ups_blocked = 0
+        self.browsers_launched = 0
+        self.browsers_recycled = 0
+        self.leases_reclaimed = 0
+        self.duplicate_releases = 0
+        self.warm_hits = 0
+        self.warm_misses = 0
+        self.preconnects = 0
+
+        # Background tasks
         self._cleanup_task: asyncio.Task | None = None
+        self._autoscale_task: asyncio.Task | None = None
+        self._health_task: asyncio.Task | None = None
+        self._lease_task: asyncio.Task | None = None
+        self._recycle_tasks: set[asyncio.Task] = set()
         self._initialized = False
 
+    @property
+    def pool_size(self) -> int:
+        """Current number of open contexts."""
+        return self._context_count
+
     async def initialize(self):
         """Initialize the browser pool."""
         if self._initialized:
@@ -56,53 +293,115 @@ class BrowserPoolManager:
         try:
             self.playwright = await async_playwright().start()
 
-            # Launch browser with optimized settings
-            self.browser = await self.playwright.chromium.launch(
-                headless=getattr(settings, "HEADLESS", True),
-                args=[
-                    "--no-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-gpu",
-                    "--disable-extensions",
-                    "--disable-default-apps",
-                    "--disable-background-timer-throttling",
-                    "--disable-renderer-backgrounding",
-                    "--disable-backgrounding-occluded-windows",
-                    "--memory-pressure-off",
-                    f"--max_old_space_size={self.max_memory_mb}",
-                    "--disable-web-security",
-                    "--disable-features=TranslateUI",
-                    "--disable-ipc-flooding-protection",
-                ],
+            # Launch the browser shards concurrently
+            await asyncio.gather(
+                *(self._launch_browser() for _ in range(self.browser_count))
             )
 
             # Pre-warm the pool with contexts
             await self._populate_pool()
 
-            # Start cleanup task
+            # Start background tasks
             self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
+            self._autoscale_task = asyncio.create_task(self._autoscale_loop())
+            self._health_task = asyncio.create_task(self._health_check_loop())
+            self._lease_task = asyncio.create_task(self._lease_reaper_loop())
 
             self._initialized = True
-            logger.info("Browser pool initialized", pool_size=self.pool_size)
+            logger.info(
+                "Browser pool initialized",
+                browsers=len(self.browsers),
+                pool_size=self.pool_size,
+                min_size=self.min_size,
+                max_size=self.max_size,
+            )
 
         except Exception as e:
             logger.error("Failed to initialize browser pool", error=str(e))
             raise
 
+    async def _launch_browser(self) -> dict[str, Any]:
+        """Launch one Chromium process and register it as a pool shard."""
+        browser_id = str(uuid.uuid4())
+
+        # Launch browser with optimized settings
+        browser = await self.playwright.chromium.launch(
+            headless=getattr(settings, "HEADLESS", True),
+            args=[
+                "--no-sandbox",
+                "--disable-dev-shm-usage",
+                "--disable-gpu",
+                "--disable-extensions",
+                "--disable-default-apps",
+                "--disable-background-timer-throttling",
+                "--disable-renderer-backgrounding",
+                "--disable-backgrounding-occluded-windows",
+                "--memory-pressure-off",
+                f"--max_old_space_size={self.max_memory_mb}",
+                "--disable-web-security",
+                "--disable-features=TranslateUI",
+                "--disable-ipc-flooding-protection",
+            ],
+        )
+
+        browser_info = {
+            "id": browser_id,
+            "browser": browser,
+            "created_at": datetime.utcnow(),
+            "contexts": 0,  # Open contexts, including ones being created
+            "memory_mb": 0.0,
+            "failed_checks": 0,
+            "draining": False,
+        }
+        self.browsers[browser_id] = browser_info
+        browser.on("disconnected", lambda _: self._on_browser_disconnected(browser_id))
+
+        self.browsers_launched += 1
+        logger.info("Launched pooled browser", browser_id=browser_id)
+        return browser_info
+
+    def _select_browser(self) -> dict[str, Any]:
+        """Pick the least-loaded live browser for a new context."""
+        candidates = [
+            info
+            for info in self.browsers.values()
+            if not info["draining"] and info["browser"].is_connected()
+        ]
+        if not candidates:
+            raise RuntimeError("Browser not initialized")
+        return min(candidates, key=lambda info: (info["contexts"], info["memory_mb"]))
+
     async def _populate_pool(self):
-        """Pre-populate the pool with browser contexts."""
-        for _ in range(self.pool_size):
-            try:
-                context = await self._create_context()
-                await self.available_contexts.put(context)
-            except Exception as e:
-                logger.error("Failed to create initial context", error=str(e))
-                break
+        """Pre-populate the pool with the minimum number of contexts."""
+        await self._grow(self.min_size)
+
+    async def _grow(self, count: int) -> int:
+        """Create up to ``count`` contexts concurrently and make them available."""
+        count = min(count, self.max_size - self._context_count)
+        if count <= 0:
+            return 0
+
+        # Reserve the slots first so concurrent growth cannot overshoot max
+        self._context_count += count
+        results = await asyncio.gather(
+            *(self._create_context() for _ in range(count)), return_exceptions=True
+        )
+
+        created = 0
+        for result in results:
+            if isinstance(result, Exception):
+                self._context_count -= 1
+                logger.error("Failed to create pooled context", error=str(result))
+            else:
+                self.available_contexts.put_nowait(result)
+                created += 1
+        return created
 
     async def _create_context(self) -> dict[str, Any]:
         """Create a new browser context with anti-detection features."""
-        if not self.browser:
-            raise RuntimeError("Browser not initialized")
+        browser_info = self._select_browser()
+        # Count the context before awaiting so concurrent creations spread out
+        browser_info["contexts"] += 1
 
         context_id = str(uuid.uuid4())
 
@@ -115,7 +414,7 @@ class BrowserPoolManager:
             ),
             "locale": "en-US",
             "timezone_id": "America/New_York",
-            "permissions": ["geolocation"],
+            "permissions": BASELINE_PERMISSIONS,
             "extra_http_headers": {
                 "Accept-Language": "en-US,en;q=0.9",
                 "Accept-Encoding": "gzip, deflate, br",
@@ -126,83 +425,168 @@ class BrowserPoolManager:
         }
 
         # Create context
-        browser_context = await self.browser.new_context(**context_options)
-
-        # Add stealth scripts
-        await browser_context.add_init_script(
-            """
-            // Override the navigator.webdriver property
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined,
-            });
-
-            // Override the navigator.plugins property
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [1, 2, 3, 4, 5],
-            });
-
-            // Override the navigator.languages property
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['en-US', 'en'],
-            });
-
-            // Override the screen properties
-            Object.defineProperty(screen, 'colorDepth', {
-                get: () => 24,
-            });
-        """
-        )
+        try:
+            browser_context = await browser_info["browser"].new_context(
+                **context_options
+            )
+        except Exception:
+            self._detach_from_browser(browser_info)
+            raise
 
         context_info = {
             "id": context_id,
+            "browser_id": browser_info["id"],
             "context": browser_context,
             "created_at": datetime.utcnow(),
             "last_used_at": datetime.utcnow(),
             "usage_count": 0,
             "current_task_id": None,
-            "memory_usage_mb": 0,
+            "closed": False,
+            "origins": set(),  # Origins whose storage the next reset clears
+            "blank_page": None,
+            "warm_origin": None,  # Origin of the last task; its caches stay warm
         }
 
+        try:
+            # Add stealth scripts
+            await browser_context.add_init_script(
+                """
+                // Override the navigator.webdriver property
+                Object.defineProperty(navigator, 'webdriver', {
+                    get: () => undefined,
+                });
+
+                // Override the navigator.plugins property
+                Object.defineProperty(navigator, 'plugins', {
+                    get: () => [1, 2, 3, 4, 5],
+                });
+
+                // Override the navigator.languages property
+                Object.defineProperty(navigator, 'languages', {
+                    get: () => ['en-US', 'en'],
+                });
+
+                // Override the screen properties
+                Object.defineProperty(screen, 'colorDepth', {
+                    get: () => 24,
+                });
+            """
+            )
+
+            browser_context.on(
+                "page",
+                lambda page: page.on(
+                    "framenavigated",
+                    lambda frame: self._track_origin(context_info, frame.url),
+                ),
+            )
+            await self._install_routing(browser_context, context_id)
+            if self.reset_mode == "cdp":
+                context_info["blank_page"] = await browser_context.new_page()
+        except Exception:
+            await browser_context.close()
+            self._detach_from_browser(browser_info)
+            raise
+
         self.contexts_created += 1
         logger.debug("Created new browser context", context_id=context_id)
 
         return context_info
 
-    async def acquire_context(self, task_id: int) -> BrowserContext:
-        """Acquire a browser context for task execution."""
+    async def _install_routing(self, browser_context: BrowserContext, context_id: str):
+        """Attach HAR recording/replay or the shared asset cache to a context."""
+        if self.har_mode == "record":
+            # Each context records its own archive, written when it closes
+            os.makedirs(self.har_dir, exist_ok=True)
+            await browser_context.route_from_har(
+                os.path.join(self.har_dir, f"{context_id}.har"),
+                update=True,
+                update_content="embed",
+                not_found="fallback",
+            )
+        elif self.har_mode == "replay":
+            if self.har_not_found == "abort":
+                # Registered first, so it only runs when no archive matched
+                await browser_context.route("**/*", self._abort_unrecorded)
+            for har_path in sorted(glob.glob(os.path.join(self.har_dir, "*.har"))):
+                await browser_context.route_from_har(har_path, not_found="fallback")
+        elif self.asset_cache:
+            await self.asset_cache.install(browser_context)
+
+    @staticmethod
+    async def _abort_unrecorded(route):
+        await route.abort("internetdisconnected")
+
+    async def acquire_context(
+        self,
+        task_id: int | str,
+        lease_timeout_seconds: float | None = None,
+        target_url: str | None = None,
+    ) -> BrowserLease:
+        """Acquire a browser context for task execution.
+
+        Returns a lease; use ``lease.context`` and release the lease (or
+        ``async with`` it) when done. With ``target_url``, an idle context
+        that last served the same origin is preferred, since its DNS cache,
+        HTTP cache and connections are already warm.
+        """
         if not self._initialized:
             await self.initialize()
 
+        target_origin = origin_of(target_url)
+        if target_origin:
+            self._record_domain(target_origin)
+
         try:
-            # Try to get an available context
+            wait_started = time.monotonic()
+            self._waiters.append(wait_started)
             try:
-                context_info = await asyncio.wait_for(
-                    self.available_contexts.get(), timeout=10.0
-                )
+                context_info = None
+                if target_origin:
+                    warm = self._remove_available(
+                        lambda ctx: ctx["warm_origin"] == target_origin, limit=1
+                    )
+                    if warm:
+                        context_info = warm[0]
+                        self.warm_hits += 1
+                    else:
+                        self.warm_misses += 1
+
+                if context_info is None:
+                    context_info = await self._wait_for_available(task_id)
                 self.contexts_reused += 1
-            except TimeoutError:
-                # Create new context if pool is empty
-                context_info = await self._create_context()
-                logger.warning(
-                    "Created new context due to pool exhaustion", task_id=task_id
-                )
+            finally:
+                self._waiters.remove(wait_started)
+                finished_at = time.monotonic()
+                self._wait_samples.append((finished_at, finished_at - wait_started))
 
             # Update context info
             context_info["current_task_id"] = task_id
             context_info["last_used_at"] = datetime.utcnow()
             context_info["usage_count"] += 1
 
+            lease = BrowserLease(
+                self, context_info, lease_timeout_seconds or self.lease_timeout_seconds
+            )
+            lease.target_origin = target_origin
+            context_info["lease_id"] = lease.id
+
             # Store in active contexts
             self.active_contexts[context_info["id"]] = context_info
+            self.leases[lease.id] = lease
+            heapq.heappush(self._lease_expiries, (lease.expires_at, lease.id))
 
             logger.info(
                 "Browser context acquired",
                 task_id=task_id,
                 context_id=context_info["id"],
+                lease_id=lease.id,
                 usage_count=context_info["usage_count"],
+                warm=target_origin is not None
+                and context_info["warm_origin"] == target_origin,
             )
 
-            return context_info["context"]
+            return lease
 
         except Exception as e:
             logger.error(
@@ -210,16 +594,86 @@ class BrowserPoolManager:
             )
             raise
 
-    async def release_context(self, task_id: int, context: BrowserContext):
-        """Release browser context back to pool or cleanup."""
-        context_info = None
+    async def _wait_for_available(self, task_id: int | str) -> dict[str, Any]:
+        """Take the next available context, growing the pool if needed."""
+        try:
+            if self.available_contexts.empty():
+                if self._context_count < self.min_size:
+                    # Below the floor (e.g. after recycling): refill now
+                    await self._grow(self.min_size - self._context_count)
+                else:
+                    self._scale_event.set()
+
+            return await asyncio.wait_for(
+                self.available_contexts.get(),
+                timeout=self.acquire_timeout_seconds,
+            )
+        except TimeoutError:
+            self.acquire_timeouts += 1
+            logger.warning(
+                "Timed out waiting for a pooled browser context",
+                task_id=task_id,
+                pool_size=self.pool_size,
+                waiters=len(self._waiters),
+            )
+            raise
+
+    def _record_domain(self, origin: str):
+        if len(self._recent_domains) == self._recent_domains.maxlen:
+            evicted = self._recent_domains[0]
+            self._domain_counts[evicted] -= 1
+            if self._domain_counts[evicted] <= 0:
+                del self._domain_counts[evicted]
+        self._recent_domains.append(origin)
+        self._domain_counts[origin] += 1
+
+    def _is_hot_origin(self, origin: str) -> bool:
+        """Configured warm domains, or origins acquired often recently."""
+        return (
+            urlsplit(origin).hostname in self.warm_domains
+            or self._domain_counts[origin] >= self.warm_domain_min_hits
+        )
 
-        # Find the context info
-        for ctx_id, ctx_info in self.active_contexts.items():
-            if ctx_info["context"] == context:
-                context_info = ctx_info
-                break
+    async def _warm_context(self, context_info: dict[str, Any], origin: str | None):
+        """Keep a reset context affine to its last origin, preconnecting if hot."""
+        # Untargeted tasks leave the previous affinity in place
+        origin = origin or context_info["warm_origin"]
+        context_info["warm_origin"] = origin
+        page = context_info.get("blank_page")
+        if not (origin and page and self.preconnect_enabled):
+            return
+        if not self._is_hot_origin(origin):
+            return
+
+        try:
+            # Resolves DNS and opens the TCP/TLS connection in this context's
+            # network partition, so the next navigation skips the handshake
+            await page.set_content(f'<link rel="preconnect" href="{origin}">')
+            self.preconnects += 1
+        except Exception as e:
+            logger.debug("Preconnect failed", origin=origin, error=str(e))
 
+    def renew_lease(self, lease: BrowserLease, timeout_seconds: float | None = None):
+        """Extend a live lease from now by its timeout."""
+        if lease.released:
+            return
+        lease.expires_at = time.monotonic() + (
+            timeout_seconds or self.lease_timeout_seconds
+        )
+        heapq.heappush(self._lease_expiries, (lease.expires_at, lease.id))
+
+    async def release_context(self, lease: BrowserLease | str):
+        """Release a leased context back to pool or cleanup."""
+        lease_id = lease if isinstance(lease, str) else lease.id
+        lease = self.leases.pop(lease_id, None)
+        if lease is None:
+            self.duplicate_releases += 1
+            logger.debug("Lease already released or reclaimed", lease_id=lease_id)
+            return
+        lease.released = True
+        task_id = lease.task_id
+
+        context_info = self.active_contexts.get(lease.context_id)
         if not context_info:
             logger.warning("Context not found in active contexts", task_id=task_id)
             return
@@ -229,14 +683,19 @@ class BrowserPoolManager:
             age_minutes = (
                 datetime.utcnow() - context_info["created_at"]
             ).total_seconds() / 60
+            browser_info = self.browsers.get(context_info["browser_id"])
             should_cleanup = (
-                age_minutes > self.max_context_age_minutes
+                browser_info is None
+                or browser_info["draining"]
+                or age_minutes > self.max_context_age_minutes
                 or context_info["usage_count"] > 50
-                or await self._check_memory_usage(context_info)
+                or self._check_memory_usage()
             )
 
             if should_cleanup:
                 await self._cleanup_context(context_info)
+                if self._waiters:
+                    self._scale_event.set()
                 logger.info(
                     "Context cleaned up",
                     task_id=task_id,
@@ -246,7 +705,9 @@ class BrowserPoolManager:
             else:
                 # Reset context state and return to pool
                 await self._reset_context(context_info)
+                await self._warm_context(context_info, lease.target_origin)
                 context_info["current_task_id"] = None
+                context_info["lease_id"] = None
 
                 # Remove from active and return to available
                 del self.active_contexts[context_info["id"]]
@@ -268,8 +729,68 @@ class BrowserPoolManager:
             # Ensure cleanup on error
             await self._cleanup_context(context_info)
 
+    @staticmethod
+    def _track_origin(context_info: dict[str, Any], url: str):
+        origin = origin_of(url)
+        if origin:
+            context_info["origins"].add(origin)
+
     async def _reset_context(self, context_info: dict[str, Any]):
         """Reset context state for reuse."""
+        if self.reset_mode == "cdp":
+            await self._reset_context_cdp(context_info)
+        else:
+            await self._reset_context_navigate(context_info)
+
+    async def _reset_context_cdp(self, context_info: dict[str, Any]):
+        """Wipe all state of visited origins through CDP, keeping a blank page ready.
+
+        Pages from the previous task are closed and replaced by a fresh one,
+        which also drops their route handlers, history and JS state.
+        """
+        try:
+            context = context_info["context"]
+            blank_page = await context.new_page()
+            for page in context.pages:
+                if page is not blank_page:
+                    await page.close()
+
+            origins = context_info["origins"]
+            context_info["origins"] = set()
+
+            session = await context.new_cdp_session(blank_page)
+            try:
+                # Storage is scoped to this context's partition; "all" covers
+                # cookies, local/session storage, IndexedDB, cache storage
+                # and service workers
+                await asyncio.gather(
+                    *(
+                        session.send(
+                            "Storage.clearDataForOrigin",
+                            {"origin": origin, "storageTypes": "all"},
+                        )
+                        for origin in origins
+                    ),
+                    context.clear_cookies(),
+                    context.clear_permissions(),
+                )
+            finally:
+                await session.detach()
+
+            # Clearing drops the creation-time grants too; match a fresh context
+            await context.grant_permissions(BASELINE_PERMISSIONS)
+
+            context_info["blank_page"] = blank_page
+            context_info["last_used_at"] = datetime.utcnow()
+
+        except Exception as e:
+            logger.error(
+                "Failed to reset context", context_id=context_info["id"], error=str(e)
+            )
+            raise
+
+    async def _reset_context_navigate(self, context_info: dict[str, Any]):
+        """Reset context state by navigating its first page to about:blank."""
         try:
             context = context_info["context"]
 
@@ -295,14 +816,21 @@ class BrowserPoolManager:
 
     async def _cleanup_context(self, context_info: dict[str, Any]):
         """Clean up browser context resources."""
+        if context_info.get("closed"):
+            return
+        context_info["closed"] = True
+        self._context_count -= 1
+
+        # Remove from active contexts if present; its lease, if any, ends here
+        self.active_contexts.pop(context_info["id"], None)
+        lease = self.leases.pop(context_info.get("lease_id"), None)
+        if lease:
+            lease.released = True
+
         try:
             context = context_info["context"]
             await context.close()
 
-            # Remove from active contexts if present
-            if context_info["id"] in self.active_contexts:
-                del self.active_contexts[context_info["id"]]
-
             self.contexts_cleanup += 1
             logger.debug("Context cleaned up", context_id=context_info["id"])
 
@@ -310,22 +838,320 @@ class BrowserPoolManager:
             logger.error(
                 "Failed to cleanup context", context_id=context_info["id"], error=str(e)
             )
+        finally:
+            browser_info = self.browsers.get(context_info["browser_id"])
+            if browser_info:
+                self._detach_from_browser(browser_info)
+
+    def _detach_from_browser(self, browser_info: dict[str, Any]):
+        """Drop one context from a browser's load; close drained browsers."""
+        browser_info["contexts"] -= 1
+        if browser_info["draining"] and browser_info["contexts"] <= 0:
+            self._spawn(self._close_browser(browser_info))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._recycle_tasks.add(task)
+        task.add_done_callback(self._recycle_tasks.discard)
+
+    def _on_browser_disconnected(self, browser_id: str):
+        browser_info = self.browsers.get(browser_id)
+        if browser_info and not browser_info["draining"]:
+            self._spawn(
+                self._recycle_browser(browser_info, reason="disconnected", force=True)
+            )
+
+    async def _browser_process_ids(self, browser: Browser) -> list[int]:
+        """PIDs of a browser's own processes (browser, GPU, renderers) via CDP."""
+        session = await browser.new_browser_cdp_session()
+        try:
+            result = await session.send("SystemInfo.getProcessInfo")
+        finally:
+            await session.detach()
+        return [process["id"] for process in result.get("processInfo", [])]
+
+    async def _check_browser(self, browser_info: dict[str, Any]):
+        """Probe one browser for liveness and memory; recycle it if unhealthy."""
+        if browser_info["draining"]:
+            return
+
+        browser = browser_info["browser"]
+        if not browser.is_connected():
+            await self._recycle_browser(browser_info, reason="disconnected", force=True)
+            return
+
+        try:
+            pids = await asyncio.wait_for(
+                self._browser_process_ids(browser),
+                timeout=self.health_check_timeout_seconds,
+            )
+        except Exception as e:
+            browser_info["failed_checks"] += 1
+            logger.warning(
+                "Browser health check failed",
+                browser_id=browser_info["id"],
+                failed_checks=browser_info["failed_checks"],
+                error=str(e) or type(e).__name__,
+            )
+            if browser_info["failed_checks"] >= HEALTH_CHECK_MAX_FAILURES:
+                await self._recycle_browser(
+                    browser_info, reason="unresponsive", force=True
+                )
+            return
+
+        browser_info["failed_checks"] = 0
+        browser_info["memory_mb"] = await asyncio.to_thread(
+            measure_processes_memory, pids
+        )
+        if browser_info["memory_mb"] > self.max_browser_memory_mb:
+            await self._recycle_browser(browser_info, reason="memory")
+
+    async def _recycle_browser(
+        self, browser_info: dict[str, Any], reason: str, force: bool = False
+    ):
+        """Replace a browser shard without disturbing the others.
+
+        A replacement is launched first. Idle contexts of the old browser are
+        closed at once; busy ones are closed when released, or immediately
+        with ``force`` when the browser is already unusable.
+        """
+        if browser_info["draining"]:
+            return
+        browser_info["draining"] = True
+        self.browsers_recycled += 1
+        logger.warning(
+            "Recycling pooled browser",
+            browser_id=browser_info["id"],
+            reason=reason,
+            contexts=browser_info["contexts"],
+            memory_mb=browser_info["memory_mb"],
+        )
 
-    async def _check_memory_usage(self, context_info: dict[str, Any]) -> bool:
-        """Check if context is using too much memory."""
         try:
-            # Get current process memory usage
-            process = psutil.Process()
-            memory_mb = process.memory_info().rss / 1024 / 1024
+            await self._launch_browser()
+        except Exception as e:
+            logger.error("Failed to launch replacement browser", error=str(e))
 
-            context_info["memory_usage_mb"] = int(memory_mb)
+        for ctx_info in self._remove_available(
+            lambda ctx: ctx["browser_id"] == browser_info["id"]
+        ):
+            await self._cleanup_context(ctx_info)
 
-            # Check if we're over the limit
-            return memory_mb > self.max_memory_mb
+        if force:
+            for ctx_info in list(self.active_contexts.values()):
+                if ctx_info["browser_id"] == browser_info["id"]:
+                    await self._cleanup_context(ctx_info)
 
+        if browser_info["contexts"] <= 0 and browser_info["id"] in self.browsers:
+            await self._close_browser(browser_info)
+
+        # Refill lost capacity on the healthy shards
+        self._scale_event.set()
+
+    async def _close_browser(self, browser_info: dict[str, Any]):
+        """Close a browser process and forget it."""
+        if self.browsers.pop(browser_info["id"], None) is None:
+            return
+        try:
+            await asyncio.wait_for(
+                browser_info["browser"].close(),
+                timeout=self.health_check_timeout_seconds,
+            )
+            logger.info("Closed pooled browser", browser_id=browser_info["id"])
         except Exception as e:
-            logger.error("Failed to check memory usage", error=str(e))
+            logger.error(
+                "Failed to close browser",
+                browser_id=browser_info["id"],
+                error=str(e) or type(e).__name__,
+            )
+
+    async def _health_check_loop(self):
+        """Periodically health check every browser shard."""
+        while True:
+            try:
+                await asyncio.sleep(self.health_check_interval_seconds)
+                await asyncio.gather(
+                    *(
+                        self._check_browser(info)
+                        for info in list(self.browsers.values())
+                    )
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error in browser health check", error=str(e))
+
+    def _check_memory_usage(self) -> bool:
+        """Check if a released context should be closed to free memory.
+
+        Pages are already closed on release, so there is nothing left to
+        measure per context. Runaway browsers are recycled on their sampled
+        RSS by the health check; here surplus contexts are shed while the
+        Chromium process tree as a whole is over budget.
+        """
+        return (
+            self.browser_memory.get("total_rss_mb", 0) > self.max_total_memory_mb
+            and self._context_count > self.min_size
+        )
+
+    def _recent_wait_percentile(self, pct: float) -> float:
+        cutoff = time.monotonic() - WAIT_WINDOW_SECONDS
+        return percentile(
+            sorted(wait for at, wait in self._wait_samples if at >= cutoff), pct
+        )
+
+    def _has_memory_headroom(self) -> bool:
+        """Whether the host and the Chromium budget allow another context."""
+        available_mb = psutil.virtual_memory().available / 1024 / 1024
+        if available_mb < self.min_free_memory_mb:
             return False
+        return self.browser_memory.get("total_rss_mb", 0) < self.max_total_memory_mb
+
+    async def _autoscale(self) -> bool:
+        """Run one scaling decision; returns False when needed growth was blocked."""
+        self.browser_memory = await asyncio.to_thread(measure_chromium_memory)
+
+        if self._context_count < self.min_size:
+            await self._grow(self.min_size - self._context_count)
+
+        if self._waiters:
+            oldest_wait = time.monotonic() - self._waiters[0]
+            sustained_wait = max(oldest_wait, self._recent_wait_percentile(95))
+            if sustained_wait < self.scale_up_wait_seconds:
+                return True
+
+            if self._context_count >= self.max_size:
+                return False
+            if not self._has_memory_headroom():
+                self.scale_ups_blocked += 1
+                logger.warning(
+                    "Browser pool growth blocked by memory",
+                    pool_size=self.pool_size,
+                    chromium_rss_mb=self.browser_memory.get("total_rss_mb"),
+                )
+                return False
+
+            created = await self._grow(len(self._waiters))
+            if not created:
+                return False
+            self.scale_ups += created
+            logger.info(
+                "Browser pool scaled up",
+                added=created,
+                pool_size=self.pool_size,
+                waiters=len(self._waiters),
+                wait_ms=round(sustained_wait * 1000),
+            )
+            return True
+
+        await self._shrink_idle()
+        return True
+
+    def _remove_available(self, predicate, limit: int | None = None) -> list[dict]:
+        """Take matching contexts out of the available queue, keeping the rest.
+
+        Runs without awaiting, so no acquire can interleave with the drain.
+        """
+        kept: list[dict[str, Any]] = []
+        removed: list[dict[str, Any]] = []
+        while not self.available_contexts.empty():
+            ctx_info = self.available_contexts.get_nowait()
+            if (limit is None or len(removed) < limit) and predicate(ctx_info):
+                removed.append(ctx_info)
+            else:
+                kept.append(ctx_info)
+
+        # Restore in original order so the LIFO head stays the hottest context
+        for ctx_info in reversed(kept):
+            self.available_contexts.put_nowait(ctx_info)
+        return removed
+
+    async def _shrink_idle(self):
+        """Close available contexts idle past the threshold, down to min size."""
+        surplus = self._context_count - self.min_size
+        if surplus <= 0:
+            return
+
+        idle_cutoff = datetime.utcnow() - timedelta(
+            seconds=self.scale_down_idle_seconds
+        )
+        retired = self._remove_available(
+            lambda ctx: ctx["last_used_at"] < idle_cutoff, limit=surplus
+        )
+
+        for ctx_info in retired:
+            await self._cleanup_context(ctx_info)
+        if retired:
+            self.scale_downs += len(retired)
+            logger.info(
+                "Browser pool scaled down",
+                removed=len(retired),
+                pool_size=self.pool_size,
+            )
+
+    async def _autoscale_loop(self):
+        """Re-evaluate pool size periodically and as soon as acquires queue up."""
+        interval = self.autoscale_interval_seconds
+        while True:
+            try:
+                timeout = interval
+                if self._waiters:
+                    # Wake exactly when the oldest wait becomes sustained
+                    oldest_wait = time.monotonic() - self._waiters[0]
+                    timeout = min(
+                        interval, max(0.05, self.scale_up_wait_seconds - oldest_wait)
+                    )
+                try:
+                    await asyncio.wait_for(self._scale_event.wait(), timeout=timeout)
+                except TimeoutError:
+                    pass
+                self._scale_event.clear()
+
+                if not await self._autoscale():
+                    # At max size or out of memory: back off a full interval
+                    await asyncio.sleep(interval)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error in browser pool autoscaler", error=str(e))
+                await asyncio.sleep(interval)
+
+    async def _reclaim_expired_leases(self):
+        """Close contexts whose leases expired without being released."""
+        now = time.monotonic()
+        while self._lease_expiries and self._lease_expiries[0][0] <= now:
+            expires_at, lease_id = heapq.heappop(self._lease_expiries)
+            lease = self.leases.get(lease_id)
+            if lease is None or lease.expires_at != expires_at:
+                continue  # Released or renewed since this entry was pushed
+
+            # The holder may still be using the context, so it is closed
+            # rather than handed to another task
+            context_info = self.active_contexts.get(lease.context_id)
+            self.leases.pop(lease_id, None)
+            lease.released = True
+            self.leases_reclaimed += 1
+            logger.warning(
+                "Reclaimed expired browser lease",
+                lease_id=lease_id,
+                task_id=lease.task_id,
+                held_seconds=round(now - lease.acquired_at, 1),
+            )
+            if context_info:
+                await self._cleanup_context(context_info)
+                self._scale_event.set()
+
+    async def _lease_reaper_loop(self):
+        """Reclaim orphaned leases."""
+        while True:
+            try:
+                await asyncio.sleep(LEASE_REAP_INTERVAL_SECONDS)
+                await self._reclaim_expired_leases()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error reclaiming browser leases", error=str(e))
 
     async def _periodic_cleanup(self):
         """Periodic cleanup task for stale contexts."""
@@ -333,58 +1159,23 @@ class BrowserPoolManager:
             try:
                 await asyncio.sleep(300)  # Run every 5 minutes
 
-                current_time = datetime.utcnow()
-                stale_contexts = []
-
-                # Check active contexts for staleness
-                for ctx_id, ctx_info in list(self.active_contexts.items()):
-                    age_minutes = (
-                        current_time - ctx_info["last_used_at"]
-                    ).total_seconds() / 60
-                    if (
-                        age_minutes > self.max_context_age_minutes * 2
-                    ):  # Double the normal age limit
-                        stale_contexts.append(ctx_info)
-
-                # Cleanup stale contexts
-                for ctx_info in stale_contexts:
+                # Retire aged available contexts; active ones are bounded by
+                # their lease timeouts
+                age_cutoff = datetime.utcnow() - timedelta(
+                    minutes=self.max_context_age_minutes
+                )
+                for ctx_info in self._remove_available(
+                    lambda ctx, cutoff=age_cutoff: ctx["created_at"] < cutoff
+                ):
                     await self._cleanup_context(ctx_info)
-                    logger.warning(
-                        "Cleaned up stale active context", context_id=ctx_info["id"]
+                    logger.debug(
+                        "Cleaned up aged available context", context_id=ctx_info["id"]
                     )
 
-                # Check available contexts queue
-                available_contexts = []
-                while not self.available_contexts.empty():
-                    try:
-                        ctx_info = self.available_contexts.get_nowait()
-                        age_minutes = (
-                            current_time - ctx_info["created_at"]
-                        ).total_seconds() / 60
-
-                        if age_minutes <= self.max_context_age_minutes:
-                            available_contexts.append(ctx_info)
-                        else:
-                            await self._cleanup_context(ctx_info)
-                            logger.debug(
-                                "Cleaned up aged available context",
-                                context_id=ctx_info["id"],
-                            )
-                    except asyncio.QueueEmpty:
-                        break
-
-                # Put back valid contexts
-                for ctx_info in available_contexts:
-                    try:
-                        await self.available_contexts.put(ctx_info)
-                    except asyncio.QueueFull:
-                        await self._cleanup_context(ctx_info)
-
                 logger.debug(
                     "Periodic cleanup completed",
                     active_contexts=len(self.active_contexts),
                     available_contexts=self.available_contexts.qsize(),
-                    stale_cleaned=len(stale_contexts),
                 )
 
             except Exception as e:
@@ -393,20 +1184,74 @@ class BrowserPoolManager:
     async def get_pool_stats(self) -> dict[str, Any]:
         """Get browser pool statistics."""
         try:
-            # Calculate memory usage
-            total_memory_mb = 0
-            for ctx_info in self.active_contexts.values():
-                total_memory_mb += ctx_info.get("memory_usage_mb", 0)
+            waits_ms = sorted(wait * 1000 for _, wait in self._wait_samples)
 
             return {
                 "pool_size": self.pool_size,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
                 "active_contexts": len(self.active_contexts),
                 "available_contexts": self.available_contexts.qsize(),
+                "waiting_acquires": len(self._waiters),
+                "acquire_wait_ms": {
+                    "samples": len(waits_ms),
+                    "p50": round(percentile(waits_ms, 50), 1),
+                    "p95": round(percentile(waits_ms, 95), 1),
+                    "p99": round(percentile(waits_ms, 99), 1),
+                    "max": round(waits_ms[-1], 1) if waits_ms else 0.0,
+                },
+                "acquire_timeouts": self.acquire_timeouts,
+                "active_leases": len(self.leases),
+                "oldest_lease_seconds": round(
+                    time.monotonic()
+                    - min(
+                        (lease.acquired_at for lease in self.leases.values()),
+                        default=time.monotonic(),
+                    ),
+                    1,
+                ),
+                "leases_reclaimed": self.leases_reclaimed,
+                "warm_hits": self.warm_hits,
+                "warm_misses": self.warm_misses,
+                "preconnects": self.preconnects,
+                "hot_origins": [
+                    origin
+                    for origin, count in self._domain_counts.most_common(10)
+                    if count >= self.warm_domain_min_hits
+                ],
+                "duplicate_releases": self.duplicate_releases,
+                "scale_ups": self.scale_ups,
+                "scale_downs": self.scale_downs,
+                "scale_ups_blocked": self.scale_ups_blocked,
+                "chromium_memory": await asyncio.to_thread(measure_chromium_memory),
+                "browsers": [
+                    {
+                        "id": info["id"],
+                        "contexts": info["contexts"],
+                        "memory_mb": info["memory_mb"],
+                        "draining": info["draining"],
+                        "connected": info["browser"].is_connected(),
+                        "age_minutes": round(
+                            (datetime.utcnow() - info["created_at"]).total_seconds()
+                            / 60,
+                            2,
+                        ),
+                    }
+                    for info in self.browsers.values()
+                ],
+                "browsers_launched": self.browsers_launched,
+                "browsers_recycled": self.browsers_recycled,
+                "max_browser_memory_mb": self.max_browser_memory_mb,
+                "har_mode": self.har_mode,
+                "asset_cache": (
+                    self.asset_cache.get_stats() if self.asset_cache else None
+                ),
                 "total_contexts_created": self.contexts_created,
                 "total_contexts_reused": self.contexts_reused,
                 "total_contexts_cleaned": self.contexts_cleanup,
-                "total_memory_usage_mb": total_memory_mb,
+                "total_memory_usage_mb": self.browser_memory.get("total_rss_mb", 0),
                 "max_memory_mb": self.max_memory_mb,
+                "max_total_memory_mb": self.max_total_memory_mb,
                 "max_context_age_minutes": self.max_context_age_minutes,
                 "initialized": self._initialized,
             }
@@ -419,13 +1264,24 @@ class BrowserPoolManager:
         try:
             logger.info("Shutting down browser pool")
 
-            # Cancel cleanup task
-            if self._cleanup_task:
-                self._cleanup_task.cancel()
-                try:
-                    await self._cleanup_task
-                except asyncio.CancelledError:
-                    pass
+            # Cancel background tasks
+            for task in (
+                self._cleanup_task,
+                self._autoscale_task,
+                self._health_task,
+                self._lease_task,
+                *self._recycle_tasks,
+            ):
+                if task:
+                    task.cancel()
+                    try:
+                        await task
+                    except asyncio.CancelledError:
+                        pass
+
+            # Stop disconnect handlers from launching replacements
+            for browser_info in self.browsers.values():
+                browser_info["draining"] = True
 
             # Cleanup all active contexts
             for ctx_info in list(self.active_contexts.values()):
@@ -439,9 +1295,10 @@ class BrowserPoolManager:
                 except asyncio.QueueEmpty:
                     break
 
-            # Close browser
-            if self.browser:
-                await self.browser.close()
+            # Close browsers
+            await asyncio.gather(
+                *(self._close_browser(info) for info in list(self.browsers.values()))
+            )
 
             # Stop playwright
             if self.playwright:
@@ -0,0 +1,185 @@
+"""
+Compressed binary codec for cached payloads.
+
+This module provides:
+- Pluggable serializers (orjson, stdlib json) and compressors (zstd, lz4, zlib)
+- A versioned header so payloads written by any configuration stay readable
+- Transparent decoding of legacy plain-JSON cache entries
+- Raw vs. stored byte accounting for compression metrics
+
+Optional backends are used when installed and fall back to the standard
+library otherwise.
+"""
+
+import json
+import struct
+import zlib
+from typing import Any
+
+import structlog
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = structlog.get_logger(__name__)
+
+MAGIC = b"WA"
+CODEC_VERSION = 1
+HEADER = struct.Struct("!2sBBB")  # magic, version, serializer id, compressor id
+
+SERIALIZER_IDS = {"json": 0, "orjson": 1}
+COMPRESSOR_IDS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+
+
+class CacheCodecError(Exception):
+    """Raised when a cached payload cannot be decoded."""
+
+
+def available_serializers() -> list[str]:
+    return ["json"] + (["orjson"] if orjson else [])
+
+
+def available_compressors() -> list[str]:
+    return (
+        ["none", "zlib"]
+        + (["zstd"] if zstandard else [])
+        + (["lz4"] if lz4_frame else [])
+    )
+
+
+class CacheCodec:
+    """Encodes objects to compact, self-describing bytes and back."""
+
+    def __init__(
+        self,
+        serializer: str = "auto",
+        compressor: str = "auto",
+        level: int = 3,
+        min_compress_bytes: int = 1024,
+    ):
+        if serializer == "auto":
+            serializer = "orjson" if orjson else "json"
+        if compressor == "auto":
+            compressor = "zstd" if zstandard else "lz4" if lz4_frame else "zlib"
+
+        if serializer not in available_serializers():
+            logger.warning(
+                "Cache serializer unavailable, using json", serializer=serializer
+            )
+            serializer = "json"
+        if compressor not in available_compressors():
+            logger.warning(
+                "Cache compressor unavailable, using zlib", compressor=compressor
+            )
+            compressor = "zlib"
+
+        self.serializer = serializer
+        self.compressor = compressor
+        self.level = level
+        self.min_compress_bytes = min_compress_bytes
+
+        self._zstd_compressor = (
+            zstandard.ZstdCompressor(level=level) if compressor == "zstd" else None
+        )
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+        # Stats
+        self.encoded_payloads = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def _serialize(self, obj: Any) -> bytes:
+        if self.serializer == "orjson":
+            return orjson.dumps(obj, default=str)
+        return json.dumps(obj, default=str, separators=(",", ":")).encode()
+
+    def _compress(self, data: bytes) -> tuple[bytes, str]:
+        if len(data) < self.min_compress_bytes or self.compressor == "none":
+            return data, "none"
+        if self.compressor == "zstd":
+            return self._zstd_compressor.compress(data), "zstd"
+        if self.compressor == "lz4":
+            return lz4_frame.compress(data), "lz4"
+        return zlib.compress(data, self.level), "zlib"
+
+    def encode(self, obj: Any) -> bytes:
+        """Serialize and compress ``obj`` behind a versioned header."""
+        return self.encode_with_size(obj)[0]
+
+    def encode_with_size(self, obj: Any) -> tuple[bytes, int]:
+        """Encode ``obj``; also return its uncompressed serialized size."""
+        raw = self._serialize(obj)
+        body, compressor = self._compress(raw)
+        payload = (
+            HEADER.pack(
+                MAGIC,
+                CODEC_VERSION,
+                SERIALIZER_IDS[self.serializer],
+                COMPRESSOR_IDS[compressor],
+            )
+            + body
+        )
+
+        self.encoded_payloads += 1
+        self.raw_bytes += len(raw)
+        self.stored_bytes += len(payload)
+        return payload, len(raw)
+
+    def decode(self, payload: bytes | str) -> Any:
+        """Decode a payload written by any codec configuration (or legacy JSON)."""
+        return self.decode_with_size(payload)[0]
+
+    def decode_with_size(self, payload: bytes | str) -> tuple[Any, int]:
+        """Decode ``payload``; also return its uncompressed serialized size."""
+        if isinstance(payload, str):
+            return json.loads(payload), len(payload)
+        if not payload.startswith(MAGIC) or len(payload) < HEADER.size:
+            return json.loads(payload), len(payload)
+
+        _, version, serializer_id, compressor_id = HEADER.unpack_from(payload)
+        if version != CODEC_VERSION:
+            raise CacheCodecError(f"Unsupported cache codec version {version}")
+
+        body = payload[HEADER.size :]
+        if compressor_id == COMPRESSOR_IDS["zstd"]:
+            if not self._zstd_decompressor:
+                raise CacheCodecError("zstd payload but zstandard is not installed")
+            body = self._zstd_decompressor.decompress(body)
+        elif compressor_id == COMPRESSOR_IDS["lz4"]:
+            if not lz4_frame:
+                raise CacheCodecError("lz4 payload but lz4 is not installed")
+            body = lz4_frame.decompress(body)
+        elif compressor_id == COMPRESSOR_IDS["zlib"]:
+            body = zlib.decompress(body)
+        elif compressor_id != COMPRESSOR_IDS["none"]:
+            raise CacheCodecError(f"Unknown cache compressor id {compressor_id}")
+
+        if serializer_id == SERIALIZER_IDS["orjson"] and orjson:
+            return orjson.loads(body), len(body)
+        # orjson output is plain JSON, so stdlib json can always read it
+        return json.loads(body), len(body)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get codec statistics."""
+        return {
+            "serializer": self.serializer,
+            "compressor": self.compressor,
+            "encoded_payloads": self.encoded_payloads,
+            "raw_mb": round(self.raw_bytes / 1024 / 1024, 2),
+            "stored_mb": round(self.stored_bytes / 1024 / 1024, 2),
+            "compression_ratio": (
+                round(self.raw_bytes / self.stored_bytes, 2) if self.stored_bytes else 0
+            ),
+        }
@@ -0,0 +1,551 @@
+"""
+Single-pass DOM extraction engine for webpage parsing.
+
+This module provides:
+- One in-page script that walks the DOM exactly once
+- Page metadata, element counts and framework detection
+- Deduplicated interactive element extraction
+- Content block extraction with per-type ordering preserved
+- Merkle-style structural fingerprints per page region for incremental parsing
+- One compact payload per page.evaluate round-trip
+- Open shadow roots walked in place, and child frames extracted concurrently
+  under a per-frame budget with frame-path-qualified selectors
+"""
+
+import asyncio
+import sys
+from typing import Any
+
+import structlog
+from playwright.async_api import Frame, Locator, Page
+
+logger = structlog.get_logger(__name__)
+
+# 32-bit FNV-1a parameters used by the in-page region fingerprints
+FNV_OFFSET_BASIS = 2166136261
+FNV_PRIME = 16777619
+
+# Characters String.prototype.trim() strips (WhiteSpace and LineTerminator)
+JS_TRIM_CHARS = (
+    "\t\n\v\f\r \u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006"
+    "\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff"
+)
+
+_UTF16_NATIVE = "utf-16-le" if sys.byteorder == "little" else "utf-16-be"
+
+# Joins the iframe selectors leading to a frame and the selector inside it
+FRAME_SELECTOR_SEPARATOR = " |> "
+
+# Builds a selector Playwright can resolve: an id, or an nth-of-type path up
+# to the nearest ancestor with an id. Playwright CSS pierces open shadow
+# roots, so a shadow tree path is prefixed with its host's selector.
+CSS_PATH_JS = """
+    const cssPath = (el) => {
+        const parts = [];
+        for (let node = el; node && node.nodeType === Node.ELEMENT_NODE; node = node.parentElement) {
+            if (node.id) {
+                parts.unshift('#' + CSS.escape(node.id));
+                break;
+            }
+            let nth = 1;
+            for (let sib = node.previousElementSibling; sib; sib = sib.previousElementSibling) {
+                if (sib.tagName === node.tagName) nth++;
+            }
+            parts.unshift(node.tagName.toLowerCase() + ':nth-of-type(' + nth + ')');
+        }
+        const path = parts.join(' > ');
+        const rootNode = el.getRootNode();
+        return rootNode instanceof ShadowRoot ? cssPath(rootNode.host) + ' ' + path : path;
+    };
+"""
+
+FRAME_ELEMENT_SELECTOR_SCRIPT = "(el) => {" + CSS_PATH_JS + "    return cssPath(el);\n}"
+
+# Walks the document depth first so every node is visited once, no matter
+# how many selectors it matches. Open shadow trees are walked in place of
+# their host's light children. Content block candidates are bucketed per tag
+# so the final ordering (headings first, then paragraphs, ...) matches the
+# previous per-selector extraction.
+#
+# The body and each sectioning element (header, nav, main, ...) open a region.
+# A region's fingerprint hashes the tag, identifying attributes and own text of
+# every node in it, plus the fingerprints of nested regions, so it changes
+# exactly when something in its subtree changes.
+DOM_SNAPSHOT_SCRIPT = (
+    """
+(opts) => {"""
+    + CSS_PATH_JS
+    + """
+    const INTERACTIVE_SELECTOR =
+        'button, input, select, textarea, a[href], [onclick], [role="button"], [tabindex]';
+    const BLOCK_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'div', 'article', 'section', 'main'];
+    const REGION_TAGS = new Set(['header', 'nav', 'main', 'aside', 'footer', 'section', 'article', 'form']);
+
+    // 32-bit FNV-1a
+    const fnv = (hash, str) => {
+        for (let i = 0; i < str.length; i++) {
+            hash ^= str.charCodeAt(i);
+            hash = Math.imul(hash, 16777619);
+        }
+        return hash >>> 0;
+    };
+
+    // Containment across shadow boundaries
+    const within = (ancestor, node) => {
+        for (let n = node; n; n = n.parentNode || n.host) {
+            if (n === ancestor) return true;
+        }
+        return false;
+    };
+
+    const regions = [];
+    const regionStack = [];
+    const closeRegion = () => {
+        const closed = regionStack.pop();
+        closed.fingerprint = closed.hash.toString(16);
+        const parent = regionStack[regionStack.length - 1];
+        if (parent) parent.hash = fnv(parent.hash, '[' + closed.fingerprint + ']');
+    };
+
+    const metaTags = {};
+    const links = [];
+    const elements = [];
+    const blockBuckets = {};
+    const blockSeen = {};
+    BLOCK_TAGS.forEach(tag => { blockBuckets[tag] = []; blockSeen[tag] = 0; });
+    const counts = { forms: 0, inputs: 0, buttons: 0, images: 0, links: 0, scripts: 0 };
+    let canonicalLink = null;
+    let interactiveIndex = 0;
+    let shadowRoots = 0;
+
+    const root = document.documentElement;
+    if (root) {
+        const stack = [root];
+        while (stack.length) {
+            const el = stack.pop();
+            const tag = el.tagName.toLowerCase();
+
+            while (regionStack.length && !within(regionStack[regionStack.length - 1].root, el)) {
+                closeRegion();
+            }
+            if (tag === 'body' || (regionStack.length &&
+                    (el.parentElement === document.body || REGION_TAGS.has(tag)))) {
+                const opened = { root: el, tag: tag, hash: 2166136261, index: regions.length };
+                regions.push(opened);
+                regionStack.push(opened);
+            }
+            const region = regionStack.length ? regionStack[regionStack.length - 1] : null;
+            if (region) {
+                let signature = tag + '#' + (el.id || '') + '.' + (el.getAttribute('class') || '') +
+                    '|' + (el.getAttribute('type') || '') + '|' + (el.getAttribute('href') || '') +
+                    '|' + (el.getAttribute('aria-label') || '') + '|' + (el.getAttribute('placeholder') || '') +
+                    '|' + (el.getAttribute('title') || '') + '|' + (el.disabled ? 'disabled' : '');
+                if (tag !== 'script' && tag !== 'style') {
+                    for (let child = el.firstChild; child; child = child.nextSibling) {
+                        if (child.nodeType === Node.TEXT_NODE) signature += child.nodeValue.trim();
+                    }
+                }
+                region.hash = fnv(region.hash, signature);
+            }
+
+            switch (tag) {
+                case 'form':
+                    counts.forms++;
+                    break;
+                case 'input':
+                    counts.inputs++;
+                    if (el.type === 'submit' || el.type === 'button') counts.buttons++;
+                    break;
+                case 'textarea':
+                case 'select':
+                    counts.inputs++;
+                    break;
+                case 'button':
+                    counts.buttons++;
+                    break;
+                case 'img':
+                    counts.images++;
+                    break;
+                case 'script':
+                    counts.scripts++;
+                    break;
+                case 'meta': {
+                    const name = el.getAttribute('name') || el.getAttribute('property');
+                    const content = el.getAttribute('content');
+                    if (name && content) metaTags[name] = content;
+                    break;
+                }
+                case 'link':
+                    if (!canonicalLink && (el.getAttribute('rel') || '').toLowerCase() === 'canonical') {
+                        canonicalLink = el.href || null;
+                    }
+                    break;
+                case 'a':
+                    if (el.hasAttribute('href')) {
+                        counts.links++;
+                        if (links.length < opts.maxLinks) {
+                            links.push({
+                                text: (el.textContent || '').trim(),
+                                href: typeof el.href === 'string' ? el.href : el.getAttribute('href'),
+                                title: el.title || null
+                            });
+                        }
+                    }
+                    break;
+            }
+
+            if (elements.length < opts.maxElements && el.matches(INTERACTIVE_SELECTOR)) {
+                const index = interactiveIndex++;
+                const rect = el.getBoundingClientRect();
+                if (rect.width > 0 && rect.height > 0) {
+                    const style = window.getComputedStyle(el);
+                    if (style.visibility !== 'hidden' && style.display !== 'none') {
+                        elements.push({
+                            tag_name: tag,
+                            element_type: el.type || 'unknown',
+                            text_content: (el.textContent || '').trim().substring(0, 200),
+                            placeholder: el.placeholder || null,
+                            value: el.value || null,
+                            aria_label: el.getAttribute('aria-label') || null,
+                            title: el.title || null,
+                            element_id: el.id || null,
+                            element_class: el.getAttribute('class') || null,
+                            x_coordinate: Math.round(rect.left),
+                            y_coordinate: Math.round(rect.top),
+                            width: Math.round(rect.width),
+                            height: Math.round(rect.height),
+                            is_visible: true,
+                            is_enabled: !el.disabled,
+                            href: typeof el.href === 'string' ? el.href : null,
+                            form_id: (el.form && el.form.id) || null,
+                            required: el.required || false,
+                            element_index: index,
+                            region: region ? region.index : null,
+                            css_selector: cssPath(el),
+                            in_shadow_dom: el.getRootNode() !== document
+                        });
+                    }
+                }
+            }
+
+            const bucket = blockBuckets[tag];
+            if (bucket) {
+                const index = blockSeen[tag]++;
+                if (bucket.length < opts.maxBlocks) {
+                    const text = (el.textContent || '').trim();
+                    if (text.length > 10) {
+                        const rect = el.getBoundingClientRect();
+                        bucket.push({
+                            block_type: tag,
+                            text_content: text.substring(0, 500),
+                            x_coordinate: Math.round(rect.left),
+                            y_coordinate: Math.round(rect.top),
+                            width: Math.round(rect.width),
+                            height: Math.round(rect.height),
+                            is_visible: rect.width > 0 && rect.height > 0,
+                            element_index: index,
+                            region: region ? region.index : null
+                        });
+                    }
+                }
+            }
+
+            // Push in reverse so nodes pop in document order; the shadow
+            // tree pops before the light children slotted into it
+            for (let i = el.children.length - 1; i >= 0; i--) stack.push(el.children[i]);
+            if (el.shadowRoot) {
+                shadowRoots++;
+                const shadowChildren = el.shadowRoot.children;
+                for (let i = shadowChildren.length - 1; i >= 0; i--) stack.push(shadowChildren[i]);
+            }
+        }
+    }
+    while (regionStack.length) closeRegion();
+
+    const frameworks = [];
+    if (window.React) frameworks.push('React');
+    if (window.Vue) frameworks.push('Vue');
+    if (window.angular) frameworks.push('Angular');
+    if (window.jQuery || window.$) frameworks.push('jQuery');
+
+    let blocks = [];
+    BLOCK_TAGS.forEach(tag => { blocks = blocks.concat(blockBuckets[tag]); });
+
+    return {
+        title: document.title || '',
+        url: location.href,
+        lang: (root && root.getAttribute('lang')) || null,
+        canonical_link: canonicalLink,
+        meta_tags: metaTags,
+        links: links,
+        counts: counts,
+        frameworks: frameworks,
+        elements: elements,
+        blocks: blocks.slice(0, opts.maxBlocks),
+        regions: regions.map(r => ({ tag: r.tag, fingerprint: r.fingerprint })),
+        shadow_roots: shadowRoots
+    };
+}
+"""
+)
+
+
+def fnv1a(hash_value: int, text: str) -> int:
+    """Fold ``text`` into a 32-bit FNV-1a hash exactly as the in-page ``fnv``.
+
+    JavaScript hashes UTF-16 code units, so the text is hashed as such.
+    """
+    encoded = text.encode(_UTF16_NATIVE, errors="surrogatepass")
+    for code_unit in memoryview(encoded).cast("H"):
+        hash_value = ((hash_value ^ code_unit) * FNV_PRIME) & 0xFFFFFFFF
+    return hash_value
+
+
+def empty_dom_snapshot(url: str = "") -> dict[str, Any]:
+    """Return an empty snapshot with the same shape as the extraction payload."""
+    return {
+        "title": "",
+        "url": url,
+        "lang": None,
+        "canonical_link": None,
+        "meta_tags": {},
+        "links": [],
+        "counts": {
+            "forms": 0,
+            "inputs": 0,
+            "buttons": 0,
+            "images": 0,
+            "links": 0,
+            "scripts": 0,
+        },
+        "frameworks": [],
+        "elements": [],
+        "blocks": [],
+        "regions": [],
+        "shadow_roots": 0,
+    }
+
+
+def locate_element(page: Page, selector: str) -> Locator:
+    """Resolve a selector, entering frames for frame-path-qualified selectors."""
+    *frame_selectors, target = selector.split(FRAME_SELECTOR_SEPARATOR)
+    scope = page
+    for frame_selector in frame_selectors:
+        scope = scope.frame_locator(frame_selector)
+    return scope.locator(target)
+
+
+async def extract_dom_snapshot(
+    page: Page | Frame,
+    max_elements: int = 1000,
+    max_blocks: int = 200,
+    max_links: int = 100,
+) -> dict[str, Any]:
+    """Extract metadata, interactive elements and content blocks in one evaluate."""
+    snapshot = await page.evaluate(
+        DOM_SNAPSHOT_SCRIPT,
+        {
+            "maxElements": max_elements,
+            "maxBlocks": max_blocks,
+            "maxLinks": max_links,
+        },
+    )
+
+    logger.debug(
+        "DOM snapshot extracted",
+        url=snapshot.get("url"),
+        elements=len(snapshot.get("elements", [])),
+        blocks=len(snapshot.get("blocks", [])),
+    )
+    return snapshot
+
+
+async def _extract_child_frame(
+    frame: Frame,
+    max_elements: int,
+    max_blocks: int,
+    max_links: int,
+    timeout_seconds: float,
+) -> dict[str, Any]:
+    """Snapshot one child frame and locate its iframe, within a time budget."""
+    result: dict[str, Any] = {
+        "frame": frame,
+        "url": frame.url,
+        "status": "ok",
+        "selector": None,
+        "offset": None,
+        "snapshot": None,
+    }
+
+    async def locate_iframe():
+        handle = await frame.frame_element()
+        try:
+            return await asyncio.gather(
+                handle.evaluate(FRAME_ELEMENT_SELECTOR_SCRIPT), handle.bounding_box()
+            )
+        finally:
+            await handle.dispose()
+
+    try:
+        (selector, box), snapshot = await asyncio.wait_for(
+            asyncio.gather(
+                locate_iframe(),
+                extract_dom_snapshot(frame, max_elements, max_blocks, max_links),
+            ),
+            timeout=timeout_seconds,
+        )
+        result.update(selector=selector, offset=box, snapshot=snapshot)
+    except TimeoutError:
+        result["status"] = "timeout"
+    except Exception as e:
+        # Frames can detach or navigate mid-extraction
+        result["status"] = "error"
+        logger.debug("Frame extraction failed", url=frame.url, error=str(e))
+    return result
+
+
+def _adopt_frame_item(
+    item: dict[str, Any],
+    frame_path: list[str],
+    region_offset: int,
+    dx: int,
+    dy: int,
+) -> dict[str, Any]:
+    """Move a frame element or block into main-frame regions and coordinates."""
+    item["frame_path"] = frame_path
+    if item.get("region") is not None:
+        item["region"] += region_offset
+    if item.get("x_coordinate") is not None:
+        item["x_coordinate"] += dx
+        item["y_coordinate"] += dy
+    return item
+
+
+def merge_frame_snapshots(
+    snapshot: dict[str, Any],
+    frames: list[dict[str, Any]],
+    max_elements: int = 1000,
+    max_blocks: int = 200,
+    max_links: int = 100,
+) -> dict[str, Any]:
+    """Merge child frame snapshots into the main frame snapshot in place.
+
+    ``frames`` entries carry a ``frame_path`` (iframe selectors from the main
+    frame), the iframe ``offset`` in main-frame coordinates and the frame's
+    ``snapshot``. Frame elements get frame-path-qualified selectors, frame
+    regions are appended (tagged with their frame) and page-wide limits hold.
+    """
+    frame_stats = []
+    for frame_index, frame in enumerate(frames, start=1):
+        child = frame.get("snapshot")
+        frame_path = frame.get("frame_path")
+        stats = {
+            "url": frame.get("url"),
+            "frame_path": frame_path,
+            "status": frame.get("status", "ok"),
+            "elements": 0,
+            "blocks": 0,
+        }
+        frame_stats.append(stats)
+        if child is None or frame_path is None:
+            if stats["status"] == "ok":
+                stats["status"] = "unreachable"
+            continue
+
+        offset = frame.get("offset") or {}
+        dx = round(offset.get("x", 0))
+        dy = round(offset.get("y", 0))
+        prefix = "".join(f"{sel}{FRAME_SELECTOR_SEPARATOR}" for sel in frame_path)
+        region_offset = len(snapshot["regions"])
+        snapshot["regions"].extend(
+            {**region, "frame": frame_index} for region in child.get("regions", [])
+        )
+
+        for element in child.get("elements", []):
+            if len(snapshot["elements"]) >= max_elements:
+                break
+            if element.get("css_selector"):
+                element["css_selector"] = prefix + element["css_selector"]
+            snapshot["elements"].append(
+                _adopt_frame_item(element, frame_path, region_offset, dx, dy)
+            )
+            stats["elements"] += 1
+
+        for block in child.get("blocks", []):
+            if len(snapshot["blocks"]) >= max_blocks:
+                break
+            snapshot["blocks"].append(
+                _adopt_frame_item(block, frame_path, region_offset, dx, dy)
+            )
+            stats["blocks"] += 1
+
+        room = max_links - len(snapshot["links"])
+        snapshot["links"].extend(child.get("links", [])[: max(room, 0)])
+        for name, count in child.get("counts", {}).items():
+            snapshot["counts"][name] = snapshot["counts"].get(name, 0) + count
+        snapshot["shadow_roots"] = snapshot.get("shadow_roots", 0) + child.get(
+            "shadow_roots", 0
+        )
+
+    snapshot["frames"] = frame_stats
+    return snapshot
+
+
+async def extract_page_snapshot(
+    page: Page,
+    max_elements: int = 1000,
+    max_blocks: int = 200,
+    max_links: int = 100,
+    max_frames: int = 20,
+    frame_max_elements: int = 200,
+    frame_max_blocks: int = 50,
+    frame_timeout_seconds: float = 2.0,
+) -> dict[str, Any]:
+    """Extract the main frame and its child frames concurrently.
+
+    Each child frame gets its own element/block caps and time budget, so a
+    slow or huge embedded widget cannot stall the parse; frames over budget
+    are reported in ``snapshot["frames"]`` and skipped.
+    """
+    main_frame = page.main_frame
+    child_frames = [
+        frame
+        for frame in page.frames
+        if frame is not main_frame and not frame.is_detached()
+    ][:max_frames]
+
+    snapshot, *children = await asyncio.gather(
+        extract_dom_snapshot(main_frame, max_elements, max_blocks, max_links),
+        *(
+            _extract_child_frame(
+                frame,
+                frame_max_elements,
+                frame_max_blocks,
+                max_links,
+                frame_timeout_seconds,
+            )
+            for frame in child_frames
+        ),
+    )
+    if not children:
+        return snapshot
+
+    # A frame is addressable only if every iframe above it was located
+    selectors = {child["frame"]: child["selector"] for child in children}
+    for child in children:
+        path: list[str] | None = []
+        frame = child["frame"]
+        while frame is not main_frame and path is not None:
+            selector = selectors.get(frame)
+            path = [selector, *path] if selector else None
+            frame = frame.parent_frame
+        child["frame_path"] = path
+
+    merge_frame_snapshots(snapshot, children, max_elements, max_blocks, max_links)
+    logger.debug(
+        "Frame snapshots merged",
+        url=snapshot.get("url"),
+        frames=len(children),
+        elements=len(snapshot["elements"]),
+    )
+    return snapshot
@@ -0,0 +1,188 @@
+"""
+Batch scoring of interactive elements for the parser enhancement step.
+
+This module provides:
+- Semantic roles and supported interactions from precompiled keyword
+  patterns and per-(tag, type) lookup tables
+- Interaction confidence and automation complexity computed with NumPy
+  over every element of a page at once
+- In-place annotation of snapshot elements, skipping the semantic fields
+  of elements whose analysis was reused from a previous parse
+"""
+
+import re
+from collections.abc import Collection
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+
+SUBMIT_KEYWORDS = re.compile(r"submit|send|save")
+CANCEL_KEYWORDS = re.compile(r"cancel|close|back")
+SEARCH_BUTTON_KEYWORDS = re.compile(r"search|find")
+EMAIL_KEYWORDS = re.compile(r"e?mail")
+SEARCH_INPUT_KEYWORDS = re.compile(r"search|query")
+DYNAMIC_CLASS_PATTERN = re.compile(r"random|hash|generated")
+
+BUTTON_TYPES = frozenset({"button", "submit"})
+TEXT_ENTRY_TYPES = frozenset({"text", "email", "password", "search", "url", "tel"})
+STANDARD_FORM_TAGS = frozenset({"button", "input", "select", "textarea"})
+
+# Roles that depend only on the tag
+TAG_ROLES = {
+    "a": "navigation_link",
+    "select": "dropdown",
+    "textarea": "text_area",
+}
+
+INPUT_TYPE_ROLES = {
+    "password": "password_input",
+    "checkbox": "checkbox",
+    "radio": "radio_button",
+}
+
+TAG_INTERACTIONS = {
+    "select": ("select_option", "focus"),
+    "textarea": ("type", "clear", "focus", "blur"),
+    "a": ("click", "navigate"),
+}
+
+INPUT_TYPE_INTERACTIONS = {
+    **dict.fromkeys(TEXT_ENTRY_TYPES, ("type", "clear", "focus", "blur")),
+    "checkbox": ("check", "uncheck", "click"),
+    "radio": ("check", "uncheck", "click"),
+    "file": ("upload", "click"),
+}
+
+# Elements smaller than this in either dimension are hard to target
+MIN_TARGET_SIZE_PX = 20
+
+
+def semantic_role(tag: str, element_type: str, label_text: str) -> str:
+    """Classify an element from its tag, type and lowercased text + aria label."""
+    if tag == "button" or element_type in BUTTON_TYPES:
+        if SUBMIT_KEYWORDS.search(label_text):
+            return "submit_button"
+        if CANCEL_KEYWORDS.search(label_text):
+            return "cancel_button"
+        if SEARCH_BUTTON_KEYWORDS.search(label_text):
+            return "search_button"
+        return "action_button"
+
+    if tag == "input":
+        if element_type in ("email", "text") and EMAIL_KEYWORDS.search(label_text):
+            return "email_input"
+        if element_type in INPUT_TYPE_ROLES:
+            return INPUT_TYPE_ROLES[element_type]
+        if element_type in ("text", "search") and SEARCH_INPUT_KEYWORDS.search(
+            label_text
+        ):
+            return "search_input"
+        return "text_input"
+
+    return TAG_ROLES.get(tag, "interactive_element")
+
+
+def supported_interactions(tag: str, element_type: str) -> tuple[str, ...]:
+    """Interactions an element of this tag and type supports."""
+    if tag == "button" or element_type in BUTTON_TYPES:
+        return ("click", "focus")
+    if tag == "input":
+        return INPUT_TYPE_INTERACTIONS.get(element_type, ())
+    return TAG_INTERACTIONS.get(tag, ())
+
+
+def _size_array(elements: list[dict[str, Any]], field: str) -> np.ndarray:
+    # Static parses carry no layout, so missing geometry becomes NaN
+    return np.array(
+        [
+            np.nan if element.get(field) is None else element[field]
+            for element in elements
+        ],
+        dtype=float,
+    )
+
+
+def interaction_confidence(elements: list[dict[str, Any]]) -> np.ndarray:
+    """Confidence that interacting with each element will succeed."""
+    visible = np.array([bool(e.get("is_visible", False)) for e in elements])
+    enabled = np.array([bool(e.get("is_enabled", True)) for e in elements])
+    labeled = np.array(
+        [
+            bool(e.get("aria_label") or e.get("title") or e.get("text_content"))
+            for e in elements
+        ]
+    )
+    standard = np.array([e.get("tag_name") in STANDARD_FORM_TAGS for e in elements])
+
+    confidence = np.full(len(elements), 0.5)
+    confidence += 0.2 * visible
+    confidence += 0.1 * enabled
+    confidence += 0.1 * labeled
+    confidence += 0.1 * standard
+    return np.minimum(1.0, confidence)
+
+
+def automation_complexity(elements: list[dict[str, Any]]) -> np.ndarray:
+    """Automation complexity per element (0.0 = easy, 1.0 = complex)."""
+    unidentified = np.array(
+        [
+            not (e.get("element_id") or e.get("aria_label") or e.get("title"))
+            for e in elements
+        ]
+    )
+    dynamic_class = np.array(
+        [
+            bool(DYNAMIC_CLASS_PATTERN.search(e.get("element_class") or ""))
+            for e in elements
+        ]
+    )
+    width = _size_array(elements, "width")
+    height = _size_array(elements, "height")
+    # NaN compares False, but unknown geometry must not count as small either
+    known = ~(np.isnan(width) | np.isnan(height))
+    small = known & ((width < MIN_TARGET_SIZE_PX) | (height < MIN_TARGET_SIZE_PX))
+
+    complexity = np.full(len(elements), 0.1)
+    complexity += 0.2 * unidentified
+    complexity += 0.3 * dynamic_class
+    complexity += 0.2 * small
+    return np.minimum(1.0, complexity)
+
+
+def score_elements(
+    elements: list[dict[str, Any]], reused: Collection[int] | None = None
+) -> list[dict[str, Any]]:
+    """Annotate every element with its analysis fields, in place.
+
+    Elements at ``reused`` positions already carry cached semantic analysis
+    and only get their geometry-dependent fields recomputed.
+    """
+    if not elements:
+        return elements
+
+    reused = reused or ()
+    fresh = [position for position in range(len(elements)) if position not in reused]
+    complexity = automation_complexity(elements).tolist()
+    discovered_at = datetime.utcnow().isoformat()
+
+    if fresh:
+        fresh_elements = [elements[position] for position in fresh]
+        confidence = interaction_confidence(fresh_elements).tolist()
+        for element, score in zip(fresh_elements, confidence, strict=True):
+            tag = (element.get("tag_name") or "").lower()
+            element_type = (element.get("element_type") or "").lower()
+            label_text = "{}\n{}".format(
+                element.get("text_content") or "", element.get("aria_label") or ""
+            ).lower()
+            element["semantic_role"] = semantic_role(tag, element_type, label_text)
+            element["interaction_confidence"] = score
+            element["supported_interactions"] = list(
+                supported_interactions(tag, element_type)
+            )
+
+    for element, score in zip(elements, complexity, strict=True):
+        element["automation_complexity"] = score
+        element["discovered_at"] = discovered_at
+
+    return elements
@@ -0,0 +1,142 @@
+"""
+Event-driven pause, resume and cancellation for plan executions.
+
+This module provides:
+- Per-execution control built on asyncio Events, so paused executions wait
+  without polling and cancellation interrupts in-flight steps and waits
+- Interruptible sleeps that end early when a wake condition is met
+- Jittered exponential retry backoff
+"""
+
+import asyncio
+import random
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class ExecutionCancelledError(Exception):
+    """Raised inside an execution once it has been cancelled."""
+
+
+def backoff_delay(
+    attempt: int,
+    base_seconds: float,
+    cap_seconds: float = 30.0,
+    rng: Callable[[], float] = random.random,
+) -> float:
+    """Delay before retry ``attempt`` (1-based) with "equal jitter".
+
+    Half of the exponential delay is kept and the other half is random, so
+    retries of many executions spread out without any retrying at once.
+    """
+    delay = min(cap_seconds, base_seconds * 2 ** max(0, attempt - 1))
+    return delay / 2 + rng() * delay / 2
+
+
+class ExecutionControl:
+    """Pause, resume and cancellation state of one running execution."""
+
+    def __init__(self):
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        self._cancelled = asyncio.Event()
+        self._wake = asyncio.Event()
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def pause(self):
+        self._resumed.clear()
+
+    def resume(self):
+        self._resumed.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        # Paused executions must wake up to notice
+        self._resumed.set()
+        self._wake.set()
+
+    def wake(self):
+        """End the current interruptible sleep early."""
+        self._wake.set()
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise ExecutionCancelledError()
+
+    async def wait_if_paused(self):
+        """Block while paused; raise once cancelled."""
+        await self._resumed.wait()
+        self.raise_if_cancelled()
+
+    async def sleep(self, seconds: float, until: Awaitable[Any] | None = None) -> bool:
+        """Sleep up to ``seconds``, waking early when ``until`` yields a truthy
+        result or :meth:`wake` is called.
+
+        Returns True when woken early. Raises ExecutionCancelledError when
+        the execution is cancelled meanwhile.
+        """
+        if self.cancelled:
+            if asyncio.iscoroutine(until):
+                until.close()
+            raise ExecutionCancelledError()
+        self._wake.clear()
+
+        waiters = {asyncio.ensure_future(self._wake.wait())}
+        condition = asyncio.ensure_future(until) if until is not None else None
+        if condition is not None:
+            waiters.add(condition)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + seconds
+        woken = False
+        try:
+            while waiters and not woken:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, waiters = await asyncio.wait(
+                    waiters, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                # A condition that completes unmet leaves the sleep running
+                woken = any(
+                    task is not condition or (not task.exception() and task.result())
+                    for task in done
+                )
+        finally:
+            for task in waiters:
+                task.cancel()
+            if waiters:
+                await asyncio.gather(*waiters, return_exceptions=True)
+
+        self.raise_if_cancelled()
+        return woken
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        """Await ``awaitable``, abandoning it as soon as the execution is
+        cancelled."""
+        work = asyncio.ensure_future(awaitable)
+        cancelled = asyncio.ensure_future(self._cancelled.wait())
+        try:
+            await asyncio.wait({work, cancelled}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            work.cancel()
+            raise
+        finally:
+            cancelled.cancel()
+
+        if not work.done():
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+            raise ExecutionCancelledError()
+        return work.result()
@@ -0,0 +1,267 @@
+"""
+Scheduling of plan executions onto limited browser capacity.
+
+This module provides:
+- A global cap on concurrent executions, re-read from a capacity callable
+  on every dispatch so it follows the browser pool's size
+- Strict priority lanes (urgent, high, normal, low)
+- Weighted fair queuing across tenants within a lane, using stride
+  scheduling: each dispatch advances the tenant's pass by 1/weight and the
+  queued tenant with the lowest pass goes next
+- An optional per-tenant cap on running executions
+- Cancellation of queued executions before they start
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Served strictly in this order
+EXECUTION_PRIORITIES = ("urgent", "high", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+
+
+class ExecutionQueueFullError(Exception):
+    """Raised when the execution queue cannot accept more executions."""
+
+
+class FairQueue:
+    """Per-key FIFO queues served by weighted stride scheduling."""
+
+    def __init__(self):
+        self._queues: dict[str, deque] = {}
+        self._pass: dict[str, float] = {}
+        self._weights: dict[str, float] = {}
+        self._virtual_time = 0.0
+
+    def push(self, key: str, item: Any, weight: float = 1.0):
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            # A key returning from idle gets no credit for the time it was away
+            self._pass[key] = max(self._pass.get(key, 0.0), self._virtual_time)
+        self._weights[key] = max(weight, 0.01)
+        queue.append(item)
+
+    def pop(self, eligible: Callable[[str], bool] | None = None) -> Any | None:
+        """Next item of the eligible key with the lowest pass, if any."""
+        keys = [key for key in self._queues if eligible is None or eligible(key)]
+        if not keys:
+            return None
+
+        key = min(keys, key=self._pass.__getitem__)
+        self._virtual_time = self._pass[key]
+        self._pass[key] += 1 / self._weights[key]
+
+        queue = self._queues[key]
+        item = queue.popleft()
+        if not queue:
+            del self._queues[key]
+            self._prune()
+        return item
+
+    def _prune(self):
+        # Idle keys at or behind virtual time would be reset on return anyway
+        if len(self._pass) > 2 * len(self._queues) + 100:
+            for key in [k for k in self._pass if k not in self._queues]:
+                if self._pass[key] <= self._virtual_time:
+                    del self._pass[key]
+                    self._weights.pop(key, None)
+
+
+class ScheduledExecution:
+    """An execution waiting for, or holding, a slot."""
+
+    def __init__(
+        self,
+        execution_id: str,
+        tenant: str,
+        priority: str,
+        run: Callable[[], Awaitable[Any]],
+    ):
+        self.execution_id = execution_id
+        self.tenant = tenant
+        self.priority = priority
+        self.run = run
+        self.enqueued_at = time.monotonic()
+        self.cancelled = False
+        self.task: asyncio.Task | None = None
+
+
+class ExecutionScheduler:
+    """Admits queued executions as capacity frees up."""
+
+    def __init__(
+        self,
+        capacity: Callable[[], int],
+        max_queue_size: int = 1000,
+        max_per_tenant: int = 0,
+        tenant_weights: dict[str, float] | None = None,
+    ):
+        self.capacity = capacity
+        self.max_queue_size = max_queue_size
+        self.max_per_tenant = max_per_tenant
+        self.tenant_weights = tenant_weights or {}
+
+        self._lanes = {priority: FairQueue() for priority in EXECUTION_PRIORITIES}
+        self._queued: dict[str, ScheduledExecution] = {}
+        self._running: dict[str, ScheduledExecution] = {}
+        self._running_per_tenant: dict[str, int] = {}
+
+        # Stats
+        self.executions_submitted = 0
+        self.executions_started = 0
+        self.executions_rejected = 0
+        self.queued_cancelled = 0
+        self.wait_seconds_total = 0.0
+
+    def check_capacity(self):
+        """Raise ExecutionQueueFullError if a new execution would be rejected."""
+        if len(self._queued) >= self.max_queue_size:
+            self.executions_rejected += 1
+            raise ExecutionQueueFullError(
+                f"Execution queue is full ({self.max_queue_size} waiting)"
+            )
+
+    def submit(
+        self,
+        execution_id: str,
+        tenant: str,
+        run: Callable[[], Awaitable[Any]],
+        priority: str = DEFAULT_PRIORITY,
+    ) -> bool:
+        """Queue an execution; returns True when it started straight away."""
+        self.check_capacity()
+
+        if priority not in self._lanes:
+            priority = DEFAULT_PRIORITY
+        entry = ScheduledExecution(execution_id, tenant, priority, run)
+        self._queued[execution_id] = entry
+        self._lanes[priority].push(tenant, entry, self.tenant_weights.get(tenant, 1.0))
+        self.executions_submitted += 1
+
+        self.dispatch()
+        return execution_id in self._running
+
+    def is_queued(self, execution_id: str) -> bool:
+        return execution_id in self._queued
+
+    def cancel(self, execution_id: str) -> bool:
+        """Drop a queued execution; running ones are not affected."""
+        entry = self._queued.pop(execution_id, None)
+        if entry is None:
+            return False
+        # Removed lazily when its turn comes
+        entry.cancelled = True
+        self.queued_cancelled += 1
+        return True
+
+    def _eligible(self, tenant: str) -> bool:
+        return (
+            not self.max_per_tenant
+            or self._running_per_tenant.get(tenant, 0) < self.max_per_tenant
+        )
+
+    def _next(self) -> ScheduledExecution | None:
+        for lane in self._lanes.values():
+            while True:
+                entry = lane.pop(self._eligible)
+                if entry is None:
+                    break
+                if not entry.cancelled:
+                    return entry
+        return None
+
+    def dispatch(self):
+        """Start queued executions while there is capacity."""
+        while self._queued and len(self._running) < max(1, self.capacity()):
+            entry = self._next()
+            if entry is None:
+                # Everything left belongs to tenants at their cap
+                return
+            self._start(entry)
+
+    def _start(self, entry: ScheduledExecution):
+        del self._queued[entry.execution_id]
+        self._running[entry.execution_id] = entry
+        self._running_per_tenant[entry.tenant] = (
+            self._running_per_tenant.get(entry.tenant, 0) + 1
+        )
+        self.executions_started += 1
+        self.wait_seconds_total += time.monotonic() - entry.enqueued_at
+
+        entry.task = asyncio.create_task(self._run(entry))
+        logger.debug(
+            "Execution started",
+            execution_id=entry.execution_id,
+            tenant=entry.tenant,
+            priority=entry.priority,
+            running=len(self._running),
+            queued=len(self._queued),
+        )
+
+    async def _run(self, entry: ScheduledExecution):
+        try:
+            await entry.run()
+        except Exception as e:
+            logger.error(
+                "Scheduled execution crashed",
+                execution_id=entry.execution_id,
+                error=str(e),
+            )
+        finally:
+            self._running.pop(entry.execution_id, None)
+            remaining = self._running_per_tenant.get(entry.tenant, 1) - 1
+            if remaining:
+                self._running_per_tenant[entry.tenant] = remaining
+            else:
+                self._running_per_tenant.pop(entry.tenant, None)
+        # Not reached when cancelled, e.g. on shutdown
+        self.dispatch()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get execution scheduler statistics."""
+        return {
+            "capacity": self.capacity(),
+            "running": len(self._running),
+            "queued": len(self._queued),
+            "queued_by_priority": {
+                priority: sum(
+                    1 for entry in self._queued.values() if entry.priority == priority
+                )
+                for priority in EXECUTION_PRIORITIES
+            },
+            "running_by_tenant": dict(self._running_per_tenant),
+            "executions_submitted": self.executions_submitted,
+            "executions_started": self.executions_started,
+            "executions_rejected": self.executions_rejected,
+            "queued_cancelled": self.queued_cancelled,
+            "average_wait_seconds": (
+                round(self.wait_seconds_total / self.executions_started, 2)
+                if self.executions_started
+                else 0
+            ),
+        }
+
+    async def shutdown(self, timeout: float = 30.0) -> list[str]:
+        """Drop the queue and wait for running executions to finish.
+
+        Returns the ids of the executions that were still queued.
+        """
+        dropped = list(self._queued)
+        for execution_id in dropped:
+            self.cancel(execution_id)
+
+        tasks = [entry.task for entry in self._running.values() if entry.task]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return dropped
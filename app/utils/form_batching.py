@@ -0,0 +1,100 @@
+"""
+Batching of consecutive form-fill steps in plan execution.
+
+This module provides:
+- Grouping of a plan's actions into runs of batchable steps, each run
+  executed as one unit, with every other action in a group of its own
+- The in-page script that fills a run of fields in one evaluate call,
+  after checking they all belong to the same form
+"""
+
+from collections.abc import Callable, Sequence
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Sets values through the native setters so framework listeners (React,
+# Vue) see the change, then fires the events a user edit would.
+# Returns {sameForm, results: [{ok, value, error}]}; nothing is filled
+# unless every field shares one form (or none has a form).
+FORM_FILL_SCRIPT = """
+({ elements, items }) => {
+    const formOf = el => el.form || el.closest('form');
+    if (new Set(elements.map(formOf)).size > 1) {
+        return { sameForm: false, results: [] };
+    }
+
+    const setValue = (el, value) => {
+        const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+            : el instanceof HTMLSelectElement ? HTMLSelectElement.prototype
+            : HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+    };
+
+    const results = elements.map((el, i) => {
+        const { kind, value } = items[i];
+        try {
+            if (el.disabled || el.readOnly) {
+                return { ok: false, error: 'Element is not editable' };
+            }
+            el.focus();
+            let expected = value;
+            if (kind === 'select') {
+                const options = Array.from(el.options || []);
+                let option = options.find(o => o.value === value)
+                    || options.find(o => o.label.trim() === value || o.text.trim() === value);
+                if (!option && /^\\d+$/.test(value)) {
+                    option = options[Number(value)];
+                }
+                if (!option) {
+                    return { ok: false, error: `Option not found: ${value}` };
+                }
+                expected = option.value;
+            }
+            setValue(el, expected);
+            el.dispatchEvent(new Event('input', { bubbles: true }));
+            el.dispatchEvent(new Event('change', { bubbles: true }));
+            el.blur();
+            return { ok: el.value === expected, value: el.value };
+        } catch (e) {
+            return { ok: false, error: String(e) };
+        }
+    });
+    return { sameForm: true, results };
+}
+"""
+
+
+def group_action_runs(
+    actions: Sequence[T],
+    batchable: Callable[[T], bool],
+    max_batch_size: int = 20,
+) -> list[list[T]]:
+    """Split ``actions`` into groups, keeping their order.
+
+    Consecutive batchable actions form runs of up to ``max_batch_size``;
+    every other action is a group of one.
+    """
+    groups: list[list[T]] = []
+    run: list[T] = []
+    for action in actions:
+        if batchable(action) and len(run) < max_batch_size:
+            run.append(action)
+            continue
+        if run:
+            groups.append(run)
+            run = []
+        if batchable(action):
+            run.append(action)
+        else:
+            groups.append([action])
+    if run:
+        groups.append(run)
+    return groups
+
+
+def batch_results(outcome: dict[str, Any] | None, size: int) -> list[dict[str, Any]]:
+    """Per-field results of a fill, padded with failures when incomplete."""
+    results = list((outcome or {}).get("results") or [])[:size]
+    results += [{"ok": False, "error": "Not filled"}] * (size - len(results))
+    return results
@@ -0,0 +1,164 @@
+"""
+Incremental analysis reuse for re-parsed webpages.
+
+This module provides:
+- A per-URL index of element and content-block analysis keyed by region
+  fingerprint
+- Reuse of that analysis for regions whose fingerprint is unchanged
+- Reuse statistics for performance metrics
+
+Geometry-dependent fields (automation complexity) are never reused since a
+region can move on the page without its fingerprint changing.
+"""
+
+from typing import Any
+
+ELEMENT_ANALYSIS_FIELDS = (
+    "semantic_role",
+    "interaction_confidence",
+    "supported_interactions",
+)
+BLOCK_ANALYSIS_FIELDS = ("semantic_importance", "semantic_category")
+
+REGION_INDEX_VERSION = 1
+
+
+def _element_key(element: dict[str, Any]) -> str:
+    return "|".join(
+        (
+            element.get("tag_name") or "",
+            element.get("element_type") or "",
+            (element.get("text_content") or "")[:50],
+        )
+    )
+
+
+def _block_key(block: dict[str, Any]) -> str:
+    text = block.get("text_content") or ""
+    return f"{block.get('block_type') or ''}|{len(text)}|{text[:50]}"
+
+
+def _group_by_region(items: list[dict[str, Any]]) -> dict[int, list[int]]:
+    """Map region index to the positions of its items, in snapshot order."""
+    grouped: dict[int, list[int]] = {}
+    for position, item in enumerate(items):
+        region = item.get("region")
+        if region is not None:
+            grouped.setdefault(region, []).append(position)
+    return grouped
+
+
+def build_region_index(
+    snapshot: dict[str, Any],
+    elements: list[dict[str, Any]],
+    blocks: list[dict[str, Any]],
+) -> dict[str, Any]:
+    """Build the reusable analysis index for an analyzed snapshot."""
+    regions = snapshot.get("regions", [])
+    element_groups = _group_by_region(elements)
+    block_groups = _group_by_region(blocks)
+
+    index: dict[str, dict[str, list[dict[str, Any]]]] = {}
+    for region_index, region in enumerate(regions):
+        fingerprint = region.get("fingerprint")
+        if not fingerprint or fingerprint in index:
+            continue
+
+        index[fingerprint] = {
+            "elements": [
+                {
+                    "key": _element_key(elements[position]),
+                    **{
+                        field: elements[position].get(field)
+                        for field in ELEMENT_ANALYSIS_FIELDS
+                    },
+                }
+                for position in element_groups.get(region_index, [])
+            ],
+            "blocks": [
+                {
+                    "key": _block_key(blocks[position]),
+                    **{
+                        field: blocks[position].get(field)
+                        for field in BLOCK_ANALYSIS_FIELDS
+                    },
+                }
+                for position in block_groups.get(region_index, [])
+            ],
+        }
+
+    return {"version": REGION_INDEX_VERSION, "regions": index}
+
+
+def _reuse_items(
+    items: list[dict[str, Any]],
+    positions: list[int],
+    cached: list[dict[str, Any]],
+    fields: tuple[str, ...],
+    key_fn,
+    reused: set[int],
+):
+    # An unchanged region yields the same items in the same order
+    if len(positions) != len(cached):
+        return
+    for position, entry in zip(positions, cached, strict=True):
+        item = items[position]
+        if key_fn(item) != entry.get("key"):
+            continue
+        for field in fields:
+            item[field] = entry.get(field)
+        reused.add(position)
+
+
+def apply_region_index(
+    snapshot: dict[str, Any], region_index: dict[str, Any] | None
+) -> tuple[set[int], set[int], dict[str, Any]]:
+    """Copy cached analysis onto elements and blocks of unchanged regions.
+
+    Returns the reused element positions, reused block positions and stats.
+    """
+    regions = snapshot.get("regions", [])
+    elements = snapshot.get("elements", [])
+    blocks = snapshot.get("blocks", [])
+
+    reused_elements: set[int] = set()
+    reused_blocks: set[int] = set()
+    unchanged_regions = 0
+
+    if region_index and region_index.get("version") == REGION_INDEX_VERSION:
+        cached_regions = region_index.get("regions", {})
+        element_groups = _group_by_region(elements)
+        block_groups = _group_by_region(blocks)
+
+        for index, region in enumerate(regions):
+            cached = cached_regions.get(region.get("fingerprint"))
+            if cached is None:
+                continue
+
+            unchanged_regions += 1
+            _reuse_items(
+                elements,
+                element_groups.get(index, []),
+                cached.get("elements", []),
+                ELEMENT_ANALYSIS_FIELDS,
+                _element_key,
+                reused_elements,
+            )
+            _reuse_items(
+                blocks,
+                block_groups.get(index, []),
+                cached.get("blocks", []),
+                BLOCK_ANALYSIS_FIELDS,
+                _block_key,
+                reused_blocks,
+            )
+
+    stats = {
+        "regions": len(regions),
+        "unchanged_regions": unchanged_regions,
+        "reused_elements": len(reused_elements),
+        "analyzed_elements": len(elements) - len(reused_elements),
+        "reused_blocks": len(reused_blocks),
+        "analyzed_blocks": len(blocks) - len(reused_blocks),
+    }
+    return reused_elements, reused_blocks, stats
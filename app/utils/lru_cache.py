@@ -0,0 +1,92 @@
+"""
+Size-bounded in-process LRU cache.
+
+This module provides:
+- Least-recently-used eviction bounded by entry count and total size
+- Per-entry expiry on a monotonic clock
+- Hit, miss and eviction counters
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class LRUCache:
+    """LRU cache bounded by entry count and caller-reported entry sizes."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # key -> (value, expires_at, size_bytes), least recently used first
+        self._entries: OrderedDict[str, tuple[Any, float, int]] = OrderedDict()
+        self._bytes = 0
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        """Return the live value for ``key`` and mark it most recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float, size_bytes: int):
+        """Store ``value``, evicting least recently used entries to fit."""
+        self.delete(key)
+        if ttl_seconds <= 0 or size_bytes > self.max_bytes:
+            return
+
+        self._entries[key] = (value, time.monotonic() + ttl_seconds, size_bytes)
+        self._bytes += size_bytes
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        """Remove ``key``; returns whether it was present."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "size_mb": round(self._bytes / 1024 / 1024, 2),
+            "max_size_mb": round(self.max_bytes / 1024 / 1024, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate_percentage": (
+                round(self.hits / lookups * 100, 2) if lookups else 0
+            ),
+        }
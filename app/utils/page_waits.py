@@ -0,0 +1,158 @@
+"""
+Condition-based page waits for action executors.
+
+This module provides:
+- Waiting for the DOM to go quiet (no mutations for a short window)
+- Waiting for the network to go idle
+- Waiting for a selector to appear
+- Waiting for the page to change (a DOM mutation or a new request)
+- A combined "settle" wait used after clicks, submits and hovers
+
+Every wait is bounded by a timeout and returns whether its condition was
+met instead of raising, so callers can use them in place of fixed sleeps
+and carry on when a page never settles.
+"""
+
+import asyncio
+
+import structlog
+from playwright.async_api import Page
+
+from app.utils.dom_extraction import locate_element
+
+logger = structlog.get_logger(__name__)
+
+# Resolves once no mutation has been seen for quietMs, or at maxMs
+DOM_QUIET_SCRIPT = """
+(opts) => new Promise(resolve => {
+    const root = document.documentElement || document;
+    let timer = null;
+    let deadline = null;
+    const finish = (quiet) => {
+        observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(deadline);
+        resolve(quiet);
+    };
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(() => finish(true), opts.quietMs);
+    });
+    observer.observe(root, {
+        subtree: true, childList: true, attributes: true, characterData: true
+    });
+    timer = setTimeout(() => finish(true), opts.quietMs);
+    deadline = setTimeout(() => finish(false), opts.maxMs);
+})
+"""
+
+# Resolves true on the first mutation, or false at maxMs
+DOM_CHANGE_SCRIPT = """
+(opts) => new Promise(resolve => {
+    const root = document.documentElement || document;
+    const observer = new MutationObserver(() => {
+        observer.disconnect();
+        clearTimeout(deadline);
+        resolve(true);
+    });
+    observer.observe(root, {
+        subtree: true, childList: true, attributes: true, characterData: true
+    });
+    const deadline = setTimeout(() => {
+        observer.disconnect();
+        resolve(false);
+    }, opts.maxMs);
+})
+"""
+
+
+async def wait_for_dom_quiet(
+    page: Page, quiet_ms: int = 200, timeout_ms: int = 2000
+) -> bool:
+    """Wait until the DOM has not changed for ``quiet_ms``."""
+    try:
+        return bool(
+            await page.evaluate(
+                DOM_QUIET_SCRIPT, {"quietMs": quiet_ms, "maxMs": timeout_ms}
+            )
+        )
+    except Exception as e:
+        # Navigation destroys the evaluation context; the page did change
+        logger.debug("DOM quiet wait interrupted", error=str(e))
+        return False
+
+
+async def wait_for_network_quiet(page: Page, timeout_ms: int = 5000) -> bool:
+    """Wait until the page has had no network activity for 500 ms."""
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout_ms)
+        return True
+    except Exception:
+        return False
+
+
+async def wait_for_appearance(page: Page, selector: str, timeout_ms: int) -> bool:
+    """Wait for ``selector`` to become visible.
+
+    Returns False straight away when it is already visible, since nothing
+    has changed for the caller to react to.
+    """
+    locator = locate_element(page, selector)
+    try:
+        if await locator.is_visible():
+            return False
+        await locator.wait_for(state="visible", timeout=timeout_ms)
+        return True
+    except Exception:
+        return False
+
+
+async def _wait_for_mutation(page: Page, timeout_ms: int) -> bool:
+    try:
+        return bool(await page.evaluate(DOM_CHANGE_SCRIPT, {"maxMs": timeout_ms}))
+    except Exception as e:
+        # Navigation destroys the evaluation context; the page did change
+        logger.debug("DOM change wait interrupted", error=str(e))
+        return True
+
+
+async def _wait_for_request(page: Page, timeout_ms: int) -> bool:
+    try:
+        await page.wait_for_event("request", timeout=timeout_ms)
+        return True
+    except Exception:
+        return False
+
+
+async def wait_for_change(page: Page, timeout_ms: int) -> bool:
+    """Wait for the DOM to mutate or the page to start a new request.
+
+    Returns False when the page stays idle for ``timeout_ms``, so an
+    already settled page does not count as a change.
+    """
+    waits = {
+        asyncio.ensure_future(_wait_for_mutation(page, timeout_ms)),
+        asyncio.ensure_future(_wait_for_request(page, timeout_ms)),
+    }
+    try:
+        while waits:
+            done, waits = await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+            if any(task.result() for task in done):
+                return True
+        return False
+    finally:
+        for task in waits:
+            task.cancel()
+        if waits:
+            await asyncio.gather(*waits, return_exceptions=True)
+
+
+async def wait_for_settle(
+    page: Page, timeout_ms: int = 2000, quiet_ms: int = 200
+) -> bool:
+    """Wait for both the network and the DOM to go quiet, up to ``timeout_ms``."""
+    network_quiet, dom_quiet = await asyncio.gather(
+        wait_for_network_quiet(page, timeout_ms),
+        wait_for_dom_quiet(page, quiet_ms, timeout_ms),
+    )
+    return network_quiet and dom_quiet
@@ -0,0 +1,378 @@
+"""
+Self-healing element locators for plan execution.
+
+This module provides:
+- Element fingerprints (tag, type, id, text, aria label, classes, geometry
+  and neighbouring labels) built from parsed interactive elements
+- A persistent per-page fingerprint index, written after every browser
+  parse and keyed by each selector a plan may use for the element
+- Scored nearest-neighbour matching of a missing element against the live
+  page, rejecting low-scoring or ambiguous matches
+- Persisted healed selectors, so later runs try the healed selector directly
+  instead of failing and healing again
+"""
+
+import json
+import math
+import re
+from typing import Any
+from urllib.parse import urlparse
+
+import redis.asyncio as redis
+import structlog
+from playwright.async_api import Locator, Page
+
+from app.core.config import settings
+from app.utils.dom_extraction import extract_page_snapshot, locate_element
+
+logger = structlog.get_logger(__name__)
+
+FINGERPRINT_PREFIX = "selector_heal:fp:"
+HEALED_PREFIX = "selector_heal:healed:"
+
+# Feature weights; only features present on the reference element count
+FEATURE_WEIGHTS = {
+    "tag": 0.15,
+    "type": 0.1,
+    "id": 0.2,
+    "aria": 0.15,
+    "text": 0.2,
+    "placeholder": 0.1,
+    "classes": 0.05,
+    "neighbors": 0.1,
+    "box": 0.05,
+}
+
+# Centre distance at which geometry stops contributing to a match
+GEOMETRY_SCALE_PX = 400
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _label(element: dict[str, Any]) -> str:
+    return (
+        element.get("text_content")
+        or element.get("aria_label")
+        or element.get("placeholder")
+        or element.get("title")
+        or ""
+    )
+
+
+def _tokens(text: str | None) -> set[str]:
+    return set(TOKEN_PATTERN.findall((text or "").lower()))
+
+
+def element_fingerprint(
+    element: dict[str, Any], neighbors: list[str] | None = None
+) -> dict[str, Any]:
+    """Fingerprint of a parsed interactive element."""
+    box = None
+    if element.get("x_coordinate") is not None and element.get("width") is not None:
+        box = [
+            element["x_coordinate"],
+            element["y_coordinate"],
+            element["width"],
+            element["height"],
+        ]
+    return {
+        "tag": (element.get("tag_name") or "").lower() or None,
+        "type": (element.get("element_type") or "").lower() or None,
+        "id": element.get("element_id"),
+        "text": (element.get("text_content") or "")[:100] or None,
+        "aria": element.get("aria_label"),
+        "placeholder": element.get("placeholder"),
+        "classes": sorted(_tokens(element.get("element_class"))) or None,
+        "neighbors": [label[:50] for label in neighbors or [] if label] or None,
+        "box": box,
+    }
+
+
+def build_fingerprints(
+    elements: list[dict[str, Any]],
+) -> list[tuple[str, dict[str, Any]]]:
+    """``(css_selector, fingerprint)`` for elements that carry a selector.
+
+    Neighbours are the labels of the elements just before and after in
+    document order, which tend to survive markup changes.
+    """
+    labels = [_label(element) for element in elements]
+    fingerprints = []
+    for position, element in enumerate(elements):
+        selector = element.get("css_selector")
+        if not selector:
+            continue
+        neighbors = (
+            labels[max(0, position - 1) : position]
+            + labels[position + 1 : position + 2]
+        )
+        fingerprints.append((selector, element_fingerprint(element, neighbors)))
+    return fingerprints
+
+
+def _text_similarity(a: str, b: str) -> float:
+    if a.strip().lower() == b.strip().lower():
+        return 1.0
+    a_tokens, b_tokens = _tokens(a), _tokens(b)
+    if not a_tokens or not b_tokens:
+        return 0.0
+    return len(a_tokens & b_tokens) / len(a_tokens | b_tokens)
+
+
+def _set_similarity(a: list[str], b: list[str]) -> float:
+    a_tokens = set().union(*(_tokens(item) for item in a))
+    b_tokens = set().union(*(_tokens(item) for item in b))
+    if not a_tokens or not b_tokens:
+        return 0.0
+    return len(a_tokens & b_tokens) / len(a_tokens | b_tokens)
+
+
+def _box_similarity(a: list[float], b: list[float]) -> float:
+    distance = math.hypot(
+        (a[0] + a[2] / 2) - (b[0] + b[2] / 2), (a[1] + a[3] / 2) - (b[1] + b[3] / 2)
+    )
+    return max(0.0, 1.0 - distance / GEOMETRY_SCALE_PX)
+
+
+def similarity(reference: dict[str, Any], candidate: dict[str, Any]) -> float:
+    """Weighted similarity (0.0-1.0) of a candidate to a reference fingerprint."""
+    total = 0.0
+    weight_sum = 0.0
+    for feature, weight in FEATURE_WEIGHTS.items():
+        expected = reference.get(feature)
+        if not expected:
+            continue
+        weight_sum += weight
+        actual = candidate.get(feature)
+        if not actual:
+            continue
+        if feature in ("text", "aria", "placeholder"):
+            total += weight * _text_similarity(expected, actual)
+        elif feature in ("classes", "neighbors"):
+            total += weight * _set_similarity(expected, actual)
+        elif feature == "box":
+            total += weight * _box_similarity(expected, actual)
+        else:
+            total += weight * (expected == actual)
+    return total / weight_sum if weight_sum else 0.0
+
+
+def nearest_match(
+    reference: dict[str, Any],
+    candidates: list[tuple[str, dict[str, Any]]],
+    min_score: float = 0.75,
+    min_margin: float = 0.05,
+) -> tuple[str, float] | None:
+    """The candidate selector closest to ``reference``, with its score.
+
+    None when nothing reaches ``min_score`` or when the runner-up is within
+    ``min_margin`` of the best, since acting on a coin toss is worse than
+    failing the step.
+    """
+    best: tuple[str, float] | None = None
+    runner_up = 0.0
+    for selector, fingerprint in candidates:
+        score = similarity(reference, fingerprint)
+        if best is None or score > best[1]:
+            runner_up = best[1] if best else 0.0
+            best = (selector, score)
+        elif score > runner_up:
+            runner_up = score
+
+    if best is None or best[1] < min_score or best[1] - runner_up < min_margin:
+        return None
+    return best
+
+
+def page_scope(url: str) -> str:
+    """Index scope of a page: host and path, ignoring query and fragment."""
+    parsed = urlparse(url)
+    return f"{parsed.netloc}{parsed.path.rstrip('/') or '/'}"
+
+
+class SelectorHealingIndex:
+    """Persistent element fingerprints and healed selectors, per page."""
+
+    def __init__(self):
+        self.enabled = getattr(settings, "SELECTOR_HEALING_ENABLED", True)
+        self.min_score = getattr(settings, "SELECTOR_HEALING_MIN_SCORE", 0.75)
+        self.min_margin = getattr(settings, "SELECTOR_HEALING_MIN_MARGIN", 0.05)
+        self.ttl_seconds = getattr(settings, "SELECTOR_HEALING_TTL_SECONDS", 2592000)
+        self.verify_timeout_ms = getattr(
+            settings, "SELECTOR_HEALING_VERIFY_TIMEOUT_MS", 1000
+        )
+        self.redis_url = getattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+
+        self.redis_client: redis.Redis | None = None
+        self._redis_initialized = False
+
+        # Stats
+        self.pages_recorded = 0
+        self.heal_attempts = 0
+        self.heals = 0
+        self.healed_hits = 0
+
+    async def _get_redis(self) -> redis.Redis | None:
+        """Lazily connect to Redis, where the index is kept."""
+        if self._redis_initialized:
+            return self.redis_client
+
+        self._redis_initialized = True
+        try:
+            self.redis_client = redis.from_url(
+                self.redis_url,
+                encoding="utf-8",
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+            )
+            await self.redis_client.ping()
+        except Exception as e:
+            logger.warning("Selector healing index unavailable", error=str(e))
+            self.redis_client = None
+
+        return self.redis_client
+
+    async def record_page(self, url: str, elements: list[dict[str, Any]]) -> int:
+        """Index the fingerprints of a parsed page's interactive elements.
+
+        Each element is stored under its CSS path and, when it has one, its
+        ``#id`` selector. Entries are merged into the page's index so that
+        selectors from older parses stay healable until they expire.
+        """
+        if not self.enabled:
+            return 0
+        client = await self._get_redis()
+        if client is None:
+            return 0
+
+        mapping = {}
+        for selector, fingerprint in build_fingerprints(elements):
+            encoded = json.dumps(fingerprint)
+            mapping[selector] = encoded
+            if fingerprint["id"]:
+                mapping[f"#{fingerprint['id']}"] = encoded
+        if not mapping:
+            return 0
+
+        key = f"{FINGERPRINT_PREFIX}{page_scope(url)}"
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.error("Failed to record element fingerprints", url=url, error=str(e))
+            return 0
+
+        self.pages_recorded += 1
+        return len(mapping)
+
+    async def healed_selectors(self, url: str, selectors: list[str]) -> list[str]:
+        """Previously healed replacements for any of ``selectors``."""
+        if not self.enabled or not selectors:
+            return []
+        client = await self._get_redis()
+        if client is None:
+            return []
+
+        try:
+            healed = await client.hmget(f"{HEALED_PREFIX}{page_scope(url)}", selectors)
+        except Exception as e:
+            logger.debug("Failed to look up healed selectors", url=url, error=str(e))
+            return []
+
+        replacements = list(dict.fromkeys(h for h in healed if h))
+        if replacements:
+            self.healed_hits += 1
+        return replacements
+
+    async def _load_reference(
+        self, client: redis.Redis, scope: str, selectors: list[str]
+    ) -> dict[str, Any] | None:
+        stored = await client.hmget(f"{FINGERPRINT_PREFIX}{scope}", selectors)
+        for fingerprint in stored:
+            if fingerprint:
+                return json.loads(fingerprint)
+        return None
+
+    async def heal(
+        self, page: Page, selectors: list[str], text_content: str | None = None
+    ) -> tuple[Locator, str] | None:
+        """Find the live element closest to the one ``selectors`` used to match.
+
+        The reference fingerprint comes from the index; failing that, the
+        action's text is all there is to match on. A visible match is
+        persisted as the healed selector for every one of ``selectors``.
+        """
+        if not self.enabled or not selectors:
+            return None
+        client = await self._get_redis()
+        if client is None:
+            return None
+
+        self.heal_attempts += 1
+        scope = page_scope(page.url)
+        try:
+            reference = await self._load_reference(client, scope, selectors)
+            if reference is None and text_content:
+                reference = {"text": text_content}
+            if reference is None:
+                return None
+
+            snapshot = await extract_page_snapshot(page, max_blocks=0, max_links=0)
+            match = nearest_match(
+                reference,
+                build_fingerprints(snapshot.get("elements", [])),
+                self.min_score,
+                self.min_margin,
+            )
+            if match is None:
+                logger.info("No healing match", url=page.url, selectors=selectors)
+                return None
+
+            healed, score = match
+            locator = locate_element(page, healed)
+            await locator.wait_for(state="visible", timeout=self.verify_timeout_ms)
+
+            async with client.pipeline(transaction=False) as pipe:
+                key = f"{HEALED_PREFIX}{scope}"
+                pipe.hset(key, mapping=dict.fromkeys(selectors, healed))
+                pipe.expire(key, self.ttl_seconds)
+                await pipe.execute()
+
+        except Exception as e:
+            logger.warning("Selector healing failed", url=page.url, error=str(e))
+            return None
+
+        self.heals += 1
+        logger.info(
+            "Selector healed",
+            url=page.url,
+            selectors=selectors,
+            healed=healed,
+            score=round(score, 3),
+        )
+        return locator, healed
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get selector healing statistics."""
+        return {
+            "enabled": self.enabled,
+            "pages_recorded": self.pages_recorded,
+            "heal_attempts": self.heal_attempts,
+            "heals": self.heals,
+            "healed_hits": self.healed_hits,
+        }
+
+    async def shutdown(self):
+        """Close the Redis connection."""
+        if self.redis_client:
+            await self.redis_client.close()
+            self.redis_client = None
+        self._redis_initialized = False
+        logger.info("Selector healing index shutdown complete")
+
+
+# Global selector healing index instance
+selector_healing_index = SelectorHealingIndex()
@@ -0,0 +1,163 @@
+"""
+Concurrent selector resolution for action executors.
+
+This module provides:
+- Racing every candidate selector of an action at once, taking the first
+  visible match and cancelling the rest
+- Per-domain memory of which selector strategy wins, so it is tried first
+  and the other strategies start only after a short head start
+- Race statistics (wins per strategy, misses, resolve time)
+"""
+
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from typing import Any
+from urllib.parse import urlparse
+
+import structlog
+from playwright.async_api import Locator, Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.core.config import settings
+from app.utils.dom_extraction import locate_element
+
+logger = structlog.get_logger(__name__)
+
+# Default order when a domain has no history; earlier wins ties
+SELECTOR_STRATEGIES = ("target", "css", "xpath", "text", "healed")
+
+DOMAIN_HISTORY_LIMIT = 1000
+
+
+class SelectorResolver:
+    """Resolves an action's element by racing its candidate selectors."""
+
+    def __init__(self):
+        self.timeout_ms = getattr(settings, "SELECTOR_RACE_TIMEOUT_MS", 5000)
+        self.head_start_ms = getattr(settings, "SELECTOR_RACE_HEAD_START_MS", 200)
+
+        # domain -> wins per strategy, least recently used first
+        self._domain_wins: OrderedDict[str, Counter] = OrderedDict()
+
+        # Stats
+        self.races = 0
+        self.misses = 0
+        self.strategy_wins: Counter = Counter()
+        self.resolve_ms_total = 0.0
+
+    def preferred_strategy(self, domain: str) -> str | None:
+        """The strategy that has won most often on ``domain``, if any."""
+        wins = self._domain_wins.get(domain)
+        if not wins:
+            return None
+        self._domain_wins.move_to_end(domain)
+        return wins.most_common(1)[0][0]
+
+    def _record_win(self, domain: str, strategy: str):
+        wins = self._domain_wins.setdefault(domain, Counter())
+        wins[strategy] += 1
+        self._domain_wins.move_to_end(domain)
+        if len(self._domain_wins) > DOMAIN_HISTORY_LIMIT:
+            self._domain_wins.popitem(last=False)
+        self.strategy_wins[strategy] += 1
+
+    def order_candidates(
+        self, candidates: list[tuple[str, str]], domain: str
+    ) -> list[tuple[str, str]]:
+        """Order candidates with the domain's winning strategy first."""
+        preferred = self.preferred_strategy(domain)
+        rank = {strategy: n for n, strategy in enumerate(SELECTOR_STRATEGIES)}
+        return sorted(
+            candidates,
+            key=lambda candidate: (
+                candidate[0] != preferred,
+                rank.get(candidate[0], len(rank)),
+            ),
+        )
+
+    async def _probe(self, locator: Locator, selector: str, delay: float) -> bool:
+        if delay:
+            await asyncio.sleep(delay)
+        try:
+            await locator.wait_for(state="visible", timeout=self.timeout_ms)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+        except Exception as e:
+            logger.debug("Selector failed", selector=selector, error=str(e))
+            return False
+
+    async def resolve(
+        self, page: Page, candidates: list[tuple[str, str]]
+    ) -> tuple[Locator, str, str] | None:
+        """Race ``(strategy, selector)`` candidates for the first visible match.
+
+        Returns the locator with its winning strategy and selector, or None
+        when no candidate becomes visible within the timeout.
+        """
+        if not candidates:
+            return None
+
+        domain = urlparse(page.url).netloc
+        ordered = self.order_candidates(candidates, domain)
+        head_start = (
+            self.head_start_ms / 1000 if self.preferred_strategy(domain) else 0.0
+        )
+
+        started = time.monotonic()
+        probes: dict[asyncio.Task, int] = {}
+        locators = []
+        for position, (_, selector) in enumerate(ordered):
+            locator = locate_element(page, selector)
+            locators.append(locator)
+            delay = head_start if position else 0.0
+            probes[asyncio.create_task(self._probe(locator, selector, delay))] = (
+                position
+            )
+
+        self.races += 1
+        pending = set(probes)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Several probes can finish together; the preferred one wins
+                winners = sorted(probes[task] for task in done if task.result())
+                if winners:
+                    position = winners[0]
+                    strategy, selector = ordered[position]
+                    self._record_win(domain, strategy)
+                    self.resolve_ms_total += (time.monotonic() - started) * 1000
+                    logger.debug(
+                        "Selector race won",
+                        domain=domain,
+                        strategy=strategy,
+                        selector=selector,
+                    )
+                    return locators[position], strategy, selector
+
+            self.misses += 1
+            return None
+
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get selector race statistics."""
+        won = self.races - self.misses
+        return {
+            "races": self.races,
+            "misses": self.misses,
+            "strategy_wins": dict(self.strategy_wins),
+            "domains_tracked": len(self._domain_wins),
+            "avg_resolve_ms": round(self.resolve_ms_total / won, 2) if won else 0,
+        }
+
+
+# Global selector resolver instance
+selector_resolver = SelectorResolver()
@@ -0,0 +1,391 @@
+"""
+Static HTML extraction for browserless webpage parsing.
+
+This module provides:
+- A single lxml tree walk producing the same snapshot shape as the in-page
+  DOM extraction script (metadata, counts, elements, content blocks)
+- Server-side framework detection from markup markers
+- Structural region fingerprints using the in-page hash and node signature,
+  so regions match across tiers wherever both parsers build the same tree
+- Heuristics deciding whether a page needs JavaScript rendering
+"""
+
+from typing import Any
+from urllib.parse import urljoin
+
+import lxml.html
+import structlog
+
+from app.utils.dom_extraction import (
+    FNV_OFFSET_BASIS,
+    JS_TRIM_CHARS,
+    empty_dom_snapshot,
+    fnv1a,
+)
+
+logger = structlog.get_logger(__name__)
+
+BLOCK_TAGS = (
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "p",
+    "div",
+    "article",
+    "section",
+    "main",
+)
+INTERACTIVE_TAGS = frozenset({"button", "input", "select", "textarea"})
+REGION_TAGS = frozenset(
+    {"header", "nav", "main", "aside", "footer", "section", "article", "form"}
+)
+
+# Elements with a reflected ``disabled`` property in the DOM
+DISABLEABLE_TAGS = frozenset(
+    {"button", "fieldset", "input", "optgroup", "option", "select", "textarea"}
+)
+
+# Subtrees whose text never renders
+NON_RENDERED_TAGS = frozenset({"script", "style", "noscript", "template", "head"})
+
+# Mount points left empty by client-side rendered apps
+SPA_ROOT_IDS = frozenset({"root", "app", "__next", "__nuxt", "___gatsby", "svelte"})
+
+# Frameworks whose presence means content is (re)rendered client side
+JS_RENDERED_FRAMEWORKS = frozenset({"React", "Vue", "Angular", "Svelte"})
+
+MIN_STATIC_TEXT_LENGTH = 200
+
+
+def _element_type(el: lxml.html.HtmlElement, tag: str) -> str:
+    """Mirror the DOM ``element.type`` property for static markup."""
+    if tag == "input":
+        return (el.get("type") or "text").lower()
+    if tag == "button":
+        return (el.get("type") or "submit").lower()
+    if tag == "select":
+        return "select-multiple" if el.get("multiple") is not None else "select-one"
+    if tag == "textarea":
+        return "textarea"
+    return "unknown"
+
+
+def _is_hidden(el: lxml.html.HtmlElement, tag: str) -> bool:
+    """Approximate visibility from attributes and inline styles."""
+    if el.get("hidden") is not None or el.get("aria-hidden") == "true":
+        return True
+    if tag == "input" and (el.get("type") or "").lower() == "hidden":
+        return True
+    style = (el.get("style") or "").replace(" ", "").lower()
+    return "display:none" in style or "visibility:hidden" in style
+
+
+def _is_interactive(el: lxml.html.HtmlElement, tag: str) -> bool:
+    return (
+        tag in INTERACTIVE_TAGS
+        or (tag == "a" and el.get("href") is not None)
+        or el.get("onclick") is not None
+        or el.get("role") == "button"
+        or el.get("tabindex") is not None
+    )
+
+
+def _detect_frameworks(el: lxml.html.HtmlElement, tag: str, found: set[str]):
+    """Collect framework markers visible in server-sent markup."""
+    if tag == "script":
+        script_id = el.get("id") or ""
+        src = (el.get("src") or "").lower()
+        if script_id == "__NEXT_DATA__" or "react" in src:
+            found.add("React")
+        elif script_id == "__NUXT_DATA__" or "vue" in src:
+            found.add("Vue")
+        elif "angular" in src:
+            found.add("Angular")
+        elif "jquery" in src:
+            found.add("jQuery")
+        return
+
+    if el.get("data-reactroot") is not None:
+        found.add("React")
+    elif el.get("ng-version") is not None or el.get("ng-app") is not None:
+        found.add("Angular")
+    elif el.get("data-server-rendered") is not None or el.get("data-v-app") is not None:
+        found.add("Vue")
+    elif (el.get("class") or "").startswith("svelte-"):
+        found.add("Svelte")
+
+
+def _node_signature(el: lxml.html.HtmlElement, tag: str) -> str:
+    """Identify a node for its region fingerprint (tag, key attributes, own text).
+
+    Mirrors the in-page signature: each direct text node is trimmed like
+    ``String.prototype.trim`` and ``disabled`` follows the DOM property.
+    """
+    disabled = tag in DISABLEABLE_TAGS and el.get("disabled") is not None
+    signature = (
+        f"{tag}#{el.get('id') or ''}.{el.get('class') or ''}|{el.get('type') or ''}"
+        f"|{el.get('href') or ''}|{el.get('aria-label') or ''}"
+        f"|{el.get('placeholder') or ''}|{el.get('title') or ''}"
+        f"|{'disabled' if disabled else ''}"
+    )
+    if tag not in ("script", "style"):
+        signature += (el.text or "").strip(JS_TRIM_CHARS)
+        signature += "".join((child.tail or "").strip(JS_TRIM_CHARS) for child in el)
+    return signature
+
+
+def extract_static_snapshot(
+    html: bytes | str,
+    url: str,
+    encoding: str | None = None,
+    max_elements: int = 1000,
+    max_blocks: int = 200,
+    max_links: int = 100,
+) -> dict[str, Any]:
+    """Parse raw HTML into a DOM-snapshot-shaped payload in one tree walk.
+
+    Geometry is unknown without layout, so elements carry no coordinates.
+    The extra ``render_hints`` key feeds :func:`detect_js_rendering`.
+    """
+    snapshot = empty_dom_snapshot(url)
+
+    parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+    if isinstance(html, str):
+        html = html.encode(encoding or "utf-8", errors="replace")
+    if not html.strip():
+        snapshot["render_hints"] = {
+            "text_length": 0,
+            "noscript_text_length": 0,
+            "empty_spa_root": False,
+        }
+        return snapshot
+
+    root = lxml.html.document_fromstring(html, parser=parser)
+
+    base_href = root.find(".//base[@href]")
+    base_url = urljoin(url, base_href.get("href")) if base_href is not None else url
+
+    counts = snapshot["counts"]
+    meta_tags = snapshot["meta_tags"]
+    links = snapshot["links"]
+    elements = snapshot["elements"]
+    block_buckets: dict[str, list[dict[str, Any]]] = {tag: [] for tag in BLOCK_TAGS}
+    block_seen = dict.fromkeys(BLOCK_TAGS, 0)
+    frameworks: set[str] = set()
+
+    interactive_index = 0
+    text_length = 0
+    noscript_text_length = 0
+    empty_spa_root = False
+
+    # Region hashes indexed in document order, and the regions enclosing the
+    # current node (innermost last)
+    region_tags: list[str] = []
+    region_hashes: list[int] = []
+    fingerprints: list[str] = []
+    open_regions: list[int] = []
+
+    def close_region():
+        # Fold the closed region into its parent at this point of the walk,
+        # as the in-page script does
+        closed = open_regions.pop()
+        fingerprints[closed] = format(region_hashes[closed], "x")
+        if open_regions:
+            parent_region = open_regions[-1]
+            region_hashes[parent_region] = fnv1a(
+                region_hashes[parent_region], f"[{fingerprints[closed]}]"
+            )
+
+    # Iterative pre-order walk carrying inherited hidden / non-rendered state
+    # and the enclosing region
+    stack: list[tuple[lxml.html.HtmlElement, bool, bool, int | None]] = [
+        (root, False, False, None)
+    ]
+    while stack:
+        el, parent_hidden, parent_skipped, region = stack.pop()
+        if not isinstance(el.tag, str):
+            continue  # Comments and processing instructions
+
+        tag = el.tag.lower()
+        hidden = parent_hidden or _is_hidden(el, tag)
+        skipped = parent_skipped or tag in NON_RENDERED_TAGS
+
+        # Close the regions the walk has left
+        while open_regions and open_regions[-1] != region:
+            close_region()
+
+        parent = el.getparent()
+        if tag == "body" or (
+            region is not None
+            and (tag in REGION_TAGS or (parent is not None and parent.tag == "body"))
+        ):
+            region = len(region_tags)
+            region_tags.append(tag)
+            region_hashes.append(FNV_OFFSET_BASIS)
+            fingerprints.append("")
+            open_regions.append(region)
+        if region is not None:
+            region_hashes[region] = fnv1a(
+                region_hashes[region], _node_signature(el, tag)
+            )
+
+        if tag == "noscript":
+            noscript_text_length += len(el.text_content().strip())
+        elif not skipped and not hidden:
+            text_length += len((el.text or "").strip())
+        # Tail text renders with the parent, not the element itself
+        if not parent_skipped and not parent_hidden:
+            text_length += len((el.tail or "").strip())
+
+        if tag == "form":
+            counts["forms"] += 1
+        elif tag == "input":
+            counts["inputs"] += 1
+            if (el.get("type") or "").lower() in ("submit", "button"):
+                counts["buttons"] += 1
+        elif tag in ("textarea", "select"):
+            counts["inputs"] += 1
+        elif tag == "button":
+            counts["buttons"] += 1
+        elif tag == "img":
+            counts["images"] += 1
+        elif tag == "script":
+            counts["scripts"] += 1
+        elif tag == "meta":
+            name = el.get("name") or el.get("property")
+            content = el.get("content")
+            if name and content:
+                meta_tags[name] = content
+        elif tag == "link":
+            if (
+                snapshot["canonical_link"] is None
+                and (el.get("rel") or "").lower() == "canonical"
+                and el.get("href")
+            ):
+                snapshot["canonical_link"] = urljoin(base_url, el.get("href"))
+        elif tag == "a" and el.get("href") is not None:
+            counts["links"] += 1
+            if len(links) < max_links:
+                links.append(
+                    {
+                        "text": el.text_content().strip(),
+                        "href": urljoin(base_url, el.get("href")),
+                        "title": el.get("title") or None,
+                    }
+                )
+        elif tag == "title" and not snapshot["title"]:
+            snapshot["title"] = el.text_content().strip()
+
+        _detect_frameworks(el, tag, frameworks)
+
+        if (
+            tag == "div"
+            and el.get("id") in SPA_ROOT_IDS
+            and not el.text_content().strip()
+        ):
+            empty_spa_root = True
+
+        if len(elements) < max_elements and _is_interactive(el, tag):
+            index = interactive_index
+            interactive_index += 1
+            if not hidden and not skipped:
+                href = el.get("href")
+                form_id = None
+                if tag in INTERACTIVE_TAGS:
+                    form = next(el.iterancestors("form"), None)
+                    form_id = el.get("form") or (
+                        form.get("id") if form is not None else None
+                    )
+                elements.append(
+                    {
+                        "tag_name": tag,
+                        "element_type": _element_type(el, tag),
+                        "text_content": el.text_content().strip()[:200],
+                        "placeholder": el.get("placeholder") or None,
+                        "value": el.get("value") or None,
+                        "aria_label": el.get("aria-label") or None,
+                        "title": el.get("title") or None,
+                        "element_id": el.get("id") or None,
+                        "element_class": el.get("class") or None,
+                        "is_visible": True,
+                        "is_enabled": el.get("disabled") is None,
+                        "href": urljoin(base_url, href) if href is not None else None,
+                        "form_id": form_id,
+                        "required": el.get("required") is not None,
+                        "element_index": index,
+                        "region": region,
+                    }
+                )
+
+        bucket = block_buckets.get(tag)
+        if bucket is not None:
+            index = block_seen[tag]
+            block_seen[tag] += 1
+            if len(bucket) < max_blocks:
+                text = el.text_content().strip()
+                if len(text) > 10:
+                    bucket.append(
+                        {
+                            "block_type": tag,
+                            "text_content": text[:500],
+                            "is_visible": not (hidden or skipped),
+                            "element_index": index,
+                            "region": region,
+                        }
+                    )
+
+        # Push children reversed so they pop in document order
+        for child in reversed(el):
+            stack.append((child, hidden, skipped, region))
+
+    while open_regions:
+        close_region()
+    snapshot["regions"] = [
+        {"tag": tag, "fingerprint": fingerprint}
+        for tag, fingerprint in zip(region_tags, fingerprints, strict=True)
+    ]
+
+    snapshot["lang"] = root.get("lang") or None
+    snapshot["frameworks"] = sorted(frameworks)
+
+    blocks: list[dict[str, Any]] = []
+    for tag in BLOCK_TAGS:
+        blocks.extend(block_buckets[tag])
+    snapshot["blocks"] = blocks[:max_blocks]
+
+    snapshot["render_hints"] = {
+        "text_length": text_length,
+        "noscript_text_length": noscript_text_length,
+        "empty_spa_root": empty_spa_root,
+    }
+
+    logger.debug(
+        "Static snapshot extracted",
+        url=url,
+        elements=len(elements),
+        blocks=len(snapshot["blocks"]),
+    )
+    return snapshot
+
+
+def detect_js_rendering(snapshot: dict[str, Any]) -> str | None:
+    """Return why a static snapshot needs a browser, or None if it is usable."""
+    hints = snapshot.get("render_hints", {})
+
+    if hints.get("empty_spa_root"):
+        return "empty_spa_root"
+
+    rendered = JS_RENDERED_FRAMEWORKS.intersection(snapshot.get("frameworks", []))
+    if rendered:
+        return f"framework:{sorted(rendered)[0].lower()}"
+
+    if hints.get("noscript_text_length", 0) > MIN_STATIC_TEXT_LENGTH // 4:
+        return "noscript_content"
+
+    if hints.get("text_length", 0) < MIN_STATIC_TEXT_LENGTH:
+        return "empty_body"
+
+    return None
@@ -0,0 +1,179 @@
+"""Unit tests for the shared static asset cache."""
+
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.utils.asset_cache import STATIC_ASSET_PATTERN, AssetCache, freshness_lifetime
+
+ASSET_URL = "https://cdn.example.com/app.3f2a.js"
+
+
+def _route(url: str = ASSET_URL, resource_type: str = "script") -> MagicMock:
+    route = MagicMock()
+    route.request.url = url
+    route.request.method = "GET"
+    route.request.resource_type = resource_type
+    route.request.headers = {"accept": "*/*"}
+    route.fulfill = AsyncMock()
+    route.fallback = AsyncMock()
+    return route
+
+
+def _response(status: int, headers: dict, body: bytes = b"") -> MagicMock:
+    response = MagicMock()
+    response.status = status
+    response.headers = headers
+    response.body = AsyncMock(return_value=body)
+    return response
+
+
+def test_freshness_lifetime_follows_cache_control():
+    """max-age sets the lifetime; no-store and private are never stored."""
+    assert freshness_lifetime({"cache-control": "public, max-age=600"}) == 600
+    assert freshness_lifetime({"cache-control": "no-cache", "etag": '"a"'}) == 0
+    assert freshness_lifetime({"etag": '"a"'}) == 0
+    assert freshness_lifetime({"cache-control": "private, max-age=60"}) is None
+    assert freshness_lifetime({"cache-control": "no-store"}) is None
+    assert freshness_lifetime({}) is None
+
+
+def test_only_static_asset_urls_are_routed():
+    assert STATIC_ASSET_PATTERN.search(ASSET_URL)
+    assert STATIC_ASSET_PATTERN.search("https://example.com/font.woff2?v=3")
+    assert not STATIC_ASSET_PATTERN.search("https://example.com/api/items")
+    assert not STATIC_ASSET_PATTERN.search("https://example.com/page?file=a.js")
+
+
+@pytest.mark.asyncio
+async def test_fresh_asset_is_served_from_disk(tmp_path):
+    """A stored asset is fulfilled from disk, also by a second cache instance."""
+    cache = AssetCache(str(tmp_path))
+    first = _route()
+    first.fetch = AsyncMock(
+        return_value=_response(
+            200,
+            {
+                "cache-control": "max-age=600",
+                "content-type": "text/javascript",
+                "content-encoding": "br",
+                "etag": '"v1"',
+            },
+            b"console.log(1)",
+        )
+    )
+    await cache._handle_route(first)
+    assert cache.stores == 1
+
+    shared = AssetCache(str(tmp_path))
+    second = _route()
+    await shared._handle_route(second)
+
+    second.fulfill.assert_awaited_once_with(
+        status=200,
+        headers={
+            "cache-control": "max-age=600",
+            "content-type": "text/javascript",
+            "etag": '"v1"',
+        },
+        body=b"console.log(1)",
+    )
+    assert shared.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_asset_is_revalidated_with_etag(tmp_path):
+    """Stale entries send If-None-Match and are served from disk on 304."""
+    cache = AssetCache(str(tmp_path))
+    first = _route()
+    first.fetch = AsyncMock(
+        return_value=_response(200, {"etag": '"v1"'}, b"body { color: red }")
+    )
+    await cache._handle_route(first)
+
+    second = _route()
+    second.fetch = AsyncMock(return_value=_response(304, {}))
+    await cache._handle_route(second)
+
+    assert second.fetch.await_args.kwargs["headers"]["if-none-match"] == '"v1"'
+    assert second.fulfill.await_args.kwargs["body"] == b"body { color: red }"
+    assert cache.revalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_requests_pass_through(tmp_path):
+    """no-store responses are not kept; documents are not intercepted."""
+    cache = AssetCache(str(tmp_path))
+    route = _route()
+    route.fetch = AsyncMock(
+        return_value=_response(200, {"cache-control": "no-store"}, b"x")
+    )
+    await cache._handle_route(route)
+    assert cache.stores == 0
+    route.fulfill.assert_awaited_once()
+
+    document = _route("https://example.com/index.js", "document")
+    await cache._handle_route(document)
+    document.fallback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_fetched_asset_is_served_when_storing_fails(tmp_path):
+    """A failing store still answers the request with the fetched response."""
+    cache = AssetCache(str(tmp_path))
+    cache._store = AsyncMock(side_effect=OSError("No space left on device"))
+    response = _response(200, {"cache-control": "max-age=600"}, b"body")
+    route = _route()
+    route.fetch = AsyncMock(return_value=response)
+
+    await cache._handle_route(route)
+
+    route.fulfill.assert_awaited_once_with(response=response)
+    route.fallback.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_assets_are_evicted(tmp_path):
+    """The store stays under its byte budget."""
+    cache = AssetCache(str(tmp_path), max_bytes=10)
+    for name in ("a", "b"):
+        route = _route(f"https://cdn.example.com/{name}.css", "stylesheet")
+        route.fetch = AsyncMock(
+            return_value=_response(200, {"cache-control": "max-age=60"}, b"123456")
+        )
+        await cache._handle_route(route)
+
+    stats = cache.get_stats()
+    assert stats["entries"] == 1
+    assert cache.evictions == 1
+    assert len(list(tmp_path.rglob("*.body"))) == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_left_on_disk_count_toward_the_budget(tmp_path):
+    """A new cache indexes earlier entries, evicts them first and drops orphans."""
+    earlier = AssetCache(str(tmp_path))
+    for name in ("a", "b"):
+        route = _route(f"https://cdn.example.com/{name}.css", "stylesheet")
+        route.fetch = AsyncMock(
+            return_value=_response(200, {"cache-control": "max-age=60"}, b"123456")
+        )
+        await earlier._handle_route(route)
+
+    orphan = tmp_path / "zz" / "orphan.body"
+    orphan.parent.mkdir()
+    orphan.write_bytes(b"left by an interrupted write")
+    os.utime(orphan, (0, 0))
+
+    cache = AssetCache(str(tmp_path), max_bytes=10)
+    route = _route("https://cdn.example.com/c.css", "stylesheet")
+    route.fetch = AsyncMock(
+        return_value=_response(200, {"cache-control": "max-age=60"}, b"123456")
+    )
+    await cache._handle_route(route)
+
+    assert list(cache._index) == ["https://cdn.example.com/c.css"]
+    assert cache.evictions == 2
+    assert len(list(tmp_path.rglob("*.body"))) == 1
+    assert not orphan.exists()
@@ -0,0 +1,140 @@
+"""Unit tests for batch parsing."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.task import TaskStatus
+from app.schemas.web_page import WebPageBatchParseRequest
+from app.services.batch_parse_service import BatchParseService
+
+URL_A = "https://example.com/a"
+URL_B = "https://example.com/b"
+URL_C = "https://example.com/c"
+
+
+def _task_row(task_id: int, status: TaskStatus = TaskStatus.COMPLETED):
+    return SimpleNamespace(
+        id=task_id,
+        target_url=f"https://example.com/{task_id}",
+        status=status,
+        result_data={"task": task_id},
+        error_message=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_batch_completes_cached_urls_and_dispatches_the_rest():
+    """Cache hits are inserted completed; only misses are dispatched, once each."""
+    service = BatchParseService()
+    cached_result = MagicMock()
+    cached_result.json.return_value = '{"title": "A"}'
+    service._lookup_cached = AsyncMock(return_value={URL_A: cached_result})
+    service._dispatch = AsyncMock()
+
+    db = AsyncMock()
+    inserted = MagicMock()
+    inserted.scalars.return_value = [11, 12, 13]
+    db.execute.return_value = inserted
+
+    request = WebPageBatchParseRequest(
+        urls=[URL_A, URL_B, URL_A, URL_C], max_concurrency=3
+    )
+    batch = await service.create_batch(db, 7, request)
+    await asyncio.sleep(0)
+
+    assert batch["total"] == 3
+    assert batch["cached"] == 1
+    assert batch["queued"] == 2
+
+    # One multi-row INSERT for every distinct URL
+    rows = db.execute.await_args.args[1]
+    assert [row["target_url"] for row in rows] == [URL_A, URL_B, URL_C]
+    assert rows[0]["status"] == TaskStatus.COMPLETED
+    assert rows[0]["result_data"] == {"title": "A"}
+    assert [row["status"] for row in rows[1:]] == [TaskStatus.PENDING] * 2
+    assert {row["background_task_id"] for row in rows} == {
+        service.batch_key(batch["batch_id"])
+    }
+
+    jobs = service._dispatch.await_args.args[1]
+    assert jobs == [(12, URL_B), (13, URL_C)]
+
+
+@pytest.mark.asyncio
+async def test_batch_progress_counts_finished_tasks_as_complete():
+    """Progress averages over the batch; finished tasks count as 100%."""
+    service = BatchParseService()
+    db = AsyncMock()
+    grouped = MagicMock()
+    grouped.all.return_value = [
+        (TaskStatus.COMPLETED, 2, 200),
+        (TaskStatus.FAILED, 1, 30),
+        (TaskStatus.IN_PROGRESS, 1, 40),
+        (TaskStatus.PENDING, 1, 0),
+    ]
+    db.execute.return_value = grouped
+
+    progress = await service.get_batch_progress(db, "b1", 7)
+
+    assert progress["total"] == 5
+    assert progress["finished"] == 3
+    assert progress["status_counts"]["completed"] == 2
+    assert progress["progress_percentage"] == 68.0
+    assert not progress["done"]
+
+
+@pytest.mark.asyncio
+async def test_batch_results_are_paged_by_task_id_cursor():
+    """Each page resumes after the last task id of the previous one."""
+    service = BatchParseService()
+    service.results_page_size = 2
+    db = AsyncMock()
+    db.execute.side_effect = [
+        [_task_row(3), _task_row(5, TaskStatus.FAILED)],
+        [_task_row(8)],
+    ]
+
+    with patch.object(
+        service, "get_batch_results", wraps=service.get_batch_results
+    ) as get_page:
+        results = [entry async for entry in service.iter_batch_results(db, "b1", 7)]
+
+    assert [entry["task_id"] for entry in results] == [3, 5, 8]
+    # Failed tasks carry no result
+    assert results[1]["result"] is None
+    assert results[2]["result"] == {"task": 8}
+    # A short page ends the iteration
+    assert [call.args[3] for call in get_page.await_args_list] == [0, 5]
+
+
+@pytest.mark.asyncio
+async def test_shutdown_fails_tasks_that_were_never_dispatched():
+    """Undispatched tasks are failed on shutdown instead of staying pending."""
+    service = BatchParseService()
+    request = WebPageBatchParseRequest(urls=[URL_A])
+    loop = asyncio.get_running_loop()
+
+    with (
+        patch(
+            "app.services.batch_parse_service.parse_worker_pool.enqueue",
+            new=AsyncMock(side_effect=lambda *args: loop.create_future()),
+        ),
+        patch(
+            "app.services.batch_parse_service.TaskStatusService.fail_pending_tasks",
+            new=AsyncMock(return_value=2),
+        ) as fail_pending_tasks,
+        patch("app.services.batch_parse_service.get_async_session_factory"),
+    ):
+        jobs = [(1, URL_A), (2, URL_B), (3, URL_C)]
+        service.dispatchers["b1"] = asyncio.create_task(
+            service._dispatch("b1", jobs, request, 1)
+        )
+        await asyncio.sleep(0)
+
+        await service.shutdown()
+
+    assert fail_pending_tasks.await_args.args[1] == [2, 3]
+    assert not service.dispatchers
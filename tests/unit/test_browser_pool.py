@@ -0,0 +1,292 @@
+"""Unit tests for the browser pool."""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.utils.browser_pool import BrowserPoolManager, percentile
+
+
+def make_browser_info(browser_id: str) -> dict:
+    browser = MagicMock()
+    browser.is_connected.return_value = True
+    browser.close = AsyncMock()
+
+    async def new_context(**options):
+        context = MagicMock()
+        context.add_init_script = AsyncMock()
+        context.close = AsyncMock()
+        context.clear_cookies = AsyncMock()
+        context.clear_permissions = AsyncMock()
+        context.grant_permissions = AsyncMock()
+        context.pages = []
+
+        async def new_page():
+            page = MagicMock()
+            page.close = AsyncMock(side_effect=lambda: context.pages.remove(page))
+            page.is_closed.return_value = False
+            page.set_content = AsyncMock()
+            context.pages.append(page)
+            return page
+
+        session = MagicMock()
+        session.send = AsyncMock(return_value={})
+        session.detach = AsyncMock()
+        context.new_page = AsyncMock(side_effect=new_page)
+        context.new_cdp_session = AsyncMock(return_value=session)
+        context.cdp_session = session
+        return context
+
+    browser.new_context = AsyncMock(side_effect=new_context)
+    return {
+        "id": browser_id,
+        "browser": browser,
+        "created_at": datetime.utcnow(),
+        "contexts": 0,
+        "memory_mb": 0.0,
+        "failed_checks": 0,
+        "draining": False,
+    }
+
+
+def make_pool(
+    min_size: int = 1, max_size: int = 3, browsers: int = 1
+) -> BrowserPoolManager:
+    pool = BrowserPoolManager()
+    pool.min_size = min_size
+    pool.max_size = max_size
+    pool.available_contexts = asyncio.LifoQueue(maxsize=max_size)
+    pool.scale_up_wait_seconds = 0.0
+    pool.scale_down_idle_seconds = 60
+    pool._initialized = True
+
+    for n in range(browsers):
+        pool.browsers[f"browser-{n}"] = make_browser_info(f"browser-{n}")
+
+    async def launch_browser():
+        browser_info = make_browser_info(f"browser-{len(pool.browsers)}")
+        pool.browsers[browser_info["id"]] = browser_info
+        return browser_info
+
+    pool._launch_browser = launch_browser
+    pool._has_memory_headroom = lambda: True
+    return pool
+
+
+def test_percentile_nearest_rank():
+    """Percentiles pick the nearest-rank sample."""
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 95) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_pool_grows_for_waiters_up_to_max():
+    """Sustained waits add contexts, never beyond the max size."""
+    pool = make_pool(min_size=1, max_size=3)
+    await pool._populate_pool()
+    await pool.acquire_context(1)
+
+    waiters = [asyncio.create_task(pool.acquire_context(n)) for n in range(2, 6)]
+    await asyncio.sleep(0)
+    await pool._autoscale()
+    await asyncio.sleep(0.01)
+
+    assert pool.pool_size == 3
+    assert pool.scale_ups == 2
+    assert sum(task.done() for task in waiters) == 2
+
+    for task in waiters:
+        task.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_idle_surplus_contexts_are_retired_to_min_size():
+    """Contexts idle past the threshold are closed, keeping the floor."""
+    pool = make_pool(min_size=1, max_size=3)
+    await pool._grow(3)
+
+    stale = datetime.utcnow() - timedelta(seconds=120)
+    for ctx_info in list(pool.available_contexts._queue):
+        ctx_info["last_used_at"] = stale
+
+    await pool._autoscale()
+
+    assert pool.pool_size == 1
+    assert pool.available_contexts.qsize() == 1
+    assert pool.scale_downs == 2
+
+
+@pytest.mark.asyncio
+async def test_acquire_wait_percentiles_reported():
+    """Every acquire contributes a wait sample to the pool stats."""
+    pool = make_pool(min_size=2, max_size=2)
+    await pool._populate_pool()
+
+    await pool.acquire_context(1)
+    await pool.acquire_context(2)
+    stats = await pool.get_pool_stats()
+
+    assert stats["acquire_wait_ms"]["samples"] == 2
+    assert stats["active_contexts"] == 2
+    assert stats["pool_size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_contexts_are_placed_on_least_loaded_browser():
+    """New contexts spread evenly across browser shards."""
+    pool = make_pool(min_size=4, max_size=6, browsers=2)
+    await pool._populate_pool()
+
+    assert [info["contexts"] for info in pool.browsers.values()] == [2, 2]
+
+    pool.browsers["browser-0"]["contexts"] += 1
+    await pool._grow(1)
+    assert pool.browsers["browser-1"]["contexts"] == 3
+
+
+@pytest.mark.asyncio
+async def test_recycled_browser_is_replaced_without_dropping_others():
+    """Recycling one shard closes only its contexts and launches a replacement."""
+    pool = make_pool(min_size=4, max_size=6, browsers=2)
+    await pool._populate_pool()
+    busy = await pool.acquire_context(1)
+
+    bloated = next(
+        info
+        for info in pool.browsers.values()
+        if all(ctx["browser_id"] != info["id"] for ctx in pool.active_contexts.values())
+    )
+    await pool._recycle_browser(bloated, reason="memory")
+
+    assert bloated["id"] not in pool.browsers
+    bloated["browser"].close.assert_awaited()
+    assert len(pool.browsers) == 2
+    assert pool.pool_size == 2
+    assert pool.browsers_recycled == 1
+
+    await pool._autoscale()
+    assert pool.pool_size == 4
+    assert busy.context in [ctx["context"] for ctx in pool.active_contexts.values()]
+
+
+@pytest.mark.asyncio
+async def test_lease_releases_context_exactly_once():
+    """Leaving the lease block returns the context; repeats are no-ops."""
+    pool = make_pool(min_size=1, max_size=1)
+    pool._reset_context = AsyncMock()
+    await pool._populate_pool()
+
+    async with await pool.acquire_context(1) as lease:
+        assert pool.active_contexts
+        assert pool.available_contexts.empty()
+
+    assert lease.released
+    assert not pool.active_contexts
+    assert pool.available_contexts.qsize() == 1
+
+    await lease.release()
+    await pool.release_context(lease.id)
+    assert pool.available_contexts.qsize() == 1
+    assert pool.duplicate_releases == 2
+
+
+@pytest.mark.asyncio
+async def test_release_sheds_surplus_contexts_while_chromium_is_over_budget():
+    """Over the Chromium RSS budget, released surplus contexts are closed."""
+    pool = make_pool(min_size=1, max_size=2)
+    await pool._populate_pool()
+    await pool._grow(1)
+    pool.browser_memory = {"total_rss_mb": pool.max_total_memory_mb + 1}
+
+    first = await pool.acquire_context(1)
+    second = await pool.acquire_context(2)
+    await first.release()
+    await second.release()
+
+    # The surplus context goes; the pool keeps its minimum
+    first.context.close.assert_awaited()
+    second.context.close.assert_not_awaited()
+    assert pool.available_contexts.qsize() == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_leases_are_reclaimed():
+    """An orphaned lease's context is closed once its timeout passes."""
+    pool = make_pool(min_size=2, max_size=2)
+    await pool._populate_pool()
+
+    orphan = await pool.acquire_context(1, lease_timeout_seconds=0.01)
+    renewed = await pool.acquire_context(2, lease_timeout_seconds=0.01)
+    renewed.renew(60)
+    await asyncio.sleep(0.02)
+    await pool._reclaim_expired_leases()
+
+    assert orphan.released
+    orphan.context.close.assert_awaited()
+    assert not renewed.released
+    assert pool.leases_reclaimed == 1
+    assert list(pool.leases) == [renewed.id]
+
+
+@pytest.mark.asyncio
+async def test_cdp_reset_clears_visited_origins_and_keeps_blank_page():
+    """Released contexts are wiped via CDP and come back with a fresh page."""
+    pool = make_pool(min_size=1, max_size=1)
+    await pool._populate_pool()
+
+    lease = await pool.acquire_context(1)
+    ready_page = await lease.new_page()
+    context = lease.context
+    assert context.pages == [ready_page]
+    assert context.new_page.await_count == 1
+
+    ctx_info = pool.active_contexts[lease.context_id]
+    pool._track_origin(ctx_info, "https://shop.example.com/cart?x=1")
+    pool._track_origin(ctx_info, "about:blank")
+    await lease.release()
+
+    context.cdp_session.send.assert_awaited_once_with(
+        "Storage.clearDataForOrigin",
+        {"origin": "https://shop.example.com", "storageTypes": "all"},
+    )
+    context.clear_cookies.assert_awaited_once()
+    context.clear_permissions.assert_awaited_once()
+    # The creation-time grant is restored after clearing
+    context.grant_permissions.assert_awaited_once_with(["geolocation"])
+    calls = [name for name, _, _ in context.mock_calls]
+    assert calls.index("grant_permissions") > calls.index("clear_permissions")
+    assert ready_page not in context.pages
+    assert ctx_info["blank_page"] is context.pages[0]
+    assert ctx_info["origins"] == set()
+
+
+@pytest.mark.asyncio
+async def test_context_warm_for_origin_is_preferred_and_preconnected():
+    """Repeated targets reuse the context that last served them."""
+    pool = make_pool(min_size=2, max_size=2)
+    pool.warm_domains = {"shop.example.com"}
+    await pool._populate_pool()
+
+    first = await pool.acquire_context(1, target_url="https://shop.example.com/a")
+    other = await pool.acquire_context(2)
+    await first.release()
+    # LIFO alone would hand out this context next
+    await other.release()
+
+    second = await pool.acquire_context(3, target_url="https://shop.example.com/b")
+
+    assert second.context is first.context
+    assert pool.warm_hits == 1
+    assert pool.warm_misses == 1
+    assert pool.preconnects == 1
+    page = await second.new_page()
+    page.set_content.assert_awaited_once_with(
+        '<link rel="preconnect" href="https://shop.example.com">'
+    )
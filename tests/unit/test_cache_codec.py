@@ -0,0 +1,61 @@
+"""Unit tests for the compressed cache payload codec."""
+
+import json
+
+import pytest
+
+from app.utils.cache_codec import (
+    MAGIC,
+    CacheCodec,
+    CacheCodecError,
+    available_compressors,
+)
+
+PAYLOAD = {
+    "web_page": {"title": "Example", "elements": [{"tag": "a"}] * 200},
+    "processing_time_ms": 1200,
+}
+
+
+@pytest.mark.parametrize("compressor", available_compressors())
+def test_round_trip_with_each_compressor(compressor):
+    """Every available backend decodes what it encodes."""
+    codec = CacheCodec(compressor=compressor)
+
+    payload = codec.encode(PAYLOAD)
+
+    assert payload.startswith(MAGIC)
+    assert codec.decode(payload) == PAYLOAD
+
+
+def test_payloads_are_readable_across_configurations():
+    """The header, not the reader's configuration, selects the decoder."""
+    writer = CacheCodec(serializer="json", compressor="zlib")
+    reader = CacheCodec(compressor="none")
+
+    assert reader.decode(writer.encode(PAYLOAD)) == PAYLOAD
+
+
+def test_legacy_json_entries_still_decode():
+    """Entries written before the codec existed are plain JSON."""
+    codec = CacheCodec()
+
+    assert codec.decode(json.dumps(PAYLOAD).encode()) == PAYLOAD
+
+
+def test_compression_shrinks_large_payloads_and_reports_sizes():
+    """Large repetitive payloads are compressed and sizes are accounted once."""
+    codec = CacheCodec(compressor="zlib", min_compress_bytes=16)
+
+    payload, raw_size = codec.encode_with_size(PAYLOAD)
+
+    assert len(payload) < raw_size
+    assert codec.get_stats()["compression_ratio"] > 1
+
+
+def test_unknown_version_is_rejected():
+    """Payloads from a newer codec version fail loudly."""
+    codec = CacheCodec()
+
+    with pytest.raises(CacheCodecError):
+        codec.decode(MAGIC + bytes([99, 0, 0]) + b"{}")
@@ -0,0 +1,159 @@
+"""Unit tests for frame-aware DOM extraction."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.utils.dom_extraction import (
+    FNV_OFFSET_BASIS,
+    FRAME_SELECTOR_SEPARATOR,
+    empty_dom_snapshot,
+    extract_page_snapshot,
+    fnv1a,
+    locate_element,
+    merge_frame_snapshots,
+)
+
+
+def make_snapshot(url: str, elements: int = 1, blocks: int = 1) -> dict:
+    snapshot = empty_dom_snapshot(url)
+    snapshot["regions"] = [{"tag": "form", "fingerprint": f"{url}-form"}]
+    snapshot["elements"] = [
+        {
+            "tag_name": "input",
+            "x_coordinate": 10,
+            "y_coordinate": 5,
+            "element_index": n,
+            "region": 0,
+            "css_selector": f"input:nth-of-type({n + 1})",
+        }
+        for n in range(elements)
+    ]
+    snapshot["blocks"] = [
+        {"block_type": "p", "x_coordinate": 0, "y_coordinate": 0, "region": None}
+        for _ in range(blocks)
+    ]
+    snapshot["links"] = [{"href": f"{url}/link"}]
+    snapshot["counts"]["inputs"] = elements
+    return snapshot
+
+
+def make_frame(url: str, parent=None, snapshot: dict | None = None, delay: float = 0):
+    frame = MagicMock()
+    frame.url = url
+    frame.parent_frame = parent
+    frame.is_detached.return_value = False
+
+    async def evaluate(script, opts):
+        await asyncio.sleep(delay)
+        return snapshot or make_snapshot(url)
+
+    handle = MagicMock()
+    handle.evaluate = AsyncMock(return_value=f"iframe#{url.rsplit('/', 1)[-1]}")
+    handle.bounding_box = AsyncMock(return_value={"x": 100, "y": 200})
+    handle.dispose = AsyncMock()
+    frame.evaluate = AsyncMock(side_effect=evaluate)
+    frame.frame_element = AsyncMock(return_value=handle)
+    return frame
+
+
+def test_merge_qualifies_selectors_and_offsets_frame_content():
+    """Frame elements get frame-path selectors, page coordinates and regions."""
+    snapshot = make_snapshot("https://example.com")
+    child = make_snapshot("https://pay.example.com", elements=2)
+
+    merge_frame_snapshots(
+        snapshot,
+        [
+            {
+                "url": "https://pay.example.com",
+                "frame_path": ["iframe#pay"],
+                "offset": {"x": 100, "y": 200},
+                "snapshot": child,
+            },
+            {"url": "https://slow.example.com", "status": "timeout"},
+        ],
+    )
+
+    framed = snapshot["elements"][1]
+    assert framed["css_selector"] == (
+        f"iframe#pay{FRAME_SELECTOR_SEPARATOR}input:nth-of-type(1)"
+    )
+    assert (framed["x_coordinate"], framed["y_coordinate"]) == (110, 205)
+    assert framed["region"] == 1
+    assert snapshot["regions"][1] == {
+        "tag": "form",
+        "fingerprint": "https://pay.example.com-form",
+        "frame": 1,
+    }
+    assert snapshot["counts"]["inputs"] == 3
+    assert [f["status"] for f in snapshot["frames"]] == ["ok", "timeout"]
+    assert snapshot["frames"][0]["elements"] == 2
+
+
+def test_merge_respects_page_wide_limits():
+    snapshot = make_snapshot("https://example.com", elements=2)
+    child = make_snapshot("https://ads.example.com", elements=5)
+
+    merge_frame_snapshots(
+        snapshot,
+        [{"url": "", "frame_path": ["iframe"], "snapshot": child}],
+        max_elements=4,
+        max_links=1,
+    )
+
+    assert len(snapshot["elements"]) == 4
+    assert len(snapshot["links"]) == 1
+    assert snapshot["frames"][0]["elements"] == 2
+
+
+def test_locate_element_enters_frames():
+    page = MagicMock()
+    locate_element(page, f"iframe#a{FRAME_SELECTOR_SEPARATOR}iframe#b >> nth=0 |> #go")
+
+    page.frame_locator.assert_called_once_with("iframe#a")
+    page.frame_locator.return_value.frame_locator.assert_called_once_with(
+        "iframe#b >> nth=0"
+    )
+    page.frame_locator.return_value.frame_locator.return_value.locator.assert_called_once_with(
+        "#go"
+    )
+
+    locate_element(page, "#plain")
+    page.locator.assert_called_once_with("#plain")
+
+
+@pytest.mark.asyncio
+async def test_child_frames_are_extracted_concurrently_within_budget():
+    """Nested frames get full paths; a frame over budget is skipped."""
+    main = make_frame("https://example.com/main")
+    outer = make_frame("https://example.com/outer", parent=main, delay=0.05)
+    inner = make_frame("https://example.com/inner", parent=outer, delay=0.05)
+    stuck = make_frame("https://example.com/stuck", parent=main, delay=5)
+
+    page = MagicMock()
+    page.main_frame = main
+    page.frames = [main, outer, inner, stuck]
+
+    started = asyncio.get_running_loop().time()
+    snapshot = await extract_page_snapshot(page, frame_timeout_seconds=0.5)
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert elapsed < 1
+    assert [f["status"] for f in snapshot["frames"]] == ["ok", "ok", "timeout"]
+    assert snapshot["frames"][1]["frame_path"] == ["iframe#outer", "iframe#inner"]
+    assert snapshot["elements"][2]["css_selector"].startswith(
+        f"iframe#outer{FRAME_SELECTOR_SEPARATOR}iframe#inner{FRAME_SELECTOR_SEPARATOR}"
+    )
+
+
+def test_fnv1a_matches_reference_vectors():
+    """The Python FNV-1a agrees with the 32-bit reference and JS code units."""
+    assert fnv1a(FNV_OFFSET_BASIS, "") == 0x811C9DC5
+    assert fnv1a(FNV_OFFSET_BASIS, "a") == 0xE40C292C
+    assert fnv1a(FNV_OFFSET_BASIS, "foobar") == 0xBF9CF968
+    # Astral characters hash as their two UTF-16 surrogates
+    assert fnv1a(FNV_OFFSET_BASIS, "😀") == fnv1a(
+        fnv1a(FNV_OFFSET_BASIS, "\ud83d"), "\ude00"
+    )
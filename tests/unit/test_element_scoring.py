@@ -0,0 +1,94 @@
+"""Unit tests for batch element scoring."""
+
+import time
+
+import pytest
+
+from app.utils.element_scoring import score_elements
+
+
+def make_element(**fields) -> dict:
+    element = {
+        "tag_name": "button",
+        "element_type": "submit",
+        "text_content": "",
+        "aria_label": None,
+        "title": None,
+        "element_id": None,
+        "element_class": None,
+        "is_visible": True,
+        "is_enabled": True,
+        "width": 80,
+        "height": 30,
+    }
+    element.update(fields)
+    return element
+
+
+def test_roles_and_interactions_follow_tag_type_and_labels():
+    elements = score_elements(
+        [
+            make_element(text_content="Save changes"),
+            make_element(tag_name="button", element_type="button", aria_label="Close"),
+            make_element(tag_name="input", element_type="text", aria_label="Email"),
+            make_element(tag_name="input", element_type="search", text_content=""),
+            make_element(tag_name="input", element_type="checkbox"),
+            make_element(tag_name="a", element_type="unknown"),
+            make_element(tag_name="div", element_type="unknown"),
+        ]
+    )
+
+    assert [e["semantic_role"] for e in elements] == [
+        "submit_button",
+        "cancel_button",
+        "email_input",
+        "text_input",
+        "checkbox",
+        "navigation_link",
+        "interactive_element",
+    ]
+    assert elements[2]["supported_interactions"] == ["type", "clear", "focus", "blur"]
+    assert elements[4]["supported_interactions"] == ["check", "uncheck", "click"]
+    assert elements[6]["supported_interactions"] == []
+
+
+def test_confidence_and_complexity_scores():
+    labeled, hidden, tiny, unknown_size = score_elements(
+        [
+            make_element(text_content="Go", element_id="go"),
+            make_element(tag_name="div", is_visible=False, is_enabled=False),
+            make_element(element_class="btn-hash-x1", width=10),
+            make_element(width=None, height=None, title="Help"),
+        ]
+    )
+
+    assert labeled["interaction_confidence"] == pytest.approx(1.0)
+    assert labeled["automation_complexity"] == pytest.approx(0.1)
+    assert hidden["interaction_confidence"] == 0.5
+    assert tiny["automation_complexity"] == pytest.approx(0.8)
+    assert unknown_size["automation_complexity"] == 0.1
+
+
+def test_reused_elements_keep_cached_analysis():
+    """Only geometry-dependent fields are recomputed for reused elements."""
+    cached = make_element(
+        semantic_role="cached_role", interaction_confidence=0.42, width=5
+    )
+    score_elements([cached, make_element()], reused={0})
+
+    assert cached["semantic_role"] == "cached_role"
+    assert cached["interaction_confidence"] == 0.42
+    assert cached["automation_complexity"] == pytest.approx(0.5)
+    assert "discovered_at" in cached
+
+
+def test_large_pages_are_scored_in_one_pass():
+    elements = [
+        make_element(text_content=f"Item {n}", element_id=f"item-{n}")
+        for n in range(1000)
+    ]
+
+    started = time.perf_counter()
+    score_elements(elements)
+    assert time.perf_counter() - started < 0.5
+    assert all("semantic_role" in element for element in elements)
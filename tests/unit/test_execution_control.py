@@ -0,0 +1,78 @@
+"""Unit tests for event-driven execution control."""
+
+import asyncio
+
+import pytest
+
+from app.utils.execution_control import (
+    ExecutionCancelledError,
+    ExecutionControl,
+    backoff_delay,
+)
+
+
+def test_backoff_is_exponential_jittered_and_capped():
+    assert backoff_delay(1, 2, rng=lambda: 0.0) == 1.0
+    assert backoff_delay(1, 2, rng=lambda: 1.0) == 2.0
+    assert backoff_delay(3, 2, rng=lambda: 0.0) == 4.0
+    assert backoff_delay(10, 2, cap_seconds=30, rng=lambda: 1.0) == 30.0
+
+
+@pytest.mark.asyncio
+async def test_sleep_wakes_early_only_when_condition_is_met():
+    control = ExecutionControl()
+    loop = asyncio.get_running_loop()
+
+    async def condition(result):
+        await asyncio.sleep(0.01)
+        return result
+
+    started = loop.time()
+    assert await control.sleep(5, until=condition(True)) is True
+    assert loop.time() - started < 1
+
+    # An unmet condition leaves the full delay to run
+    started = loop.time()
+    assert await control.sleep(0.1, until=condition(False)) is False
+    assert loop.time() - started >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_cancel_interrupts_pause_and_sleep():
+    control = ExecutionControl()
+    control.pause()
+    paused = asyncio.create_task(control.wait_if_paused())
+    sleeping = asyncio.create_task(control.sleep(5))
+    await asyncio.sleep(0.01)
+    assert not paused.done() and not sleeping.done()
+
+    control.cancel()
+
+    with pytest.raises(ExecutionCancelledError):
+        await asyncio.wait_for(paused, 1)
+    with pytest.raises(ExecutionCancelledError):
+        await asyncio.wait_for(sleeping, 1)
+    assert not control.paused
+
+
+@pytest.mark.asyncio
+async def test_run_abandons_work_on_cancel():
+    control = ExecutionControl()
+    assert await control.run(asyncio.sleep(0, result="done")) == "done"
+
+    step_cancelled = asyncio.Event()
+
+    async def slow_step():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            step_cancelled.set()
+            raise
+
+    running = asyncio.create_task(control.run(slow_step()))
+    await asyncio.sleep(0.01)
+    control.cancel()
+
+    with pytest.raises(ExecutionCancelledError):
+        await asyncio.wait_for(running, 1)
+    assert step_cancelled.is_set()
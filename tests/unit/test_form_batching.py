@@ -0,0 +1,147 @@
+"""Unit tests for form-fill step batching."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.executors.browser_actions import FormFillBatchExecutor
+from app.models.execution_plan import ActionType
+from app.services.action_executor import ActionExecutorService, ExecutionResult
+from app.utils.execution_control import ExecutionControl
+from app.utils.form_batching import batch_results, group_action_runs
+
+
+def make_fill(step_number: int, action_type=ActionType.TYPE, value: str = "x"):
+    return SimpleNamespace(
+        id=100 + step_number,
+        step_number=step_number,
+        action_type=action_type,
+        input_value=value,
+        target_selector=f"#field{step_number}",
+        timeout_seconds=5,
+    )
+
+
+def make_element():
+    handle = MagicMock()
+    handle.dispose = AsyncMock()
+    element = MagicMock()
+    element.element_handle = AsyncMock(return_value=handle)
+    return element, handle
+
+
+def test_consecutive_fills_are_grouped_in_order():
+    steps = ["nav", "type1", "type2", "select3", "click", "type4", "submit"]
+
+    groups = group_action_runs(steps, lambda step: step.startswith(("type", "sel")))
+
+    assert groups == [
+        ["nav"],
+        ["type1", "type2", "select3"],
+        ["click"],
+        ["type4"],
+        ["submit"],
+    ]
+
+
+def test_runs_are_split_at_the_batch_size():
+    steps = [f"type{n}" for n in range(5)]
+
+    groups = group_action_runs(steps, lambda step: True, max_batch_size=2)
+
+    assert groups == [["type0", "type1"], ["type2", "type3"], ["type4"]]
+
+
+def test_missing_results_count_as_failures():
+    outcome = {"sameForm": True, "results": [{"ok": True, "value": "a"}]}
+
+    results = batch_results(outcome, 3)
+
+    assert [r["ok"] for r in results] == [True, False, False]
+    assert [r["ok"] for r in batch_results(None, 1)] == [False]
+
+
+@pytest.mark.asyncio
+async def test_fields_in_different_forms_are_not_filled_in_a_batch():
+    """A batch spanning forms is refused as a whole, and handles are released."""
+    executor = FormFillBatchExecutor()
+    (first, first_handle), (second, second_handle) = make_element(), make_element()
+    page = MagicMock()
+    page.evaluate = AsyncMock(return_value={"sameForm": False, "results": []})
+
+    with patch.object(
+        executor, "_find_element", new=AsyncMock(side_effect=[first, second])
+    ):
+        outcome = await executor.execute_batch(page, [make_fill(1), make_fill(2)])
+
+    assert outcome is None
+    first_handle.dispose.assert_awaited_once()
+    second_handle.dispose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_success_per_field():
+    """Missing and rejected fields fail; the rest are filled in one evaluate."""
+    executor = FormFillBatchExecutor()
+    (first, _), (third, _) = make_element(), make_element()
+    page = MagicMock()
+    page.evaluate = AsyncMock(
+        return_value={
+            "sameForm": True,
+            "results": [{"ok": True}, {"ok": False, "error": "Option not found"}],
+        }
+    )
+    actions = [make_fill(1), make_fill(2), make_fill(3, ActionType.SELECT, "b")]
+
+    with patch.object(
+        executor, "_find_element", new=AsyncMock(side_effect=[first, None, third])
+    ):
+        outcome = await executor.execute_batch(page, actions)
+
+    assert outcome == [True, False, False]
+    page.evaluate.assert_awaited_once()
+    items = page.evaluate.await_args.args[1]["items"]
+    assert items == [{"kind": "type", "value": "x"}, {"kind": "select", "value": "b"}]
+
+
+def make_service(outcomes):
+    service = ActionExecutorService()
+    service.active_executions["e1"] = ExecutionResult("e1", 1)
+    service.execution_controls["e1"] = ExecutionControl()
+    service.batch_executor.execute_batch = AsyncMock(return_value=outcomes)
+    service._take_screenshot = AsyncMock(side_effect=["before.png", "after.png"])
+    service._update_action_results_bulk = AsyncMock()
+    return service
+
+
+@pytest.mark.asyncio
+async def test_filled_steps_share_one_bulk_update():
+    """Only filled steps are recorded; failed ones are left to run on their own."""
+    service = make_service([True, False, True])
+    db = AsyncMock()
+    actions = [make_fill(1), make_fill(2), make_fill(3)]
+
+    outcome = await service._execute_action_batch(db, MagicMock(), actions, "e1")
+
+    assert outcome == {1: True, 2: False, 3: True}
+    service._update_action_results_bulk.assert_awaited_once_with(
+        db, [101, 103], "before.png", "after.png"
+    )
+    executed = service.active_executions["e1"].executed_actions
+    assert [entry["step_number"] for entry in executed] == [1, 3]
+    assert all(entry["batched"] for entry in executed)
+
+
+@pytest.mark.asyncio
+async def test_refused_batch_falls_back_to_per_step_execution():
+    """A batch refused for spanning forms records nothing."""
+    service = make_service(None)
+
+    outcome = await service._execute_action_batch(
+        AsyncMock(), MagicMock(), [make_fill(1), make_fill(2)], "e1"
+    )
+
+    assert outcome == {}
+    service._update_action_results_bulk.assert_not_awaited()
+    assert service.active_executions["e1"].executed_actions == []
@@ -0,0 +1,61 @@
+"""Unit tests for incremental analysis reuse across re-parses."""
+
+from app.utils.incremental_analysis import apply_region_index, build_region_index
+from app.utils.static_extraction import extract_static_snapshot
+
+PAGE = """
+<html><body>
+  <header><nav><a href="/">Home page link</a></nav></header>
+  <main><h1>{headline}</h1><button>Subscribe now</button></main>
+  <footer><p>Copyright example footer text</p></footer>
+</body></html>
+"""
+
+
+def _analyzed_snapshot(headline: str) -> dict:
+    snapshot = extract_static_snapshot(
+        PAGE.format(headline=headline), "https://example.com/"
+    )
+    for element in snapshot["elements"]:
+        element["semantic_role"] = f"role:{element['tag_name']}"
+        element["interaction_confidence"] = 0.9
+        element["supported_interactions"] = ["click"]
+    for block in snapshot["blocks"]:
+        block["semantic_importance"] = 0.5
+        block["semantic_category"] = "general_content"
+    return snapshot
+
+
+def test_unchanged_regions_reuse_analysis():
+    """Only regions whose subtree changed are analyzed again."""
+    previous = _analyzed_snapshot("Original headline text")
+    index = build_region_index(previous, previous["elements"], previous["blocks"])
+
+    current = extract_static_snapshot(
+        PAGE.format(headline="Updated headline text!"), "https://example.com/"
+    )
+    reused_elements, reused_blocks, stats = apply_region_index(current, index)
+
+    tags = {current["elements"][i]["tag_name"] for i in reused_elements}
+    assert tags == {"a"}  # The nav link; the button sits in the changed main
+    assert current["elements"][next(iter(reused_elements))]["semantic_role"] == (
+        "role:a"
+    )
+    assert {current["blocks"][i]["block_type"] for i in reused_blocks} == {"p"}
+
+    # body and main changed; header, nav and footer did not
+    assert stats["regions"] == 5
+    assert stats["unchanged_regions"] == 3
+    assert stats["analyzed_elements"] == 1
+
+
+def test_missing_index_analyzes_everything():
+    """Without a previous index nothing is reused."""
+    current = extract_static_snapshot(
+        PAGE.format(headline="Headline"), "https://example.com/"
+    )
+
+    reused_elements, reused_blocks, stats = apply_region_index(current, None)
+
+    assert not reused_elements and not reused_blocks
+    assert stats["analyzed_elements"] == len(current["elements"])
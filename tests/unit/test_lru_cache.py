@@ -0,0 +1,46 @@
+"""Unit tests for the in-process LRU cache tier."""
+
+from unittest.mock import patch
+
+from app.utils.lru_cache import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Reading an entry protects it from the next eviction."""
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1, ttl_seconds=60, size_bytes=1)
+    cache.set("b", 2, ttl_seconds=60, size_bytes=1)
+
+    assert cache.get("a") == 1
+    cache.set("c", 3, ttl_seconds=60, size_bytes=1)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_size_bound_evicts_until_under_budget():
+    """Total entry size never exceeds the byte budget."""
+    cache = LRUCache(max_entries=10, max_bytes=100)
+    cache.set("a", "x", ttl_seconds=60, size_bytes=60)
+    cache.set("b", "y", ttl_seconds=60, size_bytes=60)
+
+    assert len(cache) == 1
+    assert cache.get("b") == "y"
+
+    cache.set("too_big", "z", ttl_seconds=60, size_bytes=101)
+    assert cache.get("too_big") is None
+
+
+def test_expired_entries_are_misses():
+    """Entries past their TTL are dropped on access."""
+    cache = LRUCache()
+
+    with patch("app.utils.lru_cache.time.monotonic", return_value=1000.0):
+        cache.set("a", 1, ttl_seconds=5, size_bytes=1)
+    with patch("app.utils.lru_cache.time.monotonic", return_value=1006.0):
+        assert cache.get("a") is None
+
+    assert len(cache) == 0
+    assert cache.get_stats()["misses"] == 1
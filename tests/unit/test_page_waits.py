@@ -0,0 +1,49 @@
+"""Unit tests for condition-based page waits."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.utils.page_waits import wait_for_change
+
+
+def make_page(mutated: bool = False, request_after: float | None = None):
+    page = MagicMock()
+    page.evaluate = AsyncMock(return_value=mutated)
+
+    async def wait_for_event(event, timeout):
+        if request_after is None:
+            await asyncio.sleep(timeout / 1000)
+            raise TimeoutError(f"Timeout {timeout}ms exceeded")
+        await asyncio.sleep(request_after)
+
+    page.wait_for_event = AsyncMock(side_effect=wait_for_event)
+    return page
+
+
+@pytest.mark.asyncio
+async def test_idle_page_is_not_a_change():
+    """A page that neither mutates nor requests waits out the timeout."""
+    page = make_page()
+
+    assert await wait_for_change(page, timeout_ms=20) is False
+    page.wait_for_event.assert_awaited_once_with("request", timeout=20)
+
+
+@pytest.mark.asyncio
+async def test_new_request_is_a_change_before_the_timeout():
+    """A request started after the wait begins ends it early."""
+    page = make_page(request_after=0)
+
+    assert await asyncio.wait_for(wait_for_change(page, timeout_ms=5000), 1) is True
+
+
+@pytest.mark.asyncio
+async def test_dom_mutation_or_navigation_is_a_change():
+    """A mutation, or navigation destroying the context, counts as a change."""
+    assert await wait_for_change(make_page(mutated=True), timeout_ms=5000) is True
+
+    page = make_page()
+    page.evaluate.side_effect = Exception("Execution context was destroyed")
+    assert await wait_for_change(page, timeout_ms=5000) is True
@@ -0,0 +1,67 @@
+"""Unit tests for single-flight parse coalescing."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.parse_coalescer import ParseCoalescer
+
+
+def _coalescer() -> ParseCoalescer:
+    coalescer = ParseCoalescer()
+    coalescer.distributed = False
+    return coalescer
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_share_one_parse():
+    """Only the leader runs the producer; followers receive copies."""
+    coalescer = _coalescer()
+    calls = 0
+    release = asyncio.Event()
+
+    async def producer():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        result = MagicMock()
+        result.copy.return_value = "copy"
+        return result
+
+    leader = asyncio.create_task(coalescer.run("key", producer))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(coalescer.run("key", producer))
+    await asyncio.sleep(0)
+    release.set()
+
+    (_, leader_coalesced), (follower_result, follower_coalesced) = await asyncio.gather(
+        leader, follower
+    )
+
+    assert calls == 1
+    assert leader_coalesced is False
+    assert follower_coalesced is True
+    assert follower_result == "copy"
+    assert coalescer.get_stats()["in_flight_keys"] == 0
+
+
+@pytest.mark.asyncio
+async def test_leader_failure_propagates_to_followers():
+    """Followers see the leader's exception instead of hanging."""
+    coalescer = _coalescer()
+    release = asyncio.Event()
+
+    async def producer():
+        await release.wait()
+        raise RuntimeError("navigation failed")
+
+    leader = asyncio.create_task(coalescer.run("key", producer))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(coalescer.run("key", producer))
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(leader, follower, return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,206 @@
+"""Unit tests for the bounded, prioritized parse worker pool."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.task import TaskPriority
+from app.services.parse_worker_pool import ParseQueueFullError, ParseWorkerPool
+
+URL = "https://example.com"
+
+
+def make_pool(concurrency: int = 1, max_queue_size: int = 10) -> ParseWorkerPool:
+    pool = ParseWorkerPool()
+    pool.concurrency = concurrency
+    pool.max_queue_size = max_queue_size
+    pool.queue = asyncio.PriorityQueue(maxsize=max_queue_size)
+    return pool
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_urgent_jobs_run_first_and_fifo_within_priority():
+    """Queued jobs run by priority rank, then in submission order."""
+    pool = make_pool(concurrency=1)
+    started: list[int] = []
+    gate = asyncio.Event()
+
+    async def run_job(job):
+        started.append(job["task_id"])
+        if job["task_id"] == 0:
+            await gate.wait()
+
+    pool._run_job = run_job
+    options = MagicMock()
+
+    # Keep the only worker busy while the rest are queued
+    await pool.submit(0, URL, options, TaskPriority.MEDIUM)
+    await settle()
+    await pool.submit(1, URL, options, TaskPriority.LOW)
+    await pool.submit(2, URL, options, TaskPriority.URGENT)
+    await pool.submit(3, URL, options, TaskPriority.LOW)
+    await pool.submit(4, URL, options, TaskPriority.URGENT)
+
+    gate.set()
+    await pool.queue.join()
+
+    assert started == [0, 2, 4, 1, 3]
+    await pool.shutdown(drain_timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_with_retry_after():
+    """A full queue raises with a Retry-After derived from the backlog."""
+    pool = make_pool(concurrency=1, max_queue_size=2)
+    gate = asyncio.Event()
+
+    async def run_job(job):
+        await gate.wait()
+
+    pool._run_job = run_job
+    options = MagicMock()
+
+    await pool.submit(0, URL, options)
+    await settle()
+    await pool.submit(1, URL, options)
+    await pool.submit(2, URL, options)
+
+    with pytest.raises(ParseQueueFullError) as exc_info:
+        pool.check_capacity()
+
+    # Two queued jobs, one worker, 30s seeded average: two half-waves
+    assert exc_info.value.retry_after == 30
+    assert pool.jobs_rejected == 1
+
+    with pytest.raises(ParseQueueFullError):
+        await pool.submit(3, URL, options)
+    assert pool.jobs_rejected == 2
+
+    gate.set()
+    await pool.shutdown(drain_timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_shutdown_drains_queued_and_in_flight_jobs():
+    """Shutdown waits for running and queued jobs, then stops intake."""
+    pool = make_pool(concurrency=1)
+    finished: list[int] = []
+
+    async def run_job(job):
+        await asyncio.sleep(0.01)
+        finished.append(job["task_id"])
+
+    pool._run_job = run_job
+    options = MagicMock()
+
+    await pool.submit(0, URL, options)
+    await pool.submit(1, URL, options)
+    await settle()
+
+    await pool.shutdown(drain_timeout=5)
+
+    assert finished == [0, 1]
+    assert pool.workers == []
+    with pytest.raises(ParseQueueFullError):
+        pool.check_capacity()
+
+
+@pytest.mark.asyncio
+async def test_drain_timeout_resolves_queued_dispatchers():
+    """Jobs still queued when the drain times out resolve as not parsed."""
+    pool = make_pool(concurrency=1)
+
+    async def run_job(job):
+        await asyncio.Event().wait()
+
+    pool._run_job = run_job
+    options = MagicMock()
+
+    await pool.enqueue(0, URL, options)
+    queued = await pool.enqueue(1, URL, options)
+    await settle()
+
+    pool._fail_abandoned = AsyncMock()
+    await pool.shutdown(drain_timeout=0.01)
+
+    assert queued.done()
+    assert queued.result() is False
+    assert pool.queue.empty()
+    # The abandoned task is not left pending
+    pool._fail_abandoned.assert_awaited_once_with([1])
+
+
+@pytest.mark.asyncio
+async def test_jobs_for_tasks_no_longer_pending_are_skipped():
+    """A task cancelled while queued is not claimed, so it is never parsed."""
+    pool = make_pool()
+    db = AsyncMock()
+
+    async def get_session():
+        yield db
+
+    parse = AsyncMock()
+    with (
+        patch("app.services.parse_worker_pool.get_async_session", new=get_session),
+        patch(
+            "app.services.task_status_service.TaskStatusService.claim_pending_task",
+            new=AsyncMock(return_value=False),
+        ) as claim,
+        patch(
+            "app.services.web_parser.web_parser_service.parse_webpage_async",
+            new=parse,
+        ),
+    ):
+        done = asyncio.get_running_loop().create_future()
+        await pool._run_job(
+            {"task_id": 5, "url": URL, "options": MagicMock(), "done": done}
+        )
+
+    claim.assert_awaited_once_with(db, 5, "webparser-5")
+    parse.assert_not_awaited()
+    assert done.result() is False
+    assert pool.jobs_skipped == 1
+    assert pool._avg_duration_seconds == 30.0
+
+
+@pytest.mark.asyncio
+async def test_drain_timeout_fails_interrupted_in_flight_parses():
+    """A claimed parse cut short by the drain timeout does not stay in progress."""
+    pool = make_pool(concurrency=1)
+    db = AsyncMock()
+
+    async def get_session():
+        yield db
+
+    async def parse(*args):
+        await asyncio.Event().wait()
+
+    with (
+        patch("app.services.parse_worker_pool.get_async_session", new=get_session),
+        patch(
+            "app.services.task_status_service.TaskStatusService.claim_pending_task",
+            new=AsyncMock(return_value=True),
+        ),
+        patch(
+            "app.services.web_parser.web_parser_service.parse_webpage_async",
+            new=parse,
+        ),
+    ):
+        running = await pool.enqueue(7, URL, MagicMock())
+        await settle()
+        assert 7 in pool.in_flight
+
+        pool._fail_abandoned = AsyncMock()
+        await pool.shutdown(drain_timeout=0.01)
+
+    assert running.result() is False
+    assert not pool.in_flight
+    pool._fail_abandoned.assert_awaited_once_with(
+        [7], "Parsing was interrupted by server shutdown", interrupted=True
+    )
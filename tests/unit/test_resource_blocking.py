@@ -0,0 +1,47 @@
+"""Unit tests for lean-profile resource blocking."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.utils.resource_blocking import ResourceBlocker, is_blocked_host
+
+
+def _route(url: str, resource_type: str) -> MagicMock:
+    route = MagicMock()
+    route.request.url = url
+    route.request.resource_type = resource_type
+    route.abort = AsyncMock()
+    route.fallback = AsyncMock()
+    return route
+
+
+def test_blocked_host_matches_subdomains():
+    """Tracker hosts are matched on the host and its parent domains."""
+    assert is_blocked_host("www.google-analytics.com")
+    assert is_blocked_host("static.hotjar.com")
+    assert not is_blocked_host("example.com")
+    assert not is_blocked_host("notdoubleclick.net")
+
+
+@pytest.mark.asyncio
+async def test_heavy_resources_are_aborted_and_counted():
+    """Images and tracker scripts are aborted; documents pass through."""
+    blocker = ResourceBlocker()
+
+    image = _route("https://example.com/hero.png", "image")
+    tracker = _route("https://www.googletagmanager.com/gtm.js", "script")
+    document = _route("https://example.com/", "document")
+
+    for route in (image, tracker, document):
+        await blocker._handle_route(route)
+
+    image.abort.assert_awaited_once()
+    tracker.abort.assert_awaited_once()
+    document.fallback.assert_awaited_once()
+
+    stats = blocker.get_stats()
+    assert stats["blocked_requests"] == 2
+    assert stats["allowed_requests"] == 1
+    assert stats["blocked_by_type"] == {"image": 1, "script": 1}
+    assert stats["estimated_blocked_bytes"] > 0
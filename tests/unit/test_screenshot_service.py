@@ -0,0 +1,92 @@
+"""Unit tests for the screenshot service."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.screenshot_service import LocalScreenshotStorage, ScreenshotService
+
+
+def make_service(tmp_path) -> ScreenshotService:
+    service = ScreenshotService(storage=LocalScreenshotStorage(str(tmp_path)))
+    service.format = "jpeg"
+    service.quality = 70
+    service.mode = "viewport"
+    return service
+
+
+def make_page(*frames: bytes) -> MagicMock:
+    page = MagicMock()
+    page.screenshot = AsyncMock(side_effect=list(frames))
+    return page
+
+
+@pytest.mark.asyncio
+async def test_jpeg_viewport_capture_is_stored_by_content(tmp_path):
+    """Captures pass quality only with JPEG and land under a content key."""
+    service = make_service(tmp_path)
+    page = make_page(b"frame-1")
+
+    path = await service.capture(page)
+    await service.drain()
+
+    page.screenshot.assert_awaited_once_with(type="jpeg", quality=70)
+    assert path.startswith(str(tmp_path)) and path.endswith(".jpg")
+    with open(path, "rb") as f:
+        assert f.read() == b"frame-1"
+    assert service.bytes_written == len(b"frame-1")
+
+
+@pytest.mark.asyncio
+async def test_identical_frames_are_stored_once(tmp_path):
+    service = make_service(tmp_path)
+    page = make_page(b"same", b"same", b"changed")
+
+    before = await service.capture(page)
+    after = await service.capture(page)
+    changed = await service.capture(page)
+    await service.drain()
+
+    assert before == after != changed
+    assert service.dedup_hits == 1
+    assert len(list(tmp_path.rglob("*.jpg"))) == 2
+
+    # A fresh service (e.g. after a restart) checks the storage instead
+    restarted = make_service(tmp_path)
+    assert await restarted.capture(make_page(b"same")) == before
+    await restarted.drain()
+    assert restarted.dedup_hits == 1
+    assert restarted.bytes_written == 0
+
+
+@pytest.mark.asyncio
+async def test_capture_modes(tmp_path):
+    """Full-page, clip and element captures map to Playwright options."""
+    service = make_service(tmp_path)
+    service.format = "png"
+    page = make_page(b"a", b"b")
+    element = MagicMock()
+    element.screenshot = AsyncMock(return_value=b"c")
+    clip = {"x": 0, "y": 0, "width": 100, "height": 50}
+
+    await service.capture(page, mode="full_page")
+    await service.capture(page, mode="clip", clip=clip)
+    await service.capture(page, mode="full_page", element=element)
+    await service.drain()
+
+    assert page.screenshot.await_args_list[0].kwargs == {
+        "type": "png",
+        "full_page": True,
+    }
+    assert page.screenshot.await_args_list[1].kwargs == {"type": "png", "clip": clip}
+    element.screenshot.assert_awaited_once_with(type="png")
+
+
+@pytest.mark.asyncio
+async def test_failed_capture_returns_none(tmp_path):
+    service = make_service(tmp_path)
+    page = MagicMock()
+    page.screenshot = AsyncMock(side_effect=RuntimeError("page closed"))
+
+    assert await service.capture(page) is None
+    assert service.failures == 1
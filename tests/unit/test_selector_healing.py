@@ -0,0 +1,129 @@
+"""Unit tests for fingerprint-based selector healing."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.utils import selector_healing
+from app.utils.selector_healing import (
+    SelectorHealingIndex,
+    build_fingerprints,
+    nearest_match,
+    page_scope,
+)
+
+
+def make_element(selector: str, tag: str = "button", **fields) -> dict:
+    return {
+        "tag_name": tag,
+        "element_type": "submit" if tag == "button" else "text",
+        "x_coordinate": 100,
+        "y_coordinate": 400,
+        "width": 120,
+        "height": 40,
+        "css_selector": selector,
+        **fields,
+    }
+
+
+def checkout_page() -> list[dict]:
+    return [
+        make_element("#email", tag="input", element_id="email", placeholder="Email"),
+        make_element(
+            "#checkout",
+            element_id="checkout",
+            text_content="Place order",
+            element_class="btn btn-primary",
+        ),
+        make_element("a:nth-of-type(1)", tag="a", text_content="Terms"),
+    ]
+
+
+def test_fingerprints_record_neighbours_and_skip_unselectable_elements():
+    elements = checkout_page() + [{"tag_name": "input", "text_content": "static"}]
+
+    fingerprints = dict(build_fingerprints(elements))
+
+    assert list(fingerprints) == ["#email", "#checkout", "a:nth-of-type(1)"]
+    assert fingerprints["#checkout"]["neighbors"] == ["Email", "Terms"]
+    assert fingerprints["#checkout"]["classes"] == ["btn", "primary"]
+    assert fingerprints["#checkout"]["box"] == [100, 400, 120, 40]
+
+
+def test_nearest_match_follows_renamed_element():
+    """A redeployed button with a new id and tweaked label still matches."""
+    reference = dict(build_fingerprints(checkout_page()))["#checkout"]
+    redeployed = checkout_page()
+    redeployed[1].update(
+        element_id="place-order-v2",
+        css_selector="#place-order-v2",
+        text_content="Place your order",
+        y_coordinate=420,
+    )
+
+    match = nearest_match(reference, build_fingerprints(redeployed), min_score=0.5)
+
+    assert match is not None
+    assert match[0] == "#place-order-v2"
+
+
+def test_nearest_match_rejects_ambiguous_and_weak_matches():
+    reference = {"text": "Delete"}
+    twins = build_fingerprints(
+        [
+            make_element("li:nth-of-type(1) > button", text_content="Delete"),
+            make_element("li:nth-of-type(2) > button", text_content="Delete"),
+        ]
+    )
+    assert nearest_match(reference, twins) is None
+
+    unrelated = build_fingerprints([make_element("#help", text_content="Help")])
+    assert nearest_match(reference, unrelated) is None
+
+
+@pytest.mark.asyncio
+async def test_heal_matches_live_page_and_persists_healed_selector(monkeypatch):
+    reference = dict(build_fingerprints(checkout_page()))["#checkout"]
+    live = checkout_page()
+    live[1].update(element_id=None, css_selector="form > button:nth-of-type(1)")
+
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    pipeline = MagicMock()
+    pipeline.__aenter__ = AsyncMock(return_value=pipe)
+    pipeline.__aexit__ = AsyncMock(return_value=False)
+    client = MagicMock()
+    client.hmget = AsyncMock(return_value=[None, json.dumps(reference)])
+    client.pipeline.return_value = pipeline
+
+    index = SelectorHealingIndex()
+    index.enabled = True
+    index._get_redis = AsyncMock(return_value=client)
+    monkeypatch.setattr(
+        selector_healing,
+        "extract_page_snapshot",
+        AsyncMock(return_value={"elements": live}),
+    )
+
+    page = MagicMock()
+    page.url = "https://shop.example.com/checkout/?step=2"
+    page.locator.return_value.wait_for = AsyncMock()
+
+    healed = await index.heal(page, ["#old-checkout", "#checkout"])
+
+    assert healed is not None
+    assert healed[1] == "form > button:nth-of-type(1)"
+    page.locator.assert_called_with("form > button:nth-of-type(1)")
+    client.hmget.assert_awaited_once_with(
+        "selector_heal:fp:shop.example.com/checkout", ["#old-checkout", "#checkout"]
+    )
+    pipe.hset.assert_called_once_with(
+        "selector_heal:healed:shop.example.com/checkout",
+        mapping={
+            "#old-checkout": "form > button:nth-of-type(1)",
+            "#checkout": "form > button:nth-of-type(1)",
+        },
+    )
+    assert index.get_stats()["heals"] == 1
+    assert page_scope("https://shop.example.com") == "shop.example.com/"
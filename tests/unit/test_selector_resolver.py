@@ -0,0 +1,93 @@
+"""Unit tests for concurrent selector resolution."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.utils.selector_resolver import SelectorResolver
+
+
+def make_page(outcomes: dict[str, float | None]) -> MagicMock:
+    """Selectors become visible after the given seconds, or never (None)."""
+    page = MagicMock()
+    page.url = "https://shop.example.com/cart"
+    locators = {}
+    cancelled = []
+
+    def locator(selector):
+        delay = outcomes[selector]
+
+        async def wait_for(state, timeout):
+            try:
+                await asyncio.sleep(delay if delay is not None else timeout / 1000)
+            except asyncio.CancelledError:
+                cancelled.append(selector)
+                raise
+            if delay is None:
+                raise PlaywrightTimeoutError("Timeout")
+
+        locators[selector] = MagicMock(wait_for=wait_for)
+        return locators[selector]
+
+    page.locator.side_effect = locator
+    page.locators = locators
+    page.cancelled = cancelled
+    return page
+
+
+def make_resolver() -> SelectorResolver:
+    resolver = SelectorResolver()
+    resolver.timeout_ms = 500
+    resolver.head_start_ms = 50
+    return resolver
+
+
+@pytest.mark.asyncio
+async def test_first_visible_selector_wins_and_losers_are_cancelled():
+    """A stale first selector no longer costs a full timeout."""
+    resolver = make_resolver()
+    page = make_page({"#stale": None, "button.buy": 0.01, "text=Buy": 0.2})
+
+    started = asyncio.get_running_loop().time()
+    locator, strategy, selector = await resolver.resolve(
+        page, [("target", "#stale"), ("css", "button.buy"), ("text", "text=Buy")]
+    )
+
+    assert asyncio.get_running_loop().time() - started < 0.2
+    assert (strategy, selector) == ("css", "button.buy")
+    assert locator is page.locators["button.buy"]
+    assert sorted(page.cancelled) == ["#stale", "text=Buy"]
+
+
+@pytest.mark.asyncio
+async def test_winning_strategy_is_tried_first_on_the_same_domain():
+    resolver = make_resolver()
+    page = make_page({"#stale": None, "text=Buy": 0.0})
+    await resolver.resolve(page, [("target", "#stale"), ("text", "text=Buy")])
+
+    assert resolver.preferred_strategy("shop.example.com") == "text"
+    assert resolver.order_candidates(
+        [("target", "#a"), ("css", ".a"), ("text", "text=A")], "shop.example.com"
+    ) == [("text", "text=A"), ("target", "#a"), ("css", ".a")]
+
+    # Both match immediately; the preferred strategy has a head start
+    page = make_page({"#fresh": 0.0, "text=Buy": 0.0})
+    _, strategy, _ = await resolver.resolve(
+        page, [("target", "#fresh"), ("text", "text=Buy")]
+    )
+    assert strategy == "text"
+
+
+@pytest.mark.asyncio
+async def test_no_visible_candidate_is_a_miss():
+    resolver = make_resolver()
+    resolver.timeout_ms = 20
+    page = make_page({"#gone": None, "xpath=//gone": None})
+
+    assert (
+        await resolver.resolve(page, [("target", "#gone"), ("xpath", "xpath=//gone")])
+        is None
+    )
+    assert resolver.get_stats()["misses"] == 1
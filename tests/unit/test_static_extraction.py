@@ -0,0 +1,103 @@
+"""Unit tests for browserless static HTML extraction."""
+
+from app.utils.static_extraction import detect_js_rendering, extract_static_snapshot
+
+ARTICLE_TEXT = "Server rendered article text that is long enough to read. " * 6
+
+SERVER_RENDERED_PAGE = f"""
+<html lang="en">
+  <head>
+    <title>Example Article</title>
+    <meta name="description" content="An example">
+    <link rel="canonical" href="/articles/1">
+  </head>
+  <body>
+    <h1>Example Article Heading</h1>
+    <p>{ARTICLE_TEXT}</p>
+    <form id="search">
+      <input type="search" name="q" placeholder="Search">
+      <input type="hidden" name="token" value="secret">
+      <button>Go</button>
+    </form>
+    <a href="/about">About us</a>
+    <div style="display: none"><a href="/hidden">Hidden link</a></div>
+  </body>
+</html>
+"""
+
+
+def test_server_rendered_page_is_served_statically():
+    """A server-rendered page produces a complete snapshot with no escalation."""
+    snapshot = extract_static_snapshot(
+        SERVER_RENDERED_PAGE, "https://example.com/articles/1"
+    )
+
+    assert snapshot["title"] == "Example Article"
+    assert snapshot["lang"] == "en"
+    assert snapshot["canonical_link"] == "https://example.com/articles/1"
+    assert snapshot["meta_tags"]["description"] == "An example"
+    assert snapshot["counts"]["forms"] == 1
+    assert snapshot["counts"]["links"] == 2
+
+    tags = [(el["tag_name"], el["element_type"]) for el in snapshot["elements"]]
+    assert tags == [("input", "search"), ("button", "submit"), ("a", "unknown")]
+    assert snapshot["elements"][0]["form_id"] == "search"
+    assert snapshot["elements"][2]["href"] == "https://example.com/about"
+
+    assert snapshot["blocks"][0]["block_type"] == "h1"
+    assert detect_js_rendering(snapshot) is None
+
+
+def test_empty_spa_shell_escalates():
+    """An empty client-side mount point requires the browser."""
+    snapshot = extract_static_snapshot(
+        '<html><body><div id="root"></div><script src="/app.js"></script></body></html>',
+        "https://example.com/",
+    )
+
+    assert detect_js_rendering(snapshot) == "empty_spa_root"
+
+
+def test_noscript_warning_escalates():
+    """A page telling users to enable JavaScript requires the browser."""
+    snapshot = extract_static_snapshot(
+        f"<html><body><p>{ARTICLE_TEXT}</p><noscript>You need to enable "
+        "JavaScript to run this app. Please enable it and reload.</noscript>"
+        "</body></html>",
+        "https://example.com/",
+    )
+
+    assert detect_js_rendering(snapshot) == "noscript_content"
+
+
+def test_thin_body_escalates():
+    """Pages with almost no rendered text are treated as JS-rendered."""
+    snapshot = extract_static_snapshot(
+        "<html><body><p>Loading...</p></body></html>", "https://example.com/"
+    )
+
+    assert detect_js_rendering(snapshot) == "empty_body"
+
+
+def test_region_fingerprints_match_in_page_scheme():
+    """Static regions hash like the in-page script, so either tier's index reuses."""
+    page = """
+    <html><body>Intro <!-- note --> text
+      <header id="top"><nav><a href="/a" title="A">Home</a></nav></header>
+      <main><section><h1>Héllo 😀</h1>
+        <form id="f"><input type="text" disabled><div disabled>x</div></form>
+      </section></main>
+    </body></html>
+    """
+
+    snapshot = extract_static_snapshot(page, "https://example.com")
+
+    # Computed by DOM_SNAPSHOT_SCRIPT over the same tree
+    assert snapshot["regions"] == [
+        {"tag": "body", "fingerprint": "beb5991d"},
+        {"tag": "header", "fingerprint": "de0a66b6"},
+        {"tag": "nav", "fingerprint": "aa7af307"},
+        {"tag": "main", "fingerprint": "73b89762"},
+        {"tag": "section", "fingerprint": "c371d214"},
+        {"tag": "form", "fingerprint": "f5666e2a"},
+    ]
@@ -0,0 +1,164 @@
+"""Unit tests for the batched task progress writer."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.task import TaskStatus
+from app.services.task_progress_writer import TaskProgressWriter
+
+
+@pytest.mark.asyncio
+async def test_reports_are_coalesced_per_task():
+    """Successive reports for one task collapse into a single pending update."""
+    writer = TaskProgressWriter()
+
+    with patch.object(writer, "_ensure_started"):
+        await writer.report(1, progress_percentage=10, current_step="checking_cache")
+        await writer.report(1, progress_percentage=50, current_step="extracting")
+        await writer.report(2, progress_percentage=5)
+
+    assert len(writer._pending) == 2
+    assert writer._pending[1]["progress_percentage"] == 50
+    assert writer._pending[1]["current_step"] == "extracting"
+    assert writer.reports_received == 3
+
+
+@pytest.mark.asyncio
+async def test_progress_is_clamped():
+    """Progress percentages are clamped to the 0-100 range."""
+    writer = TaskProgressWriter()
+
+    with patch.object(writer, "_ensure_started"):
+        await writer.report(1, progress_percentage=150)
+
+    assert writer._pending[1]["progress_percentage"] == 100
+
+
+@pytest.mark.asyncio
+async def test_status_transition_flushes_immediately():
+    """A status change is written through instead of waiting for the loop."""
+    writer = TaskProgressWriter()
+
+    with patch.object(writer, "flush", new=AsyncMock(return_value=1)) as flush:
+        await writer.report(7, status=TaskStatus.PENDING, current_step="queued")
+
+    flush.assert_awaited_once_with([7])
+
+
+@pytest.mark.asyncio
+async def test_discard_drops_pending_update():
+    """Discarding a task removes its buffered progress."""
+    writer = TaskProgressWriter()
+
+    with patch.object(writer, "_ensure_started"):
+        await writer.report(3, progress_percentage=95)
+
+    await writer.discard(3)
+
+    assert 3 not in writer._pending
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_does_not_requeue_discarded_tasks():
+    """A task finished during a failing flush does not get its progress back."""
+    writer = TaskProgressWriter()
+
+    with patch.object(writer, "_ensure_started"):
+        await writer.report(5, progress_percentage=80, current_step="extracting")
+        await writer.report(6, progress_percentage=40)
+
+    discarding: list[asyncio.Task] = []
+
+    async def failing_execute(*args, **kwargs):
+        # Task 5 completes while its progress is being written
+        discarding.append(asyncio.create_task(writer.discard(5)))
+        await asyncio.sleep(0)
+        raise RuntimeError("database unavailable")
+
+    db = AsyncMock()
+    db.execute.side_effect = failing_execute
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = db
+
+    with patch(
+        "app.services.task_progress_writer.get_async_session_factory",
+        return_value=session_factory,
+    ):
+        assert await writer.flush() == 0
+    await discarding[0]
+
+    assert 5 not in writer._pending
+    assert writer._pending[6]["progress_percentage"] == 40
+    assert not writer._discarded
+
+
+@pytest.mark.asyncio
+async def test_partial_results_are_streamed_in_batches():
+    """A stage's items are split into batch-sized partial events."""
+    writer = TaskProgressWriter()
+    writer.stream_batch_size = 2
+
+    with patch.object(writer, "stream_event") as stream_event:
+        writer.stream_partial(4, "interactive_elements", [{"n": n} for n in range(5)])
+
+    batches = [call.args[2] for call in stream_event.call_args_list]
+    assert [batch["offset"] for batch in batches] == [0, 2, 4]
+    assert batches[2] == {
+        "stage": "interactive_elements",
+        "offset": 4,
+        "total": 5,
+        "items": [{"n": 4}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_stream_events_are_sent_in_one_pipeline_off_the_parse_path():
+    """Queued events reach Redis in order, in a single background round trip."""
+    writer = TaskProgressWriter()
+    writer.stream_batch_size = 2
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    client = MagicMock()
+    client.pipeline.return_value.__aenter__.return_value = pipe
+
+    with patch.object(writer, "_get_redis", new=AsyncMock(return_value=client)):
+        elements = [{"n": n} for n in range(5)]
+        writer.stream_event(4, "partial", {"stage": "metadata"})
+        writer.stream_partial(4, "interactive_elements", elements)
+        # Later changes to streamed data are not sent
+        elements[0]["n"] = "changed"
+        assert pipe.execute.await_count == 0
+
+        await writer._stream_task
+
+    pipe.execute.assert_awaited_once()
+    payloads = [call.args[1]["data"] for call in pipe.xadd.call_args_list]
+    assert len(payloads) == 4
+    assert '"n": 0' in payloads[1]
+    pipe.expire.assert_called_once_with("task_stream:4", writer.stream_ttl_seconds)
+    assert writer.stream_events == 4
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_until_terminal_event():
+    """Readers get heartbeats while idle and stop after the outcome event."""
+    writer = TaskProgressWriter()
+    client = AsyncMock()
+    client.xread.side_effect = [
+        [["task_stream:9", [("1-0", {"type": "progress", "data": '{"p": 5}'})]]],
+        [],
+        [["task_stream:9", [("2-0", {"type": "completed", "data": "{}"})]]],
+    ]
+
+    with patch.object(writer, "_get_redis", new=AsyncMock(return_value=client)):
+        events = [event async for event in writer.read_stream(9)]
+
+    assert events == [
+        ("1-0", "progress", {"p": 5}),
+        (None, "heartbeat", {}),
+        ("2-0", "completed", {}),
+    ]
+    # Each read resumes after the last event seen
+    assert client.xread.await_args_list[-1].args[0] == {"task_stream:9": "1-0"}